@@ -95,7 +95,8 @@ def taq_self_response_year_avg_responses_physical_data(tickers, year):
 
     Using the taq_self_response_day_avg_responses_physical_data function
     computes the average of self-response functions for different tickers for a
-    year.
+    year. All the self-responses must have the same time lags, which are saved
+    with the averages.
 
     :param tickers: list of the string abbreviation of the stocks to be
      analyzed (i.e. ['AAPL', 'MSFT']).
@@ -107,28 +108,51 @@ def taq_self_response_year_avg_responses_physical_data(tickers, year):
     taq_data_tools_avg_responses_physical \
         .taq_function_header_print_data(function_name, '', '', year, '', '')
 
-    results_avg = []
+    taus = None
+    responses = []
 
     for ticker in tickers:
-        sum_response = np.zeros(__tau__)
+        responses_group = []
 
         for tick in ticker:
             # Load data
-            response = pickle.load(open(
-                f'../../taq_data/responses_physical_data_{year}/taq_self'
-                + f'_response_year_responses_physical_data/taq_self_response'
-                + f'_year_responses_physical_data_{year}_{tick}.pickle', 'rb'))
+            taus_tick, response = taq_data_tools_avg_responses_physical \
+                .taq_response_lags_data(pickle.load(open(
+                    f'../../taq_data/responses_physical_data_{year}/taq_self'
+                    + f'_response_year_responses_physical_data/taq_self'
+                    + f'_response_year_responses_physical_data_{year}_{tick}'
+                    + f'.pickle', 'rb')))
+
+            if (taus is None):
+                taus = taus_tick
+
+            elif (not np.array_equal(taus, taus_tick)):
+                raise ValueError(f'The time lags of {tick} are different')
+
+            responses_group.append(response)
+
+        responses.append(responses_group)
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    results_avg = []
+
+    for responses_group in responses:
+        sum_response = np.zeros(len(taus))
 
+        for response in responses_group:
             sum_response += response
 
-        avg_response = sum_response / len(ticker)
+        avg_response = sum_response / len(responses_group)
         results_avg.append(avg_response)
 
     results_avg = tuple(results_avg)
 
     # Saving data
     taq_data_tools_avg_responses_physical \
-        .taq_save_data(function_name, results_avg, '', '', year, '', '')
+        .taq_save_data(function_name, (taus, results_avg), '', '', year, '',
+                       '')
 
     return results_avg
 
@@ -49,18 +49,21 @@ def taq_self_response_year_avg_responses_physical_plot(year):
                                             '')
 
         # Load data
-        resp_g1, resp_g2, resp_g3, resp_g4, resp_g5 = pickle.load(open(
-            f'../../taq_data/avg_responses_physical_data_{year}/taq_self'
-            + f'_response_year_avg_responses_physical_data/taq_self_response'
-            + f'_year_avg_responses_physical_data_{year}_.pickle', 'rb'))
+        taus, (resp_g1, resp_g2, resp_g3, resp_g4, resp_g5) = \
+            taq_data_tools_avg_responses_physical \
+            .taq_response_lags_data(pickle.load(open(
+                f'../../taq_data/avg_responses_physical_data_{year}/taq_self'
+                + f'_response_year_avg_responses_physical_data/taq_self'
+                + f'_response_year_avg_responses_physical_data_{year}_.pickle',
+                'rb')))
 
         figure = plt.figure(figsize=(16, 9))
 
-        plt.semilogx(resp_g1, linewidth=5, label=f'Group 1')
-        plt.semilogx(resp_g2, linewidth=5, label=f'Group 2')
-        plt.semilogx(resp_g3, linewidth=5, label=f'Group 3')
-        plt.semilogx(resp_g4, linewidth=5, label=f'Group 4')
-        plt.semilogx(resp_g5, linewidth=5, label=f'Group 5')
+        plt.semilogx(taus, resp_g1, linewidth=5, label=f'Group 1')
+        plt.semilogx(taus, resp_g2, linewidth=5, label=f'Group 2')
+        plt.semilogx(taus, resp_g3, linewidth=5, label=f'Group 3')
+        plt.semilogx(taus, resp_g4, linewidth=5, label=f'Group 4')
+        plt.semilogx(taus, resp_g5, linewidth=5, label=f'Group 5')
 
         plt.legend(loc='best', fontsize=25)
         plt.title('Self-response', fontsize=40)
@@ -68,7 +71,7 @@ def taq_self_response_year_avg_responses_physical_plot(year):
         plt.ylabel(r'$R_{ii}(\tau)$', fontsize=35)
         plt.xticks(fontsize=25)
         plt.yticks(fontsize=25)
-        plt.xlim(1, 10000)
+        plt.xlim(taus[0], taus[-1])
         # plt.ylim(13 * 10 ** -5, 16 * 10 ** -5)
         plt.ticklabel_format(style='sci', axis='y', scilimits=(0, 0))
         plt.grid(True)
@@ -9,6 +9,7 @@ This script requires the following modules:
     * numpy
     * os
     * pandas
+    * pandas.tseries.holiday
     * pickle
 
 The module contains the following functions:
@@ -18,7 +19,13 @@ The module contains the following functions:
     * taq_function_header_print_plot - prints info about the plot.
     * taq_start_folders - creates folders to save data and plots.
     * taq_initial_data - takes the initial values for the analysis.
-    * taq_business_days - creates a list of week days for a year.
+    * taq_holidays_data - creates a list of the NYSE holidays for a year.
+    * taq_early_closes_data - creates a list of the NYSE early closes for a
+      year.
+    * taq_market_window_data - gets the market time of a trading day.
+    * taq_business_days - creates a list of the trading days for a year.
+    * taq_response_lags_data - gets the time lags and the values of a saved
+      response.
     * main - the main function of the script.
 
 .. moduleauthor:: Juan Camilo Henao Londono <www.github.com/juanhenao21>
@@ -31,6 +38,10 @@ from matplotlib import pyplot as plt
 import numpy as np
 import os
 import pandas as pd
+from pandas.tseries.holiday import (GoodFriday, Holiday, USLaborDay,
+                                    USMartinLutherKingJr, USMemorialDay,
+                                    USPresidentsDay, USThanksgivingDay,
+                                    nearest_workday, sunday_to_monday)
 import pickle
 
 # -----------------------------------------------------------------------------
@@ -259,10 +270,108 @@ def taq_initial_data():
 # -----------------------------------------------------------------------------
 
 
-def taq_bussiness_days(year):
+def taq_holidays_data(year):
+    """Generates a list with the dates of the NYSE holidays in a year.
+
+    The holidays that fall on a weekend are observed on the nearest week day,
+    except the New Year's Day on a Saturday, which is not observed. The
+    special closures of the exchange are included.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: list.
+    """
+
+    init_date = f'01/01/{year}'
+    last_date = f'12/31/{year}'
+
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01',
+                observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4,
+                observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas Day', month=12, day=25, observance=nearest_workday)
+    ]
+
+    # Closures of the exchange out of the regular holidays
+    special_closures = ['2001-09-11', '2001-09-12', '2001-09-13',
+                        '2001-09-14', '2004-06-11', '2007-01-02',
+                        '2012-10-29', '2012-10-30', '2018-12-05',
+                        '2025-01-09']
+
+    holidays = [pd.DatetimeIndex(rule.dates(init_date, last_date))
+                for rule in rules]
+    date_list = pd.DatetimeIndex([]).append(holidays) \
+        .strftime('%Y-%m-%d').tolist()
+    date_list += [date for date in special_closures
+                  if date.startswith(f'{year}-')]
+
+    return sorted(date_list)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_early_closes_data(year):
+    """Generates a list with the dates of the NYSE early closes in a year.
+
+    The exchange closes at 13h00 on the 3rd of July, the day after
+    Thanksgiving and the Christmas Eve, when they are trading days.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: list.
+    """
+
+    holidays = taq_holidays_data(year)
+
+    thanksgiving = USThanksgivingDay.dates(f'01/01/{year}', f'12/31/{year}')
+    date_list = [f'{year}-07-03', f'{year}-12-24'] \
+        + [(day + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+           for day in thanksgiving]
+
+    return sorted([date for date in date_list
+                   if pd.Timestamp(date).weekday() < 5
+                   and date not in holidays])
+
+# -----------------------------------------------------------------------------
+
+
+def taq_market_window_data(date):
+    """Gets the market time of a trading day.
+
+    The market time is from 9h30 (34200 s) to 16h00 (57600 s), or to 13h00
+    (46800 s) in the early closes.
+
+    :param date: string with the date of the data to be extracted
+     (i.e. '2008-01-02').
+    :return: tuple -- The function returns a tuple with the open and close
+     times in seconds.
+    """
+
+    if (date in taq_early_closes_data(date.split('-')[0])):
+        return (34200, 46800)
+
+    else:
+        return (34200, 57600)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_bussiness_days(year, data_dates=None):
     """Generates a list with the dates of the bussiness days in a year
 
+    The week days that are NYSE holidays are not used. With data_dates only
+    the days with data are used.
+
     :param year: string of the year to be analyzed (i.e '2008').
+    :param data_dates: list of strings with the dates with data
+     (i.e. ['2008-01-02', '2008-01-03']). Default None uses all the trading
+     days.
     :return: list.
     """
 
@@ -274,11 +383,39 @@ def taq_bussiness_days(year):
     dt_df = dt.to_frame(index=False)
     date_list = dt_df[0].astype(str).tolist()
 
+    # Remove the holidays
+    holidays = taq_holidays_data(year)
+    date_list = [date for date in date_list if date not in holidays]
+
+    if (data_dates is not None):
+        data_dates = set(data_dates)
+        date_list = [date for date in date_list if date in data_dates]
+
     return date_list
 
 # -----------------------------------------------------------------------------
 
 
+def taq_response_lags_data(data):
+    """Gets the time lags and the values of a saved response.
+
+    The responses are saved with their time lags as a tuple. The responses
+    saved before have only the values of all the time lags from 1.
+
+    :param data: tuple with the time lags and the values of a response or
+     numpy array with the values of a response.
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    if (isinstance(data, tuple) and len(data) == 2):
+        return data
+
+    else:
+        return (np.arange(1, np.shape(data)[-1] + 1), data)
+
+# -----------------------------------------------------------------------------
+
+
 def main():
     """The main function of the script.
 
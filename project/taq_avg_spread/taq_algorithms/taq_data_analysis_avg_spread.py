@@ -4,7 +4,6 @@ The functions in the module analyze the statistics from the NASDAQ stock
 market and compute the average spread of the stocks.
 
 This script requires the following modules:
-    * itertools.product
     * multiprocessing
     * numpy
     * pandas
@@ -14,6 +13,8 @@ This script requires the following modules:
 The module contains the following functions:
     * taq_quotes_trades_day_avg_spread_data - statistics of quotes and trades
       for a day.
+    * taq_quotes_trades_task_avg_spread_data - runs a task of the year
+      statistics.
     * taq_quotes_trades_year_avg_spread_data - statistics of quotes and trades
       for a year.
     * main - the main function of the script.
@@ -24,7 +25,6 @@ The module contains the following functions:
 # ----------------------------------------------------------------------------
 # Modules
 
-from itertools import product as iprod
 import multiprocessing as mp
 import numpy as np
 import pandas as pd
@@ -55,12 +55,10 @@ def taq_quotes_trades_day_avg_spread_data(ticker, date):
 
     try:
         # Load data
-        data_quotes = pd.read_hdf(f'../../taq_data/hdf5_daily_data_{year}/taq'
-                              + f'_{ticker}_quotes_{date}.h5', key='/quotes',
-                              columns=['Bid', 'Ask'])
-        data_trades = pd.read_hdf(f'../../taq_data/hdf5_daily_data_{year}/taq'
-                              + f'_{ticker}_trades_{date}.h5', key='/trades',
-                              columns=['Ask'])
+        data_quotes = taq_data_tools_avg_spread \
+            .taq_read_data(ticker, 'quotes', date, columns=['Bid', 'Ask'])
+        data_trades = taq_data_tools_avg_spread \
+            .taq_read_data(ticker, 'trades', date, columns=['Ask'])
 
         # Some files are corrupted, so there are some zero values that does not
         # have sense
@@ -86,21 +84,44 @@ def taq_quotes_trades_day_avg_spread_data(ticker, date):
 # ----------------------------------------------------------------------------
 
 
-def taq_quotes_trades_year_avg_spread_data(tickers, year):
+def taq_quotes_trades_task_avg_spread_data(task):
+    """Runs a task of the year statistics.
+
+    :param task: tuple with the string abbreviation of the stock, the index
+     of the day and the string of the date (i.e. ('AAPL', 0, '2008-01-02')).
+    :return: tuple -- The function returns a tuple with the ticker, the index
+     of the day and the statistics of the day.
+    """
+
+    ticker, d_idx, date = task
+
+    return (ticker, d_idx,
+            taq_quotes_trades_day_avg_spread_data(ticker, date))
+
+# ----------------------------------------------------------------------------
+
+
+def taq_quotes_trades_year_avg_spread_data(tickers, year, chunksize=8):
     """Obtain the quotes and trades statistics for a year.
 
     Using the taq_quotes_trades_day_avg_spread_data function computes the
     statistics of the average spread, number of quotes and number of trades
-    for a year.
+    for a year. The (ticker, day) tasks of all the tickers are dispatched in
+    chunks to one pool of workers for the whole run. The days with the
+    statistics saved by the extraction use them without reading the data.
 
     :param tickers: list of the string abbreviation of the stocks to be
      analyzed (i.e. ['AAPL', 'MSFT']).
     :param year: string of the year to be analyzed (i.e '2016').
+    :param chunksize: integer with the number of tasks sent to a worker at
+     once (i.e. 8).
     :return: None -- The function saves the data in a file and does not return
      a value.
     """
 
     function_name = taq_quotes_trades_year_avg_spread_data.__name__
+    taq_data_tools_avg_spread \
+        .taq_function_header_print_data(function_name, '', '', year, '', '')
 
     # Pandas DataFrame to store the data
     spread_stats = pd.DataFrame(
@@ -108,24 +129,48 @@ def taq_quotes_trades_year_avg_spread_data(tickers, year):
 
     dates = taq_data_tools_avg_spread.taq_bussiness_days(year)
 
-    for idx, ticker in enumerate(tickers):
-
-        taq_data_tools_avg_spread \
-            .taq_function_header_print_data(function_name, ticker, ticker,
-                                             year, '', '')
-
-        stat = []
-        args_prod = iprod([ticker], dates)
+    # Days with data of every ticker in the catalog
+    ticker_days = taq_data_tools_avg_spread.taq_catalog_ticker_days_data(year)
+    if (ticker_days is None):
+        ticker_dates = {ticker: set(dates) for ticker in tickers}
+    else:
+        ticker_dates = {ticker: set(ticker_days.get(ticker, []))
+                        for ticker in tickers}
+
+    # Statistics of every day (number quotes, trades and avg spread) for
+    # every ticker. The days without data are not used in the average
+    stat = {ticker: np.full((len(dates), 3), np.nan) for ticker in tickers}
+
+    # Statistics saved by the extraction. The data of these days is not read
+    # again, the remaining days are computed from the stored data
+    daily_stats = taq_data_tools_avg_spread.taq_daily_stats_data(year)
+    if (daily_stats is not None):
+        d_pos = {date: d_idx for d_idx, date in enumerate(dates)}
+        daily_stats = daily_stats[daily_stats['Ticker'].isin(tickers)
+                                  & daily_stats['Date'].isin(d_pos)]
+
+        for ticker, stats in daily_stats.groupby('Ticker'):
+            stat[ticker][stats['Date'].map(d_pos).to_numpy()] = \
+                stats[['Num_Quotes', 'Num_Trades', 'Avg_Spread']].to_numpy()
+            ticker_dates[ticker] -= set(stats['Date'])
+
+    tasks = [(ticker, d_idx, date) for ticker in tickers
+             for d_idx, date in enumerate(dates)
+             if date in ticker_dates[ticker]]
+
+    # Parallel computation of the statistics of all the tickers
+    with mp.Pool(processes=taq_data_tools_avg_spread
+                 .taq_workers_data()) as pool:
+        for ticker, d_idx, stat_day in pool.imap_unordered(
+                taq_quotes_trades_task_avg_spread_data, tasks,
+                chunksize=chunksize):
+            stat[ticker][d_idx] = stat_day
 
-        # Parallel computation of the statistics. Every result is appended to
-        # a list
-        with mp.Pool(processes=mp.cpu_count()) as pool:
-            stat.append(pool.starmap(taq_quotes_trades_day_avg_spread_data,
-                        args_prod))
+    for idx, ticker in enumerate(tickers):
 
         # To obtain the average of the year, I average all the results of the
         # corresponding values (number quotes, trades and avg spread)
-        stat_year = np.nanmean(stat[0], axis=0)
+        stat_year = np.nanmean(stat[ticker], axis=0)
 
         spread_stats.loc[idx] = [ticker] + list(stat_year)
 
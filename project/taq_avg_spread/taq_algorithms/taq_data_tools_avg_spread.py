@@ -6,9 +6,11 @@ in the modules that use them.
 
 This script requires the following modules:
     * matplotlib
+    * multiprocessing
     * numpy
     * os
     * pandas
+    * pandas.tseries.holiday
     * pickle
 
 The module contains the following functions:
@@ -16,8 +18,24 @@ The module contains the following functions:
     * taq_function_header_print_data - prints info about the function running.
     * taq_start_folders - creates folders to save data and plots.
     * taq_initial_data - takes the initial values for the analysis.
-    * taq_business_days - creates a list of week days for a year.
+    * taq_holidays_data - creates a list of the NYSE holidays for a year.
+    * taq_early_closes_data - creates a list of the NYSE early closes for a
+      year.
+    * taq_market_window_data - gets the market time of a trading day.
+    * taq_business_days - creates a list of the trading days for a year.
     * taq_get_tickers_data - gets the available ticker names.
+    * taq_catalog_data - loads the catalog of the extracted data.
+    * taq_catalog_days_data - gets the complete days in the catalog.
+    * taq_catalog_ticker_days_data - gets the complete days of every
+      ticker in the catalog.
+    * taq_catalog_tickers_data - gets the tickers in the catalog.
+    * taq_read_data - reads the TAQ data of a ticker in a day.
+    * taq_daily_stats_data - loads the statistics of every day saved by the
+      extraction.
+    * taq_memory_available_data - gets the available memory of the node.
+    * taq_memory_budget_data - gets the memory budget of a stage.
+    * taq_workers_data - gets the number of workers that fit in a memory
+      budget.
     * main - the main function of the script.
 
 .. moduleauthor:: Juan Camilo Henao Londono <www.github.com/juanhenao21>
@@ -27,11 +45,21 @@ The module contains the following functions:
 # Modules
 
 from matplotlib import pyplot as plt
+import multiprocessing as mp
 import numpy as np
 import os
 import pandas as pd
+from pandas.tseries.holiday import (GoodFriday, Holiday, USLaborDay,
+                                    USMartinLutherKingJr, USMemorialDay,
+                                    USPresidentsDay, USThanksgivingDay,
+                                    nearest_workday, sunday_to_monday)
 import pickle
 
+# Fraction of the available memory used by default by a stage
+__memory_fraction__ = 0.8
+# Bytes of memory of a worker before it runs a task
+__worker_memory__ = 2 ** 28
+
 # -----------------------------------------------------------------------------
 
 
@@ -173,10 +201,108 @@ def taq_initial_data():
 # -----------------------------------------------------------------------------
 
 
-def taq_bussiness_days(year):
+def taq_holidays_data(year):
+    """Generates a list with the dates of the NYSE holidays in a year.
+
+    The holidays that fall on a weekend are observed on the nearest week day,
+    except the New Year's Day on a Saturday, which is not observed. The
+    special closures of the exchange are included.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: list.
+    """
+
+    init_date = f'01/01/{year}'
+    last_date = f'12/31/{year}'
+
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01',
+                observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4,
+                observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas Day', month=12, day=25, observance=nearest_workday)
+    ]
+
+    # Closures of the exchange out of the regular holidays
+    special_closures = ['2001-09-11', '2001-09-12', '2001-09-13',
+                        '2001-09-14', '2004-06-11', '2007-01-02',
+                        '2012-10-29', '2012-10-30', '2018-12-05',
+                        '2025-01-09']
+
+    holidays = [pd.DatetimeIndex(rule.dates(init_date, last_date))
+                for rule in rules]
+    date_list = pd.DatetimeIndex([]).append(holidays) \
+        .strftime('%Y-%m-%d').tolist()
+    date_list += [date for date in special_closures
+                  if date.startswith(f'{year}-')]
+
+    return sorted(date_list)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_early_closes_data(year):
+    """Generates a list with the dates of the NYSE early closes in a year.
+
+    The exchange closes at 13h00 on the 3rd of July, the day after
+    Thanksgiving and the Christmas Eve, when they are trading days.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: list.
+    """
+
+    holidays = taq_holidays_data(year)
+
+    thanksgiving = USThanksgivingDay.dates(f'01/01/{year}', f'12/31/{year}')
+    date_list = [f'{year}-07-03', f'{year}-12-24'] \
+        + [(day + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+           for day in thanksgiving]
+
+    return sorted([date for date in date_list
+                   if pd.Timestamp(date).weekday() < 5
+                   and date not in holidays])
+
+# ----------------------------------------------------------------------------
+
+
+def taq_market_window_data(date):
+    """Gets the market time of a trading day.
+
+    The market time is from 9h30 (34200 s) to 16h00 (57600 s), or to 13h00
+    (46800 s) in the early closes.
+
+    :param date: string with the date of the data to be extracted
+     (i.e. '2008-01-02').
+    :return: tuple -- The function returns a tuple with the open and close
+     times in seconds.
+    """
+
+    if (date in taq_early_closes_data(date.split('-')[0])):
+        return (34200, 46800)
+
+    else:
+        return (34200, 57600)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_bussiness_days(year, data_dates=None):
     """Generates a list with the dates of the bussiness days in a year
 
+    The week days that are NYSE holidays are not used. With data_dates only
+    the days with data are used.
+
     :param year: string of the year to be analyzed (i.e '2008').
+    :param data_dates: list of strings with the dates with data
+     (i.e. ['2008-01-02', '2008-01-03']). Default None uses all the trading
+     days.
     :return: list.
     """
 
@@ -188,6 +314,14 @@ def taq_bussiness_days(year):
     dt_df = dt.to_frame(index=False)
     date_list = dt_df[0].astype(str).tolist()
 
+    # Remove the holidays
+    holidays = taq_holidays_data(year)
+    date_list = [date for date in date_list if date not in holidays]
+
+    if (data_dates is not None):
+        data_dates = set(data_dates)
+        date_list = [date for date in date_list if date in data_dates]
+
     return date_list
 
 # ----------------------------------------------------------------------------
@@ -204,7 +338,16 @@ def taq_get_tickers_data(year):
     abs_path = os.path.abspath(__file__).split('/')
     # Take the path from the start to the project folder
     root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+
+    # Using the catalog of the extracted data
+    tickers = taq_catalog_tickers_data(year)
+    if (tickers is not None):
+        return tickers
+
     f_path = root_path + f'/taq_data/hdf5_daily_data_{year}'
+    if (not os.path.exists(f_path)):
+        # Using HDF5 year files
+        f_path = root_path + f'/taq_data/hdf5_year_data_{year}'
     files = os.listdir(f_path)
 
     tickers = []
@@ -220,6 +363,273 @@ def taq_get_tickers_data(year):
 # -----------------------------------------------------------------------------
 
 
+def taq_catalog_data(year):
+    """Loads the catalog of the extracted data of a year.
+
+    The catalog has an entry for every ticker, type and day extracted, with
+    the path of the HDF5 file, the number of rows, the size in bytes of the
+    file and the time range of the day.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: DataFrame -- The function returns a pandas DataFrame, or None if
+     there is no catalog for the year.
+    """
+
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+    f_file = root_path + f'/taq_data/taq_catalog_{year}.csv'
+
+    if (not os.path.isfile(f_file)):
+        return None
+
+    return pd.read_csv(f_file, dtype={'Ticker': str, 'Date': str})
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_days_data(year, tickers=None):
+    """Gets the complete days in the catalog of a year.
+
+    A day is complete for a ticker when it has quotes and trades data.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :param tickers: list of the string abbreviation of the stocks
+     (i.e. ['AAPL', 'MSFT']). The days must be complete for all the tickers.
+     Default None uses the days complete for any ticker.
+    :return: list -- The function returns a sorted list with the dates, or
+     None if there is no catalog for the year.
+    """
+
+    catalog = taq_catalog_data(year)
+
+    if (catalog is None):
+        return None
+
+    if (tickers is not None):
+        catalog = catalog[catalog['Ticker'].isin(tickers)]
+
+    types = catalog.groupby(['Ticker', 'Date'])['Type'].nunique()
+    complete = types[types == 2].reset_index()
+
+    if (tickers is None):
+        return sorted(complete['Date'].unique())
+
+    counts = complete.groupby('Date')['Ticker'].nunique()
+
+    return sorted(counts[counts == len(set(tickers))].index)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_ticker_days_data(year):
+    """Gets the complete days of every ticker in the catalog of a year.
+
+    A day is complete for a ticker when it has quotes and trades data.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: dict -- The function returns a dictionary with the tickers as
+     keys and sorted lists with the dates as values, or None if there is no
+     catalog for the year.
+    """
+
+    catalog = taq_catalog_data(year)
+
+    if (catalog is None):
+        return None
+
+    types = catalog.groupby(['Ticker', 'Date'])['Type'].nunique()
+    complete = types[types == 2].reset_index()
+
+    return {ticker: sorted(days['Date'])
+            for ticker, days in complete.groupby('Ticker')}
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_tickers_data(year, complete=False):
+    """Gets the tickers in the catalog of a year.
+
+    A ticker is complete when it has quotes and trades data for every trading
+    day of the year.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :param complete: bool to return only the complete tickers. Default False
+     returns all the tickers in the catalog.
+    :return: list -- The function returns a sorted list with the tickers, or
+     None if there is no catalog for the year.
+    """
+
+    catalog = taq_catalog_data(year)
+
+    if (catalog is None):
+        return None
+
+    if (not complete):
+        return sorted(catalog['Ticker'].unique())
+
+    days = taq_bussiness_days(year)
+    catalog = catalog[catalog['Date'].isin(days)]
+    types = catalog.groupby(['Ticker', 'Date'])['Type'].nunique()
+    counts = (types == 2).groupby(level='Ticker').sum()
+
+    return sorted(counts[counts == len(days)].index)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_read_data(ticker, type, date, columns=None):
+    """Reads the TAQ data of a ticker in a day.
+
+    Reads the daily HDF5 file of the day if it exists. Otherwise slices the
+    row range of the day from the HDF5 file of the ticker and year, using its
+    date index.
+
+    :param ticker: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param type: string with the type of the data to be read
+     (i.e. 'trades' or 'quotes').
+    :param date: string with the date of the data to be read
+     (i.e. '2008-01-02').
+    :param columns: list of the columns to be read (i.e. ['Bid', 'Ask']).
+     Default None reads all the columns.
+    :return: DataFrame -- The function returns a pandas DataFrame. Raises
+     FileNotFoundError if there is no data for the day.
+    """
+
+    year = date.split('-')[0]
+
+    # The module is used in other folders, so it is necessary to use
+    # absolute paths instead of relative paths
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+
+    daily_file = root_path + f'/taq_data/hdf5_daily_data_{year}/taq_{ticker}' \
+        + f'_{type}_{date}.h5'
+    year_file = root_path + f'/taq_data/hdf5_year_data_{year}/taq_{ticker}' \
+        + f'_{type}_{year}.h5'
+
+    if (os.path.isfile(daily_file) or not os.path.isfile(year_file)):
+        return pd.read_hdf(daily_file, key=f'/{type}', columns=columns)
+
+    with pd.HDFStore(year_file, mode='r') as store:
+
+        date_index = store.select('date_index')
+        date_index = date_index[date_index['Date'] == date]
+
+        if (date_index.empty):
+            raise FileNotFoundError(f'No {type} data for {ticker} the {date} '
+                                    + f'in {year_file}')
+
+        data = pd.concat([store.select(type, start=start, stop=stop,
+                                       columns=columns)
+                          for start, stop in zip(date_index['Start'],
+                                                 date_index['Stop'])])
+
+    return data
+
+# -----------------------------------------------------------------------------
+
+
+def taq_daily_stats_data(year):
+    """Loads the statistics of every day saved by the extraction.
+
+    The taq_quotes_trades_physical_year_data function of the extraction saves
+    the number of quotes, number of trades and average spread of every ticker
+    and day when it reads the data.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: DataFrame -- The function returns a pandas DataFrame, or None if
+     the statistics were not saved.
+    """
+
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+    function_name = 'taq_quotes_trades_physical_data'
+    f_file = root_path + f'/taq_data/extract_data_{year}/{function_name}/' \
+        + f'{function_name}_stats_{year}.csv'
+
+    if (not os.path.isfile(f_file)):
+        return None
+
+    return pd.read_csv(f_file, dtype={'Ticker': str, 'Date': str})
+
+# -----------------------------------------------------------------------------
+
+
+def taq_memory_available_data():
+    """Gets the available memory of the node.
+
+    Reads the memory that can be used without swapping (MemAvailable) from
+    /proc/meminfo. When the file does not exist, the free physical memory is
+    used.
+
+    :return: int -- The function returns the available memory in bytes.
+    """
+
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if (line.startswith('MemAvailable:')):
+                    # The value is in kB
+                    return int(line.split()[1]) * 1024
+
+    except FileNotFoundError:
+        pass
+
+    return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+
+# -----------------------------------------------------------------------------
+
+
+def taq_memory_budget_data(memory=None):
+    """Gets the memory budget of a stage.
+
+    :param memory: integer with the memory budget in bytes. Default None uses
+     a fraction of the available memory of the node.
+    :return: int -- The function returns the memory budget in bytes.
+    """
+
+    if (memory is None):
+        memory = int(__memory_fraction__ * taq_memory_available_data())
+
+    return memory
+
+# -----------------------------------------------------------------------------
+
+
+def taq_workers_data(task_memory=__worker_memory__, memory=None,
+                     tasks=None):
+    """Gets the number of workers that fit in a memory budget.
+
+    The number of workers is the number of CPUs, limited by the number of
+    tasks and by the number of tasks that fit in the memory budget. There is
+    always at least one worker.
+
+    :param task_memory: integer with the peak memory of a worker running a
+     task in bytes.
+    :param memory: integer with the memory budget in bytes. Default None uses
+     a fraction of the available memory of the node.
+    :param tasks: integer with the number of tasks. Default None does not
+     limit the number of workers.
+    :return: int -- The function returns the number of workers.
+    """
+
+    workers = min(mp.cpu_count(),
+                  taq_memory_budget_data(memory) // max(task_memory, 1))
+    if (tasks is not None):
+        workers = min(workers, tasks)
+
+    return max(int(workers), 1)
+
+# -----------------------------------------------------------------------------
+
+
 def main():
     """The main function of the script.
 
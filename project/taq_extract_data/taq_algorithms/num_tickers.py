@@ -1,21 +1,20 @@
 # Chech number of tickers
 
-import subprocess
-import os
+import taq_data_tools_extract
 
-os.chdir('../../taq_data/hdf5_daily_data_2008/')
-files = os.listdir()
+year = '2008'
 
-f_ticks = set(map(lambda x: x.split('_')[1], files))
-print(len(f_ticks))
+# Build the catalog once for the data extracted without it
+if (taq_data_tools_extract.taq_catalog_data(year) is None):
+    taq_data_tools_extract.taq_catalog_scan_data(year)
 
-tickers = []
+f_ticks = taq_data_tools_extract.taq_catalog_tickers_data(year)
+print(len(f_ticks))
 
-for f_tick in f_ticks:
-    num = int(subprocess.check_output(f"find . -iname '*_{f_tick}_'* | wc -l", shell=True))
-    if (num != 506):
-        tickers.append(f_tick)
+# Tickers without quotes and trades for every trading day
+complete = taq_data_tools_extract.taq_catalog_tickers_data(year, complete=True)
+tickers = set(f_ticks) - set(complete)
 
-print(set(tickers))
+print(tickers)
 
-# 'MSI', 'LO', 'DPS', 'ABI', 'BRL', 'L', 'FTR', 'PM', 'BUD', 'WM', 'AW', 'SNI', 'DISCA', 'MWW', 'LIFE', 'V', 'WB'
\ No newline at end of file
+# 'MSI', 'LO', 'DPS', 'ABI', 'BRL', 'L', 'FTR', 'PM', 'BUD', 'WM', 'AW', 'SNI', 'DISCA', 'MWW', 'LIFE', 'V', 'WB'
@@ -11,16 +11,35 @@ This script requires the following modules:
     * pandas
     * pickle
     * subprocess
+    * tempfile
+    * time
     * taq_data_tools_extract
 
 The module contains the following functions:
     * taq_build_from_scratch - extract data to daily CSV files.
+    * taq_data_chunks_extract - reads the data of a year in chunks.
+    * taq_data_write_extract - saves the data of a year read in chunks.
     * taq_data_extract - extracts the data for every day in a year.
     * taq_daily_data_extract - parallelize the taq_data_extract function.
+    * taq_parser_benchmark_extract - measures the throughput of the CSV
+      parsers.
     * taq_midpoint_trade_data - computes the midpoint price of every trade.
+    * taq_last_quote_physical_data - selects the last quote of every second.
     * taq_midpoint_physical_data - computes the midpoint price of every second.
+    * taq_trade_signs_classification_data - classifies the trades with Eq. 1.
     * taq_trade_signs_trade_data - computes the trade signs of every trade.
+    * taq_trade_signs_seconds_data - aggregates the trades of every second.
     * taq_trade_signs_physical_data - computes the trade signs of every second.
+    * taq_quotes_trades_physical_data - computes the physical time series and
+      statistics of a day.
+    * taq_quotes_trades_physical_task_data - runs a task of the physical
+      time series and statistics of a year.
+    * taq_quotes_trades_stage_data - gets the stage of the physical time
+      series of a window in the manifest.
+    * taq_quotes_trades_stats_save_data - saves the statistics of the
+      finished days.
+    * taq_quotes_trades_physical_year_data - computes the physical time
+      series and statistics of a year.
     * main - the main function of the script.
 
 .. moduleauthor:: Juan Camilo Henao Londono <www.github.com/juanhenao21>
@@ -36,22 +55,38 @@ import os
 import pandas as pd
 import pickle
 import subprocess
+import tempfile
+import time
 
 import taq_data_tools_extract
 
+# Bytes of memory of a row of a chunk while it is parsed and saved
+__row_memory__ = 200
+
 # -----------------------------------------------------------------------------
 
 
-def taq_build_from_scratch(tickers, year):
+def taq_build_from_scratch(tickers, year, stream=False, storage='daily',
+                           memory=None):
     """Extracts data to year CSV files.
 
     The original data must be decompressed. The function runs a script in
     C++ to decompress and then extract and filter the data for a year in CSV
     files.
 
+    With stream the output of the decompression is parsed and saved in the
+    HDF5 storage while it is written, so the year CSV files are not used and
+    the original data is kept.
+
     :param tickers: list of the string abbreviation of the stocks to be
      analyzed (i.e. ['AAPL', 'MSFT']).
     :param year: string of the year to be analyzed (i.e '2016').
+    :param stream: bool to extract the data without the CSV files (default
+     False).
+    :param storage: string with the storage backend used with stream,
+     'daily' (default) or 'year'.
+    :param memory: integer with the memory budget in bytes. Default None uses
+     a fraction of the available memory of the node.
     :return: None -- The function saves the data in a file and does not return
      a value.
     """
@@ -71,6 +106,20 @@ def taq_build_from_scratch(tickers, year):
                   + f'csv files')
             tickers_rm.remove(ticker)
 
+    # Check if the tickers were already extracted and their original files
+    # did not change
+    units = list(iprod(tickers_rm, ['quotes', 'trades'], [year]))
+    inputs = [[f'../../taq_data/original_year_data_{year}/{ticker}_{year}'
+               + f'_NASDAQ.{type}'] for ticker, type, _ in units]
+    pending = set(ticker for ticker, _, _ in taq_data_tools_extract
+                  .taq_manifest_pending_data(year, 'taq_data_extract', units,
+                                             inputs))
+
+    for ticker in tickers_rm[:]:
+        if (ticker not in pending):
+            print(f'The ticker {ticker} was already extracted')
+            tickers_rm.remove(ticker)
+
     if (len(tickers_rm)):
         # Compile and run the C++ script to decompress
         os.chdir(f'../../taq_data/decompress_original_data_{year}/'
@@ -86,16 +135,24 @@ def taq_build_from_scratch(tickers, year):
         os.system(f'mv decompress.out ../original_year_data_{year}/')
         os.chdir(f'../original_year_data_{year}')
 
+        if (stream):
+            # Decompress straight into the HDF5 storage
+            taq_daily_data_extract(tickers_rm, year, storage=storage,
+                                   stream=True, memory=memory)
+            subprocess.call('rm decompress.out', shell=True)
+
+            return None
+
         print('Extracting quotes')
         # Parallel computing
-        with mp.Pool(processes=mp.cpu_count()) as pool:
-            pool.starmap(taq_data_tools_extract.taq_decompress,
-                         iprod(tickers_rm, [year], ['quotes']))
+        list(taq_data_tools_extract.taq_pool_imap_data(
+            taq_data_tools_extract.taq_decompress,
+            iprod(tickers_rm, [year], ['quotes']), memory=memory))
         print('Extracting trades')
         # Parallel computing
-        with mp.Pool(processes=mp.cpu_count()) as pool:
-            pool.starmap(taq_data_tools_extract.taq_decompress,
-                         iprod(tickers_rm, [year], ['trades']))
+        list(taq_data_tools_extract.taq_pool_imap_data(
+            taq_data_tools_extract.taq_decompress,
+            iprod(tickers_rm, [year], ['trades']), memory=memory))
 
         subprocess.call('rm decompress.out', shell=True)
         subprocess.call(f'mkdir ../csv_year_data_{year}/', shell=True)
@@ -110,18 +167,307 @@ def taq_build_from_scratch(tickers, year):
 # -----------------------------------------------------------------------------
 
 
-def taq_data_extract(ticker, type, year):
+def taq_data_chunks_extract(source, type, parser='pandas',
+                            chunksize=10 ** 7, compact=True):
+    """Reads the trades and quotes data of a year in chunks.
+
+    The 'pandas' parser reads the whitespace separated columns in one thread.
+    The 'arrow' parser uses the multithreaded CSV reader of pyarrow, that
+    must be installed, and needs the columns separated by one space, as they
+    are written by the decompression.
+
+    :param source: string with the path of the CSV file or file object with
+     the decompressed data.
+    :param type: string with the type of the data to be read
+     (i.e. 'trades' or 'quotes').
+    :param parser: string with the CSV parser, 'pandas' (default) or
+     'arrow'.
+    :param chunksize: integer with the number of rows of a chunk with the
+     'pandas' parser (i.e. 10 ** 7). The 'arrow' parser reads blocks of about
+     the same size in bytes.
+    :param compact: bool to use int32 for the times, prices and volumes
+     (default True) instead of int64. Raises ValueError if a value does not
+     fit in int32.
+    :return: generator -- The function yields pandas DataFrames indexed by
+     date with the time, prices and volumes of the data.
+    """
+
+    df_type = {'quotes': {
+                    'Date': 'str',
+                    'Time': 'int',
+                    'Bid': 'int',
+                    'Ask': 'int',
+                    'Vol_Bid': 'int',
+                    'Vol_Ask': 'int',
+                    'Mode': 'int',
+                    'Cond': 'str',
+                },
+               'trades': {
+                    'Date': 'str',
+                    'Time': 'int',
+                    'Ask': 'int',
+                    'Vol_Ask': 'int',
+                    'Mode': 'int',
+                    'Corr': 'int',
+                    'Cond': 'str',
+                }}
+
+    col_names = {'quotes': ['Date', 'Time', 'Bid', 'Ask', 'Vol_Bid',
+                            'Vol_Ask', 'Mode', 'Cond'],
+                 'trades': ['Date', 'Time', 'Ask', 'Vol_Ask', 'Mode',
+                            'Corr', 'Cond']}
+
+    # Columns saved in the HDF5 files
+    columns = {'quotes': ['Date', 'Time', 'Bid', 'Ask', 'Vol_Bid',
+                          'Vol_Ask'],
+               'trades': ['Date', 'Time', 'Ask', 'Vol_Ask']}
+
+    if (parser == 'pandas'):
+        chunks = pd.read_csv(source, chunksize=chunksize, sep='\s+',
+                             names=col_names[type], dtype=df_type[type],
+                             usecols=columns[type], na_filter=False,
+                             low_memory=False)
+
+    elif (parser == 'arrow'):
+        # pyarrow is only needed with this parser
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+
+        arrow_type = {'str': pa.string(), 'int': pa.int64()}
+        reader = pa_csv.open_csv(
+            source,
+            read_options=pa_csv.ReadOptions(column_names=col_names[type],
+                                            block_size=40 * chunksize),
+            parse_options=pa_csv.ParseOptions(delimiter=' '),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={col: arrow_type[df_type[type][col]]
+                              for col in columns[type]},
+                include_columns=columns[type]))
+        chunks = (batch.to_pandas() for batch in reader)
+
+    else:
+        raise ValueError(f'Unknown parser {parser}')
+
+    for chunk in chunks:
+
+        chunk['Date'] = pd.to_datetime(chunk['Date'], format='%Y-%m-%d')
+        chunk.set_index('Date', inplace=True)
+
+        if (compact and not chunk.empty):
+            # The seconds, the prices in 1/10000 dollars and the volumes fit
+            # in int32
+            limits = np.iinfo(np.int32)
+            if (chunk.to_numpy().min() < limits.min
+                    or chunk.to_numpy().max() > limits.max):
+                raise ValueError('The data does not fit in int32, use '
+                                 + 'compact=False')
+            chunk = chunk.astype(np.int32)
+
+        yield chunk
+
+# ----------------------------------------------------------------------------
+
+
+def taq_data_write_extract(ticker, type, year, source, storage='daily',
+                           parser='pandas', compact=True, chunksize=10 ** 7):
+    """Saves the data of a year read in chunks.
+
+    Reads the trades and quotes (TAQ) data of a year in chunks from a CSV
+    file or from the output of the decompression, and saves the open market
+    time of every day in the HDF5 storage.
+
+    With the 'daily' storage every day is saved in its own HDF5 file. With the
+    'year' storage all the days are saved in one HDF5 file per ticker and
+    year, sorted by date, with a date index of the row range of every day, so
+    one day can be read with a single slice.
+
+    The data is written in .part files. The caller replaces the HDF5 files
+    with them once the source is known to be complete, so a truncated
+    source never replaces saved data. The .part files left by a crashed run
+    are written again, so the rows are never appended twice.
+
+    :param ticker: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param type: string with the type of the data to be extracted
+     (i.e. 'trades' or 'quotes').
+    :param year: string of the year to be analyzed (i.e. '2016').
+    :param source: string with the path of the CSV file or file object with
+     the decompressed data.
+    :param storage: string with the storage backend, 'daily' (default) or
+     'year'.
+    :param parser: string with the CSV parser, 'pandas' (default) or
+     'arrow'.
+    :param compact: bool to save the times, prices and volumes as int32
+     (default True) instead of int64.
+    :param chunksize: integer with the number of rows of a chunk
+     (i.e. 10 ** 7).
+    :return: tuple -- The function returns a tuple with the list of the
+     catalog entries of the days saved and the list of the .part files
+     written.
+    """
+
+    date_list = taq_data_tools_extract.taq_bussiness_days(year)
+    date_index = pd.DatetimeIndex(date_list)
+
+    # Close of the market time of every day. The early closes end at
+    # 13h00
+    early_closes = taq_data_tools_extract.taq_early_closes_data(year)
+    market_close = pd.Series(
+        [46800 if date in early_closes else 57600 for date in date_list],
+        index=date_index)
+
+    if (storage == 'daily'):
+        f_save = f'../../taq_data/hdf5_daily_data_{year}/'
+    elif (storage == 'year'):
+        f_save = f'../../taq_data/hdf5_year_data_{year}/'
+        year_file = f_save + f'taq_{ticker}_{type}_{year}.h5'
+        # Row ranges of the days in the year file
+        date_ranges = []
+        n_rows = 0
+    else:
+        raise ValueError(f'Unknown storage {storage}')
+
+    # Save data
+    if (not os.path.isdir(f_save)):
+
+        try:
+            os.mkdir(f_save)
+            print('Folder to save data created')
+
+        except FileExistsError:
+            print('Folder exists. The folder was not created')
+
+    # Days with a .part file written in this run
+    parts = set()
+
+    # The year file is written from scratch
+    if (storage == 'year' and os.path.isfile(year_file + '.part')):
+        os.remove(year_file + '.part')
+
+    # Rows, first and last time of every day saved
+    day_stats = {}
+
+    for chunk in taq_data_chunks_extract(source, type, parser=parser,
+                                         chunksize=chunksize,
+                                         compact=compact):
+
+        # Keep only the market time of the business days
+        chunk = chunk.loc[chunk.index.isin(date_index)]
+        chunk = chunk.loc[(chunk['Time'] >= 34200)
+                          & (chunk['Time']
+                             < market_close.reindex(chunk.index).values)]
+
+        # Rows and time range of every day in the chunk for the catalog
+        stats = chunk.groupby(level='Date')['Time'] \
+            .agg(['size', 'min', 'max'])
+        for date, (size, t_min, t_max) in stats.iterrows():
+
+            date = date.strftime('%Y-%m-%d')
+            if (date in day_stats):
+                day_stats[date][0] += size
+                day_stats[date][1] = min(day_stats[date][1], t_min)
+                day_stats[date][2] = max(day_stats[date][2], t_max)
+            else:
+                day_stats[date] = [size, t_min, t_max]
+
+        if (storage == 'daily'):
+            # Partition the chunk by date once and write the slice of
+            # every day in the chunk
+            for date, df in chunk.groupby(level='Date', sort=False):
+
+                date = date.strftime('%Y-%m-%d')
+                f_part = f_save + f'taq_{ticker}_{type}_{date}.h5.part'
+                # The day is written from scratch
+                if (date not in parts):
+                    if (os.path.isfile(f_part)):
+                        os.remove(f_part)
+                    parts.add(date)
+
+                df.to_hdf(f_part, key=type, format='table', append=True)
+
+        elif (not chunk.empty):
+            # Rows of the same day together, keeping their order
+            chunk = chunk.sort_index(kind='stable')
+            chunk.to_hdf(year_file + '.part', key=type, format='table',
+                         append=True)
+
+            # Row range of every day in the chunk
+            for date, size in stats['size'].items():
+
+                date = date.strftime('%Y-%m-%d')
+                # A day that continues in the next chunk extends its range
+                if (date_ranges and date_ranges[-1][0] == date
+                        and date_ranges[-1][2] == n_rows):
+                    date_ranges[-1][2] += size
+                else:
+                    date_ranges.append([date, n_rows, n_rows + size])
+                n_rows += size
+
+    if (storage == 'year' and date_ranges):
+        date_index = pd.DataFrame(date_ranges,
+                                  columns=['Date', 'Start', 'Stop'])
+        date_index.to_hdf(year_file + '.part', key='date_index',
+                          format='table')
+
+    # Catalog entries of the days saved. The .part files have the size of
+    # the HDF5 files that they replace
+    entries = []
+    for date, (size, t_min, t_max) in day_stats.items():
+
+        if (storage == 'daily'):
+            f_file = f'taq_{ticker}_{type}_{date}.h5'
+        else:
+            f_file = f'taq_{ticker}_{type}_{year}.h5'
+        entries.append([ticker, type, date,
+                        f'hdf5_{storage}_data_{year}/{f_file}', size,
+                        os.path.getsize(f_save + f_file + '.part'), t_min,
+                        t_max])
+
+    if (storage == 'daily'):
+        f_parts = [f_save + f'taq_{ticker}_{type}_{date}.h5.part'
+                   for date in sorted(parts)]
+    else:
+        f_parts = [year_file + '.part'] if (date_ranges) else []
+
+    return (entries, f_parts)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_data_extract(ticker, type, year, storage='daily', stream=False,
+                     parser='pandas', compact=True, chunksize=10 ** 7):
     """Extracts the data for every day in a year.
 
     Extracts the trades and quotes (TAQ) data for a day from a CSV file with
     the information of a whole year. The time range for each day is from 9:30
     to 16:00, that means, the open market time.
 
+    With stream the original data is decompressed straight into the parser,
+    without writing and reading the year CSV file.
+
+    The data is written in .part files that replace the HDF5 files only
+    when all the data is read. A decompression that fails removes them, so
+    the saved data is kept.
+
+    The rows and time range of every day saved are written in a partial
+    catalog file, that taq_daily_data_extract merges in the catalog of the
+    year.
+
     :param ticker: string of the abbreviation of the stock to be analyzed
      (i.e. 'AAPL').
     :param type: string with the type of the data to be extracted
      (i.e. 'trades' or 'quotes').
     :param year: string of the year to be analyzed (i.e. '2016').
+    :param storage: string with the storage backend, 'daily' (default) or
+     'year'.
+    :param stream: bool to decompress the original data instead of reading
+     the CSV file (default False).
+    :param parser: string with the CSV parser, 'pandas' (default) or
+     'arrow'.
+    :param compact: bool to save the times, prices and volumes as int32
+     (default True) instead of int64.
+    :param chunksize: integer with the number of rows of a chunk
+     (i.e. 10 ** 7).
     :return: None -- The function extracts the data and does not return a
      value.
     """
@@ -133,83 +479,49 @@ def taq_data_extract(ticker, type, year):
 
     try:
 
-        df = pd.DataFrame()
-        chunksize = 10 ** 7
-
-        date_list = taq_data_tools_extract.taq_bussiness_days(year)
+        if (stream):
+            with taq_data_tools_extract \
+                    .taq_decompress_stream(ticker, year, type) as decompress:
+                entries, f_parts = \
+                    taq_data_write_extract(ticker, type, year,
+                                           decompress.stdout, storage,
+                                           parser, compact, chunksize)
+
+            # The output of a failed decompression can be truncated
+            if (decompress.returncode):
+                for f_part in f_parts:
+                    os.remove(f_part)
+                raise RuntimeError(f'The decompression of {ticker} {type} '
+                                   + f'failed ({decompress.returncode})')
+
+        else:
+            # Load data
+            csv_file = f'../../taq_data/csv_year_data_{year}/{ticker}_' \
+                + f'{year}_NASDAQ_{type}.csv'
+            entries, f_parts = \
+                taq_data_write_extract(ticker, type, year, csv_file,
+                                       storage, parser, compact, chunksize)
+
+        # All the data is saved, so the .part files replace the HDF5 files
+        for f_part in f_parts:
+            os.replace(f_part, f_part[:-len('.part')])
 
-        # Load data
-        csv_file = f'../../taq_data/csv_year_data_{year}/{ticker}_{year}' + \
-            f'_NASDAQ_{type}.csv'
-
-        df_type = {'quotes': {
-                        'Date': 'str',
-                        'Time': 'int',
-                        'Bid': 'int',
-                        'Ask': 'int',
-                        'Vol_Bid': 'int',
-                        'Vol_Ask': 'int',
-                        'Mode': 'int',
-                        'Cond': 'str',
-                    },
-                   'trades': {
-                        'Date': 'str',
-                        'Time': 'int',
-                        'Ask': 'int',
-                        'Vol_Ask': 'int',
-                        'Mode': 'int',
-                        'Corr': 'int',
-                        'Cond': 'str',
-                    }}
-
-        col_names = {'quotes': ['Date', 'Time', 'Bid', 'Ask', 'Vol_Bid',
-                                'Vol_Ask', 'Mode', 'Cond'],
-                     'trades': ['Date', 'Time', 'Ask', 'Vol_Ask', 'Mode',
-                                'Corr', 'Cond']}
-
-        # Save data
-        if (not os.path.isdir(f'../../taq_data/hdf5_daily_data_{year}/')):
-
-            try:
-                os.mkdir(f'../../taq_data/hdf5_daily_data_{year}/')
-                print('Folder to save data created')
-
-            except FileExistsError:
-                print('Folder exists. The folder was not created')
-
-        for chunk in pd.read_csv(csv_file, chunksize=chunksize, sep='\s+',
-                                 names=col_names[type], dtype=df_type[type],
-                                 na_filter=False, low_memory=False):
-
-            chunk['Date'] = pd.to_datetime(chunk['Date'], format='%Y-%m-%d')
-            chunk.set_index('Date', inplace=True)
-            if (type == 'quotes'):
-                chunk.drop(['Mode', 'Cond'], axis=1, inplace=True)
-            else:
-                chunk.drop(['Mode', 'Corr', 'Cond'], axis=1, inplace=True)
-
-            for date in date_list:
-                day = chunk.index.isin([date])
-                df = chunk.loc[day & (chunk['Time'] >= 34200)
-                               & (chunk['Time'] < 57600)]
-
-                if not df.empty:
-                    df.to_hdf(f'../../taq_data/hdf5_daily_data_{year}/taq_'
-                              + f'{ticker}_{type}_{date}.h5', key=type,
-                              format='table', append=True)
+        taq_data_tools_extract \
+            .taq_catalog_entries_data(ticker, type, year, entries)
 
         print('Data Saved')
         print()
 
-        # Obtain the absolute path of the current file and split it
-        abs_path = os.path.abspath(__file__).split('/')
-        # Take the path from the start to the project folder
-        root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
-        # CSV file
-        f_path = root_path + f'/taq_data/csv_year_data_{year}/{ticker}_{year}'\
-            + f'_NASDAQ_{type}.csv'
-        # Remove CSV file
-        subprocess.call(f'rm {f_path}', shell=True)
+        if (not stream):
+            # Obtain the absolute path of the current file and split it
+            abs_path = os.path.abspath(__file__).split('/')
+            # Take the path from the start to the project folder
+            root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+            # CSV file
+            f_path = root_path + f'/taq_data/csv_year_data_{year}/{ticker}' \
+                + f'_{year}_NASDAQ_{type}.csv'
+            # Remove CSV file
+            subprocess.call(f'rm {f_path}', shell=True)
 
         return None
 
@@ -222,41 +534,161 @@ def taq_data_extract(ticker, type, year):
 # ----------------------------------------------------------------------------
 
 
-def taq_daily_data_extract(tickers, year):
+def taq_daily_data_extract(tickers, year, storage='daily', stream=False,
+                           parser='pandas', compact=True, memory=None):
     """ Extracts data to daily CSV files.
 
-    Extract and filter the data for every day of a year in HDF5 files.
+    Extract and filter the data for every day of a year in HDF5 files. The
+    completed extractions are saved in the manifest of the year, so a run
+    only extracts the tickers and types that are missing or have newer input
+    data.
+
+    The number of workers and the rows of the chunks are chosen so the
+    workers fit in the memory budget.
 
     :param tickers: list of the string abbreviation of the stocks to be
      analyzed (i.e. ['AAPL', 'MSFT']).
     :param year: string of the year to be analyzed (i.e '2016').
+    :param storage: string with the storage backend, 'daily' (default) or
+     'year'.
+    :param stream: bool to decompress the original data instead of reading
+     the CSV files (default False).
+    :param parser: string with the CSV parser, 'pandas' (default) or
+     'arrow'.
+    :param compact: bool to save the times, prices and volumes as int32
+     (default True) instead of int64.
+    :param memory: integer with the memory budget in bytes. Default None uses
+     a fraction of the available memory of the node.
     :return: None -- The function saves the data in a file and does not return
      a value.
     """
 
+    function_name = taq_data_extract.__name__
+
+    # Extractions finished before a crash of the previous run
+    extracted = taq_data_tools_extract.taq_catalog_merge_data(year)
+    taq_data_tools_extract \
+        .taq_manifest_update_data(year, function_name,
+                                  [(ticker, type, year)
+                                   for ticker, type in extracted])
+
+    # Only the extractions not completed or with newer input data are run
+    units = list(iprod(tickers, ['quotes', 'trades'], [year]))
+    if (stream):
+        inputs = [[f'../../taq_data/original_year_data_{year}/{ticker}_'
+                   + f'{year}_NASDAQ.{type}'] for ticker, type, _ in units]
+    else:
+        inputs = [[f'../../taq_data/csv_year_data_{year}/{ticker}_{year}'
+                   + f'_NASDAQ_{type}.csv'] for ticker, type, _ in units]
+    pending = taq_data_tools_extract \
+        .taq_manifest_pending_data(year, function_name, units, inputs)
+
+    # Rows of the chunks that fit in the share of the memory budget of every
+    # worker, between 10 ** 5 and 10 ** 7 rows
+    memory = taq_data_tools_extract.taq_memory_budget_data(memory)
+    workers = min(mp.cpu_count(), max(len(pending), 1))
+    chunksize = int((memory / workers
+                     - taq_data_tools_extract.__worker_memory__)
+                    / __row_memory__)
+    chunksize = min(max(chunksize, 10 ** 5), 10 ** 7)
+    task_memory = taq_data_tools_extract.__worker_memory__ \
+        + chunksize * __row_memory__
+
     # Extract daily data
     print('Extracting daily data')
     # Parallel computing
-    with mp.Pool(processes=mp.cpu_count()) as pool:
-        pool.starmap(taq_data_extract, iprod(tickers, ['quotes'], [year]))
-    # Parallel computing
-    with mp.Pool(processes=mp.cpu_count()) as pool:
-        pool.starmap(taq_data_extract, iprod(tickers, ['trades'], [year]))
+    for type in ['quotes', 'trades']:
+        list(taq_data_tools_extract.taq_pool_imap_data(
+            taq_data_extract,
+            [(ticker, type, year, storage, stream, parser, compact, chunksize)
+             for ticker, t_type, _ in pending if t_type == type],
+            task_memory, memory))
+
+    # Add the extracted days to the catalog and the completed extractions to
+    # the manifest of the year
+    extracted = taq_data_tools_extract.taq_catalog_merge_data(year)
+    taq_data_tools_extract \
+        .taq_manifest_update_data(year, function_name,
+                                  [(ticker, type, year)
+                                   for ticker, type in extracted])
 
-    # Obtain the absolute path of the current file and split it
-    abs_path = os.path.abspath(__file__).split('/')
-    # Take the path from the start to the project folder
-    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
-    f_path = root_path + f'/taq_data/csv_year_data_{year}/'
-    # Remove CSV folder
-    subprocess.call(f'rm -r {f_path}', shell=True)
+    if (not stream):
+        # Obtain the absolute path of the current file and split it
+        abs_path = os.path.abspath(__file__).split('/')
+        # Take the path from the start to the project folder
+        root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+        f_path = root_path + f'/taq_data/csv_year_data_{year}/'
+        # Remove CSV folder
+        subprocess.call(f'rm -r {f_path}', shell=True)
 
     return None
 
 # ----------------------------------------------------------------------------
 
 
-def taq_midpoint_trade_data(ticker, date):
+def taq_parser_benchmark_extract(type='quotes', rows=10 ** 6,
+                                 parsers=('pandas', 'arrow')):
+    """Measures the throughput of the CSV parsers.
+
+    Writes a synthetic year file of the type with the layout of the
+    decompressed data and reads it with every parser using the
+    taq_data_chunks_extract function.
+
+    :param type: string with the type of the data (i.e. 'trades' or
+     'quotes').
+    :param rows: integer with the number of rows of the file (i.e. 10 ** 6).
+    :param parsers: tuple of strings with the parsers to be measured
+     (i.e. ('pandas', 'arrow')).
+    :return: dict -- The function returns a dictionary with the parsers as
+     keys and the parsed rows per second as values.
+    """
+
+    rng = np.random.default_rng(0)
+
+    dates = np.sort(rng.choice(
+        taq_data_tools_extract.taq_bussiness_days('2008'), rows))
+    bid = rng.integers(200000, 210000, rows)
+
+    if (type == 'quotes'):
+        data = pd.DataFrame({'Date': dates,
+                             'Time': rng.integers(34200, 57600, rows),
+                             'Bid': bid,
+                             'Ask': bid + rng.integers(0, 500, rows),
+                             'Vol_Bid': rng.integers(1, 100, rows),
+                             'Vol_Ask': rng.integers(1, 100, rows),
+                             'Mode': 12,
+                             'Cond': 'R'})
+    else:
+        data = pd.DataFrame({'Date': dates,
+                             'Time': rng.integers(34200, 57600, rows),
+                             'Ask': bid,
+                             'Vol_Ask': rng.integers(1, 100, rows),
+                             'Mode': 1,
+                             'Corr': 0,
+                             'Cond': '@'})
+
+    throughput = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        csv_file = f'{tmp_dir}/benchmark_{type}.csv'
+        data.to_csv(csv_file, sep=' ', header=False, index=False)
+
+        for parser in parsers:
+
+            start = time.perf_counter()
+            num = sum(len(chunk) for chunk
+                      in taq_data_chunks_extract(csv_file, type, parser))
+            throughput[parser] = num / (time.perf_counter() - start)
+
+            print(f'{parser}: {throughput[parser]:.0f} rows/s')
+
+    return throughput
+
+# ----------------------------------------------------------------------------
+
+
+def taq_midpoint_trade_data(ticker, date, data_quotes=None):
     """Computes the midpoint price of every trade.
 
     Using the daily TAQ data computes the midpoint price of every trade in a
@@ -267,6 +699,8 @@ def taq_midpoint_trade_data(ticker, date):
      (i.e. 'AAPL').
     :param date: string with the date of the data to be extracted
      (i.e. '2008-01-02').
+    :param data_quotes: DataFrame with the quotes of the day (default None
+     reads the data).
     :return: tuple -- The function returns a tuple with numpy arrays.
     """
 
@@ -278,20 +712,15 @@ def taq_midpoint_trade_data(ticker, date):
 
     try:
         # Load data
-        # The module is used in other folders, so it is necessary to use
-        # absolute paths instead of relative paths
-        # Obtain the absolute path of the current file and split it
-        abs_path = os.path.abspath(__file__).split('/')
-        # Take the path from the start to the project folder
-        root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
-        data_quotes_trade = pd.read_hdf(root_path
-                                        + f'/taq_data/hdf5_daily_data_{year}/'
-                                        + f'taq_{ticker}_quotes_{date}.h5',
-                                        key='/quotes')
+        if (data_quotes is None):
+            data_quotes = taq_data_tools_extract \
+                .taq_read_data(ticker, 'quotes', date)
 
-        time_q = data_quotes_trade['Time'].to_numpy()
-        bid_q = data_quotes_trade['Bid'].to_numpy()
-        ask_q = data_quotes_trade['Ask'].to_numpy()
+        # The int32 prices are up-cast, so the sum of the midpoint price
+        # does not overflow
+        time_q = data_quotes['Time'].to_numpy()
+        bid_q = data_quotes['Bid'].to_numpy(dtype=np.int64)
+        ask_q = data_quotes['Ask'].to_numpy(dtype=np.int64)
 
         # Some files are corrupted, so there are some zero values that does not
         # have sense
@@ -314,17 +743,75 @@ def taq_midpoint_trade_data(ticker, date):
 # ----------------------------------------------------------------------------
 
 
-def taq_midpoint_physical_data(ticker, date):
+def taq_last_quote_physical_data(time_q, values_q, full_time):
+    """Selects the value of the last quote at or before every second.
+
+    For every second in full_time takes the value of the last quote with a
+    time lower or equal to that second, using a sorted search over the quotes
+    instead of scanning all of them for every second. The seconds before the
+    first quote of the time range take the value of the last quote before the
+    range, as the back-fill of the taq_midpoint_physical_data loop does. When
+    there is no quote before the range, like in a window that starts at the
+    open of the market, they take the value of the first second with quotes.
+
+    :param time_q: numpy array with the time of the quotes.
+    :param values_q: numpy array with the values of the quotes.
+    :param full_time: numpy array with the seconds to be sampled.
+    :return: numpy array -- Without quotes all the seconds are zero.
+    """
+
+    # The search needs the quotes sorted by time. The stable sort keeps the
+    # order of the quotes in the same second, so the last one is the same
+    if (np.any(np.diff(time_q) < 0)):
+        order = np.argsort(time_q, kind='stable')
+        time_q = time_q[order]
+        values_q = values_q[order]
+
+    # Position of the last quote at or before every second
+    pos = np.searchsorted(time_q, full_time, side='right') - 1
+    found = pos >= 0
+
+    sampled = np.zeros(len(full_time))
+    sampled[found] = values_q[pos[found]]
+
+    # Last quote of the first second with quotes
+    if (len(time_q)):
+        first = np.searchsorted(time_q, time_q[0], side='right') - 1
+        sampled[~found] = values_q[first]
+
+    return sampled
+
+# ----------------------------------------------------------------------------
+
+
+def taq_midpoint_physical_data(ticker, date, engine='vectorized',
+                               storage='npy', data_quotes=None,
+                               price_dtype='float64', window=600):
     """Computes the midpoint price of every second.
 
     Using the taq_midpoint_trade_data function computes the midpoint price of
     every second. To fill the time spaces when nothing happens I replicate the
     last value calculated until a change in the price happens.
 
+    The series are always saved every second, the responses use coarser bins
+    from them. The window removes the first and last seconds of the market
+    time, the default 600 s reproduces the paper and 0 uses the whole
+    session.
+
     :param ticker: string of the abbreviation of the stock to be analyzed
      (i.e. 'AAPL').
     :param date: string with the date of the data to be extracted
      (i.e. '2008-01-02').
+    :param engine: string with the implementation to be used, 'vectorized'
+     (default) or 'loop' (reference implementation).
+    :param storage: string with the format of the saved data, 'npy' (default)
+     for memory-mappable arrays or 'pickle'.
+    :param data_quotes: DataFrame with the quotes of the day (default None
+     reads the data).
+    :param price_dtype: string with the dtype of the saved midpoint prices
+     and spreads, 'float64' (default) or 'float32'.
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600).
     :return: numpy array.
     """
 
@@ -341,66 +828,108 @@ def taq_midpoint_physical_data(ticker, date):
 
     try:
         # Calculate the values of the midpoint price for all the events
-        time_q, midpoint_trade, spread = taq_midpoint_trade_data(ticker, date)
+        time_q, midpoint_trade, spread = \
+            taq_midpoint_trade_data(ticker, date, data_quotes)
 
         # 34800 s = 9h40 - 57000 s = 15h50
-        # Reproducing the paper time values. In the results the time interval
-        # for the midpoint is [34800, 56999]
-        full_time = np.array(range(34800, 57000))
-        midpoint = 0. * full_time
-
-        # Select the last midpoint price of every second. If there is no
-        # midpoint price in a second, takes the value of the previous second
-        for t_idx, t_val in enumerate(full_time):
-
-            condition = time_q == t_val
-            if (np.sum(condition)):
-                midpoint[t_idx] = midpoint_trade[condition][-1]
-
-            else:
-                midpoint[t_idx] = midpoint[t_idx - 1]
-
-        # Prevent zero values in dates when the first seconds does not have a
-        # midpoint price value
-        t_pos = 34800
-        while (not np.sum(time_q == t_pos)):
-            t_pos -= 1
-        m_pos = 0
-        condition_2 = time_q == t_pos
-        while (not midpoint[m_pos]):
-            midpoint[m_pos] = midpoint_trade[condition_2][-1]
-            m_pos += 1
+        # Reproducing the paper time values with the default window of 600 s.
+        # In the results the time interval for the midpoint is [34800, 56999].
+        # In the early closes the interval ends 10 minutes before 13h00,
+        # [34800, 46199]
+        market_open, market_close = taq_data_tools_extract \
+            .taq_market_window_data(date)
+        full_time = np.array(range(market_open + window,
+                                   market_close - window))
+
+        if (engine == 'vectorized'):
+            # Last midpoint price at or before every second, including the
+            # seconds before the first quote of the time range
+            midpoint = taq_last_quote_physical_data(time_q, midpoint_trade,
+                                                    full_time)
+
+        elif (engine == 'loop'):
+            midpoint = 0. * full_time
+
+            # Select the last midpoint price of every second. If there is no
+            # midpoint price in a second, takes the value of the previous
+            # second
+            for t_idx, t_val in enumerate(full_time):
+
+                condition = time_q == t_val
+                if (np.sum(condition)):
+                    midpoint[t_idx] = midpoint_trade[condition][-1]
+
+                else:
+                    midpoint[t_idx] = midpoint[t_idx - 1]
+
+            # Prevent zero values in dates when the first seconds does not
+            # have a midpoint price value. Without quotes before the time
+            # range the first second with quotes is used
+            t_pos = full_time[0]
+            if (not np.sum(time_q <= t_pos)):
+                t_pos = np.min(time_q)
+            while (not np.sum(time_q == t_pos)):
+                t_pos -= 1
+            m_pos = 0
+            condition_2 = time_q == t_pos
+            while (not midpoint[m_pos]):
+                midpoint[m_pos] = midpoint_trade[condition_2][-1]
+                m_pos += 1
+
+        else:
+            raise ValueError(f'Unknown engine {engine}')
 
         assert not np.sum(midpoint == 0)
 
         # Use the spread only in market time
-        s_cond = (time_q >= 34800) * (time_q < 57000)
+        s_cond = (time_q >= full_time[0]) * (time_q <= full_time[-1])
         spread_mt = spread[s_cond]
 
+        midpoint_save = (midpoint / 10000).astype(price_dtype)
+        spread_save = (spread_mt / 10000).astype(price_dtype)
+
         # Saving data
-        if (not os.path.isdir(f'../../taq_data/extract_data_{year}'
-                              + f'/{function_name}/')):
-
-            try:
-                os.mkdir(f'../../taq_data/extract_data_{year}/'
-                         + f'{function_name}/')
-                print('Folder to save data created')
-
-            except FileExistsError:
-                print('Folder exists. The folder was not created')
-
-        pickle.dump(midpoint / 10000,
-                    open(f'../../taq_data/extract_data_{year}/'
-                         + f'{function_name}/{function_name}_midpoint_'
-                         + f'{year}{month}{day}_{ticker}.pickle', 'wb'))
-        pickle.dump(spread_mt / 10000,
-                    open(f'../../taq_data/extract_data_{year}/'
-                         + f'{function_name}/{function_name}_spread_'
-                         + f'{year}{month}{day}_{ticker}.pickle', 'wb'))
-        pickle.dump(full_time,
-                    open(f'../../taq_data/extract_data_{year}/'
-                         + f'{function_name}/{function_name}_time.pickle',
-                         'wb'))
+        if (storage == 'npy'):
+            taq_data_tools_extract \
+                .taq_save_array(function_name, 'midpoint', midpoint_save,
+                                ticker, year, month, day)
+            taq_data_tools_extract \
+                .taq_save_array(function_name, 'spread', spread_save,
+                                ticker, year, month, day)
+            # The early closes use the first seconds of the time axis of the
+            # regular days
+            if (market_close == 57600):
+                taq_data_tools_extract \
+                    .taq_save_time_axis(function_name, full_time, year)
+
+        elif (storage == 'pickle'):
+            if (not os.path.isdir(f'../../taq_data/extract_data_{year}'
+                                  + f'/{function_name}/')):
+
+                try:
+                    os.mkdir(f'../../taq_data/extract_data_{year}/'
+                             + f'{function_name}/')
+                    print('Folder to save data created')
+
+                except FileExistsError:
+                    print('Folder exists. The folder was not created')
+
+            pickle.dump(midpoint_save,
+                        open(f'../../taq_data/extract_data_{year}/'
+                             + f'{function_name}/{function_name}_midpoint_'
+                             + f'{year}{month}{day}_{ticker}.pickle', 'wb'))
+            pickle.dump(spread_save,
+                        open(f'../../taq_data/extract_data_{year}/'
+                             + f'{function_name}/{function_name}_spread_'
+                             + f'{year}{month}{day}_{ticker}.pickle', 'wb'))
+            if (market_close == 57600):
+                pickle.dump(full_time,
+                            open(f'../../taq_data/extract_data_{year}/'
+                                 + f'{function_name}/{function_name}_time'
+                                 + f'.pickle', 'wb'))
+
+        else:
+            raise ValueError(f'Unknown storage {storage}')
 
         print('Data saved')
         print()
@@ -413,7 +942,36 @@ def taq_midpoint_physical_data(ticker, date):
 # ----------------------------------------------------------------------------
 
 
-def taq_trade_signs_trade_data(ticker, date):
+def taq_trade_signs_classification_data(ask_t):
+    """Classifies the trades with Eq. 1 using array operations.
+
+    Computes the sign of the price change between consecutive trades and
+    forward-fills the trades without a price change with the sign of the
+    previous trade. As in the loop of taq_trade_signs_trade_data, the first
+    trade is compared with the last trade of the day and, if there is no price
+    change, takes the sign 1.
+
+    :param ask_t: numpy array with the prices of the trades.
+    :return: numpy array.
+    """
+
+    # Sign of the price change. The first trade is compared with the last one
+    diff_sign = np.sign(ask_t - np.roll(ask_t, 1)).astype(float)
+
+    # Index of the last trade with a price change at or before every trade.
+    # The trades before the first price change take the initial sign 1
+    change_idx = np.where(diff_sign != 0, np.arange(len(ask_t)), -1)
+    change_idx = np.maximum.accumulate(change_idx)
+
+    identified_trades = np.where(change_idx >= 0, diff_sign[change_idx], 1.)
+
+    return identified_trades
+
+# ----------------------------------------------------------------------------
+
+
+def taq_trade_signs_trade_data(ticker, date, engine='vectorized',
+                               data_trades=None):
     """Computes the trade signs of every trade.
 
     Using the daily TAQ data computes the trade signs of every trade in a day.
@@ -429,6 +987,10 @@ def taq_trade_signs_trade_data(ticker, date):
         (i.e. 'AAPL').
     :param date: string with the date of the data to be extracted
      (i.e. '2008-01-02').
+    :param engine: string with the implementation to be used, 'vectorized'
+     (default) or 'loop' (reference implementation).
+    :param data_trades: DataFrame with the trades of the day (default None
+     reads the data).
     :return: tuple -- The function returns a tuple with numpy arrays.
     """
 
@@ -440,39 +1002,40 @@ def taq_trade_signs_trade_data(ticker, date):
 
     try:
         # Load data
-        # The module is used in other folders, so it is necessary to use
-        # absolute paths instead of relative paths
-        # Obtain the absolut path of the current file and split it
-        abs_path = os.path.abspath(__file__).split('/')
-        # Take the path from the start to the project folder
-        root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
-        data_trades_trade = pd.read_hdf(root_path
-                                        + f'/taq_data/hdf5_daily_data_{year}/'
-                                        + f'taq_{ticker}_trades_{date}.h5',
-                                        key='/trades')
+        if (data_trades is None):
+            data_trades = taq_data_tools_extract \
+                .taq_read_data(ticker, 'trades', date)
 
-        time_t = data_trades_trade['Time'].to_numpy()
-        ask_t = data_trades_trade['Ask'].to_numpy()
+        time_t = data_trades['Time'].to_numpy()
+        ask_t = data_trades['Ask'].to_numpy()
 
         # All the trades must have a price different to zero
         assert not np.sum(ask_t == 0)
 
-        # Trades identified using equation (1)
-        identified_trades = np.zeros(len(time_t))
-        identified_trades[-1] = 1
+        if (engine == 'vectorized'):
+            # Implementation of equation (1) with array operations
+            identified_trades = taq_trade_signs_classification_data(ask_t)
 
-        # Implementation of equation (1). Sign of the price change between
-        # consecutive trades
+        elif (engine == 'loop'):
+            # Trades identified using equation (1)
+            identified_trades = np.zeros(len(time_t))
+            identified_trades[-1] = 1
 
-        for t_idx in range(len(time_t)):
+            # Implementation of equation (1). Sign of the price change between
+            # consecutive trades
 
-            diff = ask_t[t_idx] - ask_t[t_idx - 1]
+            for t_idx in range(len(time_t)):
 
-            if (diff):
-                identified_trades[t_idx] = np.sign(diff)
+                diff = ask_t[t_idx] - ask_t[t_idx - 1]
 
-            else:
-                identified_trades[t_idx] = identified_trades[t_idx - 1]
+                if (diff):
+                    identified_trades[t_idx] = np.sign(diff)
+
+                else:
+                    identified_trades[t_idx] = identified_trades[t_idx - 1]
+
+        else:
+            raise ValueError(f'Unknown engine {engine}')
 
         # All the identified trades must be different to zero
         assert not np.sum(identified_trades == 0)
@@ -488,7 +1051,49 @@ def taq_trade_signs_trade_data(ticker, date):
 # ----------------------------------------------------------------------------
 
 
-def taq_trade_signs_physical_data(ticker, date):
+def taq_trade_signs_seconds_data(time_t, ask_t, identified_trades,
+                                 full_time):
+    """Aggregates the trade signs and prices of the trades in every second.
+
+    Bins the trades by their integer second once and computes in one sweep the
+    trade sign of every second with Eq. 2 (the sign of the sum of the Eq. 1
+    signs in the second) and the price of the last trade of the second. The
+    seconds without trades have a zero sign and a zero price. The sums of the
+    Eq. 1 signs give the trade signs of longer bins.
+
+    :param time_t: numpy array with the time of the trades.
+    :param ask_t: numpy array with the prices of the trades.
+    :param identified_trades: numpy array with the Eq. 1 trade signs.
+    :param full_time: numpy array with consecutive seconds.
+    :return: tuple -- The function returns a tuple with the price, the trade
+     sign and the sum of the Eq. 1 signs of every second.
+    """
+
+    # Second of every trade relative to the first second of the time range
+    sec_idx = np.floor(time_t).astype(int) - full_time[0]
+    condition = (sec_idx >= 0) * (sec_idx < len(full_time))
+    sec_idx = sec_idx[condition]
+
+    # Implementation of Eq. 2. Sign of the sum of the trade signs per second
+    sign_sum = np.bincount(sec_idx, weights=identified_trades[condition],
+                           minlength=len(full_time))
+    trade_signs = np.sign(sign_sum)
+
+    # Price of the last trade of every second
+    last_idx = np.full(len(full_time), -1)
+    np.maximum.at(last_idx, sec_idx, np.arange(len(sec_idx)))
+    traded = last_idx >= 0
+    price_signs = 0. * full_time
+    price_signs[traded] = ask_t[condition][last_idx[traded]]
+
+    return (price_signs, trade_signs, sign_sum)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_trade_signs_physical_data(ticker, date, engine='vectorized',
+                                  storage='npy', data_trades=None,
+                                  window=600):
     """Computes the trade signs of every second.
 
     Using the taq_trade_signs_trade_data function computes the trade signs of
@@ -503,10 +1108,24 @@ def taq_trade_signs_physical_data(ticker, date):
     To fill the time spaces when nothing happens I added zeros indicating that
     there were neither a buy nor a sell.
 
+    The sums of the Eq. 1 signs of every second are saved with the trade
+    signs, so the responses compute the trade signs of coarser bins without
+    the trades. The window removes the first and last seconds of the market
+    time, the default 600 s reproduces the paper and 0 uses the whole
+    session.
+
     :param ticker: string of the abbreviation of the stock to be analyzed
      (i.e. 'AAPL').
     :param date: string with the date of the data to be extracted
      (i.e. '2008-01-02').
+    :param engine: string with the implementation to be used, 'vectorized'
+     (default) or 'loop' (reference implementation).
+    :param storage: string with the format of the saved data, 'npy' (default)
+     for memory-mappable arrays or 'pickle'.
+    :param data_trades: DataFrame with the trades of the day (default None
+     reads the data).
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600).
     :return: tuple -- The function returns a tuple with numpy arrays.
     """
 
@@ -523,37 +1142,347 @@ def taq_trade_signs_physical_data(ticker, date):
 
     try:
         # Calculate the values of the trade signs for all the events
-        (time_t, ask_t,
-         identified_trades) = taq_trade_signs_trade_data(ticker, date)
+        (time_t, ask_t, identified_trades) = \
+            taq_trade_signs_trade_data(ticker, date, data_trades=data_trades)
+
+        # Reproducing the paper time values with the default window of 600 s.
+        # In her results the time interval for the trade signs is
+        # [34801, 57000]. In the early closes the interval ends 10 minutes
+        # before 13h00, [34801, 46200]
+        market_open, market_close = taq_data_tools_extract \
+            .taq_market_window_data(date)
+        full_time = np.array(range(market_open + window + 1,
+                                   market_close - window + 1))
+
+        if (engine == 'vectorized'):
+            # Implementation of Eq. 2 with a grouped reduction per second
+            price_signs, trade_signs, sign_sums = \
+                taq_trade_signs_seconds_data(time_t, ask_t, identified_trades,
+                                             full_time)
+
+        elif (engine == 'loop'):
+            trade_signs = 0. * full_time
+            price_signs = 0. * full_time
+            sign_sums = 0. * full_time
+
+            # Implementation of Eq. 2. Trade sign in each second
+            for t_idx, t_val in enumerate(full_time):
+
+                condition = (time_t >= t_val) * (time_t < t_val + 1)
+                trades_same_t_exp = identified_trades[condition]
+                sign_sums[t_idx] = np.sum(trades_same_t_exp)
+                sign_exp = int(np.sign(sign_sums[t_idx]))
+                trade_signs[t_idx] = sign_exp
+
+                if (np.sum(condition)):
+                    price_signs[t_idx] = ask_t[condition][-1]
+
+        else:
+            raise ValueError(f'Unknown engine {engine}')
+
+        # The trade signs are -1, 0 or 1 and the prices of the trades are
+        # integer ticks
+        trade_signs = trade_signs.astype(np.int8)
+        price_signs = price_signs.astype(ask_t.dtype)
+        sign_sums = sign_sums.astype(np.int32)
 
-        # Reproducing the paper time values. In her results the time interval
-        # for the trade signs is [34801, 57000]
-        full_time = np.array(range(34801, 57001))
-        trade_signs = 0. * full_time
-        price_signs = 0. * full_time
+        # Saving data
+        if (storage == 'npy'):
+            taq_data_tools_extract \
+                .taq_save_array(function_name, 'price_signs', price_signs,
+                                ticker, year, month, day)
+            taq_data_tools_extract \
+                .taq_save_array(function_name, 'trade_signs', trade_signs,
+                                ticker, year, month, day)
+            taq_data_tools_extract \
+                .taq_save_array(function_name, 'sign_sums', sign_sums,
+                                ticker, year, month, day)
+            # The early closes use the first seconds of the time axis of the
+            # regular days
+            if (market_close == 57600):
+                taq_data_tools_extract \
+                    .taq_save_time_axis(function_name, full_time, year)
+
+            print('Data Saved')
+            print()
+
+        elif (storage == 'pickle'):
+            taq_data_tools_extract \
+                .taq_save_data(function_name,
+                               (full_time, price_signs, trade_signs,
+                                sign_sums), ticker, ticker, year, month, day)
+
+        else:
+            raise ValueError(f'Unknown storage {storage}')
 
-        # Implementation of Eq. 2. Trade sign in each second
-        for t_idx, t_val in enumerate(full_time):
+        return (full_time, price_signs, trade_signs)
 
-            condition = (time_t >= t_val) * (time_t < t_val + 1)
-            trades_same_t_exp = identified_trades[condition]
-            sign_exp = int(np.sign(np.sum(trades_same_t_exp)))
-            trade_signs[t_idx] = sign_exp
+    except TypeError as e:
+        return None
 
-            if (np.sum(condition)):
-                price_signs[t_idx] = ask_t[condition][-1]
+# ----------------------------------------------------------------------------
 
-        # Saving data
-        taq_data_tools_extract \
-            .taq_save_data(function_name,
-                           (full_time, price_signs, trade_signs), ticker,
-                           ticker, year, month, day)
 
-        return (full_time, price_signs, trade_signs)
+def taq_quotes_trades_physical_data(ticker, date, engine='vectorized',
+                                    storage='npy', price_dtype='float64',
+                                    window=600):
+    """Computes the physical time series and statistics of a day.
 
-    except TypeError as e:
+    Reads the quotes and the trades of the day once and uses them to compute
+    the midpoint price and spread with the taq_midpoint_physical_data
+    function, the trade signs with the taq_trade_signs_physical_data function
+    and the statistics of the day (number of quotes, number of trades and
+    average spread) used in the taq_avg_spread project.
+
+    :param ticker: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param date: string with the date of the data to be extracted
+     (i.e. '2008-01-02').
+    :param engine: string with the implementation to be used, 'vectorized'
+     (default) or 'loop' (reference implementation).
+    :param storage: string with the format of the saved data, 'npy' (default)
+     for memory-mappable arrays or 'pickle'.
+    :param price_dtype: string with the dtype of the saved midpoint prices
+     and spreads, 'float64' (default) or 'float32'.
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600).
+    :return: tuple -- The function returns a tuple with the number of quotes,
+     the number of trades and the average spread of the day.
+    """
+
+    # Load data
+    data = {}
+    for type, columns in (('quotes', ['Time', 'Bid', 'Ask']),
+                          ('trades', ['Time', 'Ask'])):
+
+        try:
+            data[type] = taq_data_tools_extract \
+                .taq_read_data(ticker, type, date, columns=columns)
+
+        except FileNotFoundError as e:
+            print('No data')
+            print(e)
+            print()
+
+    if ('quotes' in data):
+        taq_midpoint_physical_data(ticker, date, engine, storage,
+                                   data_quotes=data['quotes'],
+                                   price_dtype=price_dtype, window=window)
+    if ('trades' in data):
+        taq_trade_signs_physical_data(ticker, date, engine, storage,
+                                      data_trades=data['trades'],
+                                      window=window)
+
+    if (len(data) < 2):
+        return (np.nan, np.nan, np.nan)
+
+    # Some files are corrupted, so there are some zero values that does not
+    # have sense
+    data_quotes = data['quotes'][data['quotes']['Ask'] != 0]
+    data_trades = data['trades'][data['trades']['Ask'] != 0]
+
+    spread = (data_quotes['Ask'] - data_quotes['Bid']) / 10000
+
+    num_quotes = len(data_quotes)
+    num_trades = len(data_trades)
+    avg_spread = np.mean(spread)
+
+    return (num_quotes, num_trades, avg_spread)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_quotes_trades_physical_task_data(task):
+    """Runs a task of the physical time series and statistics of a year.
+
+    :param task: tuple with the arguments of the
+     taq_quotes_trades_physical_data function (i.e. ('AAPL', '2008-01-02',
+     'vectorized', 'npy', 'float64', 600)).
+    :return: tuple -- The function returns a tuple with the ticker, the date
+     and the statistics of the day.
+    """
+
+    ticker, date = task[:2]
+
+    return (ticker, date) + taq_quotes_trades_physical_data(*task)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_quotes_trades_stage_data(window=600):
+    """Gets the stage of the physical time series of a window in the manifest.
+
+    The default window keeps the name of the taq_quotes_trades_physical_data
+    function, so the manifests of the previous runs are still used.
+
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600).
+    :return: string -- The function returns the name of the stage.
+    """
+
+    function_name = taq_quotes_trades_physical_data.__name__
+
+    if (window == 600):
+        return function_name
+
+    else:
+        return f'{function_name}_window_{window}'
+
+# ----------------------------------------------------------------------------
+
+
+def taq_quotes_trades_stats_save_data(results, year, window=600):
+    """Saves the statistics of the finished days and adds them to the manifest.
+
+    The statistics replace the saved statistics of the same ticker and day.
+    The file is written in a temporary file that replaces it, and the days
+    are added to the manifest after the statistics are saved. The days
+    computed with other windows are removed from the manifest, because their
+    files are replaced.
+
+    :param results: list of tuples with the ticker, date, number of quotes,
+     number of trades and average spread of the finished days.
+    :param year: string of the year to be analyzed (i.e '2008').
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600).
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    if (not results):
         return None
 
+    function_name = taq_quotes_trades_physical_data.__name__
+
+    stats = pd.DataFrame(results, columns=['Ticker', 'Date', 'Num_Quotes',
+                                           'Num_Trades', 'Avg_Spread'])
+
+    f_path = f'../../taq_data/extract_data_{year}/{function_name}/'
+    f_file = f_path + f'{function_name}_stats_{year}.csv'
+
+    if (not os.path.isdir(f_path)):
+
+        try:
+            os.mkdir(f_path)
+            print('Folder to save data created')
+
+        except FileExistsError:
+            print('Folder exists. The folder was not created')
+
+    if (os.path.isfile(f_file)):
+        saved = pd.read_csv(f_file, dtype={'Ticker': str, 'Date': str})
+        keys = set(zip(stats['Ticker'], stats['Date']))
+        keep = [key not in keys
+                for key in zip(saved['Ticker'], saved['Date'])]
+        stats = pd.concat([saved[keep], stats], ignore_index=True)
+
+    stats.to_csv(f_file + '.tmp', index=False)
+    os.replace(f_file + '.tmp', f_file)
+
+    taq_data_tools_extract \
+        .taq_manifest_update_data(year,
+                                  taq_quotes_trades_stage_data(window),
+                                  [(ticker, 'quotes_trades', date)
+                                   for ticker, date, *_ in results],
+                                  prefix=function_name)
+
+    return None
+
+# ----------------------------------------------------------------------------
+
+
+def taq_quotes_trades_physical_year_data(tickers, year, engine='vectorized',
+                                         storage='npy', price_dtype='float64',
+                                         chunksize=8, flush=1000,
+                                         memory=None, window=600):
+    """Computes the physical time series and statistics of a year.
+
+    Runs the taq_quotes_trades_physical_data function for the days with data
+    of all the tickers in one pool of workers, so the quotes and trades of
+    every day are read once. The statistics of every day are saved in a CSV
+    file that the taq_avg_spread project uses instead of reading the data
+    again.
+
+    The finished days are added to the manifest of the year every flush days,
+    so a new run only computes the days that are missing or whose HDF5 data
+    changed.
+
+    :param tickers: list of the string abbreviation of the stocks to be
+     analyzed (i.e. ['AAPL', 'MSFT']).
+    :param year: string of the year to be analyzed (i.e '2008').
+    :param engine: string with the implementation to be used, 'vectorized'
+     (default) or 'loop' (reference implementation).
+    :param storage: string with the format of the saved data, 'npy' (default)
+     for memory-mappable arrays or 'pickle'.
+    :param price_dtype: string with the dtype of the saved midpoint prices
+     and spreads, 'float64' (default) or 'float32'.
+    :param chunksize: integer with the number of tasks sent to a worker at
+     once (i.e. 8).
+    :param flush: integer with the number of finished days between the saves
+     of the statistics and the manifest (i.e. 1000).
+    :param memory: integer with the memory budget in bytes. Default None uses
+     a fraction of the available memory of the node.
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600).
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    function_name = taq_quotes_trades_physical_data.__name__
+    taq_data_tools_extract \
+        .taq_function_header_print_data(function_name, '', '', year, '', '')
+
+    date_list = taq_data_tools_extract.taq_bussiness_days(year)
+
+    # Days with data of every ticker in the catalog
+    ticker_days = taq_data_tools_extract.taq_catalog_ticker_days_data(year)
+    if (ticker_days is None):
+        tasks = list(iprod(tickers, date_list))
+    else:
+        tasks = [(ticker, date) for ticker in tickers
+                 for date in sorted(set(date_list)
+                                    & set(ticker_days.get(ticker, [])))]
+
+    # Input files of every day in the catalog, to find the stale days
+    catalog = taq_data_tools_extract.taq_catalog_data(year)
+    if (catalog is None):
+        inputs = None
+    else:
+        paths = catalog.groupby(['Ticker', 'Date'])['Path'].apply(list)
+        inputs = [[f'../../taq_data/{path}'
+                   for path in paths.get((ticker, date), [])]
+                  for ticker, date in tasks]
+
+    # Only the days not completed or with newer data are computed
+    units = [(ticker, 'quotes_trades', date) for ticker, date in tasks]
+    pending = taq_data_tools_extract \
+        .taq_manifest_pending_data(year, taq_quotes_trades_stage_data(window),
+                                   units, inputs)
+
+    results = []
+
+    try:
+        # Parallel computing
+        for result in taq_data_tools_extract.taq_pool_imap_data(
+                taq_quotes_trades_physical_task_data,
+                [((ticker, date, engine, storage, price_dtype, window),)
+                 for ticker, _, date in pending],
+                memory=memory, chunksize=chunksize):
+
+            results.append(result)
+            if (len(results) == flush):
+                taq_quotes_trades_stats_save_data(results, year, window)
+                results = []
+
+    finally:
+        # The finished days are saved even if a day fails
+        taq_quotes_trades_stats_save_data(results, year, window)
+
+    print('Data Saved')
+    print()
+
+    return None
+
 # ----------------------------------------------------------------------------
 
 
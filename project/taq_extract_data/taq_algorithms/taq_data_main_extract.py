@@ -4,8 +4,6 @@ The functions in the module run the complete extraction, analysis and plot of
 the TAQ data.
 
 This script requires the following modules:
-    * itertools.product
-    * multiprocessing
     * os
     * pandas
     * taq_data_analysis_extract
@@ -22,8 +20,6 @@ The module contains the following functions:
 # -----------------------------------------------------------------------------
 # Modules
 
-from itertools import product as iprod
-import multiprocessing as mp
 import os
 import pandas as pd
 import pickle
@@ -44,20 +40,10 @@ def taq_data_plot_generator(tickers, year):
      a value.
     """
 
-    date_list = taq_data_tools_extract.taq_bussiness_days(year)
-
-    # Parallel computing
-    with mp.Pool(processes=mp.cpu_count()) as pool:
-        # Basic functions
-        pool.starmap(taq_data_analysis_extract
-                     .taq_midpoint_physical_data,
-                     iprod(tickers, date_list))
-    # Parallel computing
-    with mp.Pool(processes=mp.cpu_count()) as pool:
-        # Basic functions
-        pool.starmap(taq_data_analysis_extract
-                     .taq_trade_signs_physical_data,
-                     iprod(tickers, date_list))
+    # Midpoint price, spread, trade signs and statistics of every day with
+    # one read of the data
+    taq_data_analysis_extract \
+        .taq_quotes_trades_physical_year_data(tickers, year)
 
     return None
 
@@ -84,6 +70,9 @@ def main():
     # Run analysis
     # Use the following function if you have all the C++ modules
     # taq_data_analysis_extract.taq_build_from_scratch(tickers, year)
+    # Use this function to extract the data without the year CSV files
+    # taq_data_analysis_extract.taq_build_from_scratch(tickers, year,
+    #                                                  stream=True)
     # Use this function if you have the year CSV files of the stocks
     # taq_data_analysis_extract.taq_daily_data_extract(tickers, year)
 
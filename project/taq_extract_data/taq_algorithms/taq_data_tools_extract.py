@@ -5,19 +5,52 @@ whole implementation. These tools improve the way the tasks are standardized
 in the modules that use them.
 
 This script requires the following modules:
+    * multiprocessing
+    * numpy
     * os
     * pandas
+    * pandas.tseries.holiday
     * pickle
+    * resource
     * subprocess
+    * time
 
 The module contains the following functions:
     * taq_save_data - saves computed data.
+    * taq_save_array - saves a computed array in a .npy file.
+    * taq_save_time_axis - saves the time axis of the physical time series.
     * taq_function_header_print_data - prints info about the function running.
     * taq_start_folders - creates folders to save data and plots.
     * taq_initial_data - takes the initial values for the analysis.
-    * taq_business_days - creates a list of week days for a year.
+    * taq_holidays_data - creates a list of the NYSE holidays for a year.
+    * taq_early_closes_data - creates a list of the NYSE early closes for a
+      year.
+    * taq_market_window_data - gets the market time of a trading day.
+    * taq_business_days - creates a list of the trading days for a year.
     * taq_decompress - decompress original data format to CSV file.
+    * taq_decompress_stream - decompress original data format to a pipe.
     * taq_get_tickers_data - gets the available ticker names.
+    * taq_read_data - reads the TAQ data of a ticker in a day.
+    * taq_catalog_entries_data - saves the catalog entries of a ticker.
+    * taq_catalog_merge_data - merges the partial catalog files.
+    * taq_catalog_save_data - saves the catalog of the year.
+    * taq_catalog_scan_data - builds the catalog from the HDF5 files.
+    * taq_catalog_data - loads the catalog of the extracted data.
+    * taq_catalog_days_data - gets the complete days in the catalog.
+    * taq_catalog_ticker_days_data - gets the complete days of every
+      ticker in the catalog.
+    * taq_catalog_tickers_data - gets the tickers in the catalog.
+    * taq_manifest_data - loads the manifest of the completed work.
+    * taq_manifest_update_data - adds completed units to the manifest.
+    * taq_manifest_pending_data - gets the missing or stale units.
+    * taq_memory_available_data - gets the available memory of the node.
+    * taq_memory_budget_data - gets the memory budget of a stage.
+    * taq_workers_data - gets the number of workers that fit in a memory
+      budget.
+    * taq_task_memory_data - runs tasks and measures the peak memory of the
+      worker.
+    * taq_pool_imap_data - runs the tasks of a stage in a memory budgeted
+      pool.
     * main - the main function of the script.
 
 .. moduleauthor:: Juan Camilo Henao Londono <www.github.com/juanhenao21>
@@ -26,10 +59,28 @@ The module contains the following functions:
 # -----------------------------------------------------------------------------
 # Modules
 
+import multiprocessing as mp
+import numpy as np
 import os
 import pandas as pd
+from pandas.tseries.holiday import (GoodFriday, Holiday, USLaborDay,
+                                    USMartinLutherKingJr, USMemorialDay,
+                                    USPresidentsDay, USThanksgivingDay,
+                                    nearest_workday, sunday_to_monday)
 import pickle
+import resource
 import subprocess
+import time
+
+# Columns of the catalog of the extracted data
+__catalog_columns__ = ['Ticker', 'Type', 'Date', 'Path', 'Rows', 'Bytes',
+                       'Time_Min', 'Time_Max']
+# Columns of the manifest of the completed work
+__manifest_columns__ = ['Ticker', 'Type', 'Date', 'Stage', 'Mtime']
+# Fraction of the available memory used by default by a stage
+__memory_fraction__ = 0.8
+# Bytes of memory of a worker before it runs a task
+__worker_memory__ = 2 ** 28
 
 # -----------------------------------------------------------------------------
 
@@ -88,6 +139,80 @@ def taq_save_data(function_name, data, ticker_i, ticker_j, year, month, day):
 # -----------------------------------------------------------------------------
 
 
+def taq_save_array(function_name, name, data, ticker, year, month, day):
+    """ Saves a computed array in a .npy file.
+
+    Saves the arrays generated in the functions of the
+    taq_data_analysis_extract module in raw .npy files, that can be read as
+    memory maps with np.load(..., mmap_mode='r'). The array is written to a
+    temporary file that is renamed, so a partial file is never read.
+
+    :param function_name: name of the function that generates the data.
+    :param name: string with the name of the array (i.e. 'midpoint').
+    :param data: numpy array to be saved.
+    :param ticker: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param year: string of the year to be analyzed (i.e '2016').
+    :param month: string of the month to be analyzed (i.e '07').
+    :param day: string of the day to be analyzed (i.e '07').
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    # Saving data
+
+    f_path = f'../../taq_data/extract_data_{year}/{function_name}/'
+
+    if (not os.path.isdir(f_path)):
+
+        try:
+            os.mkdir(f_path)
+            print('Folder to save data created')
+
+        except FileExistsError:
+            print('Folder exists. The folder was not created')
+
+    f_name = f_path + f'{function_name}_{name}_{year}{month}{day}_{ticker}.npy'
+
+    with open(f'{f_name}.{os.getpid()}.tmp', 'wb') as f_tmp:
+        np.save(f_tmp, data)
+    os.replace(f'{f_name}.{os.getpid()}.tmp', f_name)
+
+    return None
+
+# -----------------------------------------------------------------------------
+
+
+def taq_save_time_axis(function_name, data, year):
+    """ Saves the time axis of the physical time series once.
+
+    All the regular trading days share the same time axis, so it is saved in
+    a single .npy file that is written only if it does not exist or if the
+    window of the series changed. The early closes use the first seconds of
+    the time axis. The seconds are saved as int32.
+
+    :param function_name: name of the function that generates the data.
+    :param data: numpy array with the time axis.
+    :param year: string of the year to be analyzed (i.e '2016').
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    f_name = f'../../taq_data/extract_data_{year}/{function_name}/' \
+        + f'{function_name}_time.npy'
+
+    if (not os.path.isfile(f_name)
+            or not np.array_equal(np.load(f_name, mmap_mode='r'), data)):
+
+        with open(f'{f_name}.{os.getpid()}.tmp', 'wb') as f_tmp:
+            np.save(f_tmp, data.astype(np.int32))
+        os.replace(f'{f_name}.{os.getpid()}.tmp', f_name)
+
+    return None
+
+# -----------------------------------------------------------------------------
+
+
 def taq_function_header_print_data(function_name, ticker_i, ticker_j, year,
                                    month, day):
     """Prints a header of a function that generates data when it is running.
@@ -193,10 +318,108 @@ def taq_initial_data():
 # -----------------------------------------------------------------------------
 
 
-def taq_bussiness_days(year):
+def taq_holidays_data(year):
+    """Generates a list with the dates of the NYSE holidays in a year.
+
+    The holidays that fall on a weekend are observed on the nearest week day,
+    except the New Year's Day on a Saturday, which is not observed. The
+    special closures of the exchange are included.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: list.
+    """
+
+    init_date = f'01/01/{year}'
+    last_date = f'12/31/{year}'
+
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01',
+                observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4,
+                observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas Day', month=12, day=25, observance=nearest_workday)
+    ]
+
+    # Closures of the exchange out of the regular holidays
+    special_closures = ['2001-09-11', '2001-09-12', '2001-09-13',
+                        '2001-09-14', '2004-06-11', '2007-01-02',
+                        '2012-10-29', '2012-10-30', '2018-12-05',
+                        '2025-01-09']
+
+    holidays = [pd.DatetimeIndex(rule.dates(init_date, last_date))
+                for rule in rules]
+    date_list = pd.DatetimeIndex([]).append(holidays) \
+        .strftime('%Y-%m-%d').tolist()
+    date_list += [date for date in special_closures
+                  if date.startswith(f'{year}-')]
+
+    return sorted(date_list)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_early_closes_data(year):
+    """Generates a list with the dates of the NYSE early closes in a year.
+
+    The exchange closes at 13h00 on the 3rd of July, the day after
+    Thanksgiving and the Christmas Eve, when they are trading days.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: list.
+    """
+
+    holidays = taq_holidays_data(year)
+
+    thanksgiving = USThanksgivingDay.dates(f'01/01/{year}', f'12/31/{year}')
+    date_list = [f'{year}-07-03', f'{year}-12-24'] \
+        + [(day + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+           for day in thanksgiving]
+
+    return sorted([date for date in date_list
+                   if pd.Timestamp(date).weekday() < 5
+                   and date not in holidays])
+
+# -----------------------------------------------------------------------------
+
+
+def taq_market_window_data(date):
+    """Gets the market time of a trading day.
+
+    The market time is from 9h30 (34200 s) to 16h00 (57600 s), or to 13h00
+    (46800 s) in the early closes.
+
+    :param date: string with the date of the data to be extracted
+     (i.e. '2008-01-02').
+    :return: tuple -- The function returns a tuple with the open and close
+     times in seconds.
+    """
+
+    if (date in taq_early_closes_data(date.split('-')[0])):
+        return (34200, 46800)
+
+    else:
+        return (34200, 57600)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_bussiness_days(year, data_dates=None):
     """Generates a list with the dates of the bussiness days in a year
 
+    The week days that are NYSE holidays are not used. With data_dates only
+    the days with data are used.
+
     :param year: string of the year to be analyzed (i.e '2008').
+    :param data_dates: list of strings with the dates with data
+     (i.e. ['2008-01-02', '2008-01-03']). Default None uses all the trading
+     days.
     :return: list.
     """
 
@@ -208,6 +431,14 @@ def taq_bussiness_days(year):
     dt_df = dt.to_frame(index=False)
     date_list = dt_df[0].astype(str).tolist()
 
+    # Remove the holidays
+    holidays = taq_holidays_data(year)
+    date_list = [date for date in date_list if date not in holidays]
+
+    if (data_dates is not None):
+        data_dates = set(data_dates)
+        date_list = [date for date in date_list if date in data_dates]
+
     return date_list
 
 # -----------------------------------------------------------------------------
@@ -238,6 +469,38 @@ def taq_decompress(ticker, year, type):
 # ----------------------------------------------------------------------------
 
 
+def taq_decompress_stream(ticker, year, type):
+    """Decompress original data format to a pipe.
+
+    Runs the decompression of the original data with the output in a pipe,
+    so the data can be parsed while it is decompressed, without the CSV file.
+
+    :param ticker: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param year: string of the year to be analyzed (i.e '2008').
+    :param type: string with the word 'quotes' or 'trades'.
+    :return: Popen -- The function returns the running process, with the
+     decompressed data in its stdout. Raises FileNotFoundError if there is no
+     original data.
+    """
+
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+    f_path = root_path + f'/taq_data/original_year_data_{year}/'
+    f_file = f'{ticker}_{year}_NASDAQ.{type}'
+
+    if (not os.path.isfile(f_path + f_file)):
+        raise FileNotFoundError(f'No original {type} data for {ticker} in '
+                                + f'{f_path}')
+
+    return subprocess.Popen(['./decompress.out', f_file], cwd=f_path,
+                            stdout=subprocess.PIPE)
+
+# ----------------------------------------------------------------------------
+
+
 def taq_get_tickers_data(year):
     """Gets the available ticker names.
 
@@ -258,8 +521,15 @@ def taq_get_tickers_data(year):
         f_path = root_path + f'/taq_data/csv_year_data_{year}'
         files = os.listdir(f_path)
     else:
+        # Using the catalog of the extracted data
+        tickers = taq_catalog_tickers_data(year)
+        if (tickers is not None):
+            return tickers
         # Using HDF5 files
         f_path = root_path + f'/taq_data/hdf5_daily_data_{year}'
+        if (not os.path.exists(f_path)):
+            # Using HDF5 year files
+            f_path = root_path + f'/taq_data/hdf5_year_data_{year}'
         files = os.listdir(f_path)
 
     tickers = []
@@ -285,6 +555,644 @@ def taq_get_tickers_data(year):
 # -----------------------------------------------------------------------------
 
 
+def taq_read_data(ticker, type, date, columns=None):
+    """Reads the TAQ data of a ticker in a day.
+
+    Reads the daily HDF5 file of the day if it exists. Otherwise slices the
+    row range of the day from the HDF5 file of the ticker and year, using its
+    date index.
+
+    :param ticker: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param type: string with the type of the data to be read
+     (i.e. 'trades' or 'quotes').
+    :param date: string with the date of the data to be read
+     (i.e. '2008-01-02').
+    :param columns: list of the columns to be read (i.e. ['Bid', 'Ask']).
+     Default None reads all the columns.
+    :return: DataFrame -- The function returns a pandas DataFrame. Raises
+     FileNotFoundError if there is no data for the day.
+    """
+
+    year = date.split('-')[0]
+
+    # The module is used in other folders, so it is necessary to use
+    # absolute paths instead of relative paths
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+
+    daily_file = root_path + f'/taq_data/hdf5_daily_data_{year}/taq_{ticker}' \
+        + f'_{type}_{date}.h5'
+    year_file = root_path + f'/taq_data/hdf5_year_data_{year}/taq_{ticker}' \
+        + f'_{type}_{year}.h5'
+
+    if (os.path.isfile(daily_file) or not os.path.isfile(year_file)):
+        return pd.read_hdf(daily_file, key=f'/{type}', columns=columns)
+
+    with pd.HDFStore(year_file, mode='r') as store:
+
+        date_index = store.select('date_index')
+        date_index = date_index[date_index['Date'] == date]
+
+        if (date_index.empty):
+            raise FileNotFoundError(f'No {type} data for {ticker} the {date} '
+                                    + f'in {year_file}')
+
+        data = pd.concat([store.select(type, start=start, stop=stop,
+                                       columns=columns)
+                          for start, stop in zip(date_index['Start'],
+                                                 date_index['Stop'])])
+
+    return data
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_entries_data(ticker, type, year, entries):
+    """Saves the catalog entries of an extracted ticker and type.
+
+    Every extraction task writes its entries in a partial catalog file, so
+    the tasks running in parallel do not write the same file. The partial
+    files are merged in the catalog of the year with the
+    taq_catalog_merge_data function.
+
+    :param ticker: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param type: string with the type of the data (i.e. 'trades' or
+     'quotes').
+    :param year: string of the year to be analyzed (i.e '2008').
+    :param entries: list of the entries of the days of the ticker, every
+     entry with the values of the catalog columns.
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+    f_path = root_path + f'/taq_data/taq_catalog_{year}/'
+
+    if (not os.path.isdir(f_path)):
+
+        try:
+            os.mkdir(f_path)
+
+        except FileExistsError:
+            pass
+
+    f_file = f_path + f'taq_catalog_{ticker}_{type}.csv'
+    catalog = pd.DataFrame(entries, columns=__catalog_columns__)
+    # Write and rename, so a partial file is never read half written
+    catalog.to_csv(f_file + '.tmp', index=False)
+    os.replace(f_file + '.tmp', f_file)
+
+    return None
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_merge_data(year):
+    """Merges the partial catalog files in the catalog of the year.
+
+    The entries of a ticker and type in a partial file replace all the
+    previous entries of the ticker and type in the catalog. The partial files
+    are removed after the merge.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: list -- The function returns a list with the tuples of the
+     ticker and type of the merged partial files.
+    """
+
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+    f_path = root_path + f'/taq_data/taq_catalog_{year}/'
+
+    if (not os.path.isdir(f_path)):
+        return []
+
+    files = [f_path + file for file in sorted(os.listdir(f_path))
+             if file.endswith('.csv')]
+
+    if (not files):
+        return []
+
+    parts = [pd.read_csv(file, dtype={'Ticker': str, 'Date': str})
+             for file in files]
+    # Tickers and types of the partial files
+    keys = set(tuple(file.split('/')[-1][:-4].split('_')[2:])
+               for file in files)
+
+    catalog = taq_catalog_data(year)
+    if (catalog is not None):
+        # Keep the entries of the tickers and types not extracted again
+        keep = [key not in keys
+                for key in zip(catalog['Ticker'], catalog['Type'])]
+        parts = [catalog[keep]] + parts
+
+    catalog = pd.concat(parts, ignore_index=True)
+    taq_catalog_save_data(catalog, year)
+
+    for file in files:
+        os.remove(file)
+
+    return sorted(keys)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_save_data(catalog, year):
+    """Saves the catalog of the year.
+
+    :param catalog: DataFrame with the catalog columns.
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+    f_file = root_path + f'/taq_data/taq_catalog_{year}.csv'
+
+    catalog = catalog.sort_values(['Ticker', 'Type', 'Date'],
+                                  kind='stable')
+    # Write and rename, so the catalog is never read half written
+    catalog.to_csv(f_file + '.tmp', index=False,
+                   columns=__catalog_columns__)
+    os.replace(f_file + '.tmp', f_file)
+
+    return None
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_scan_data(year):
+    """Builds the catalog of the year from the extracted HDF5 files.
+
+    Used once for the data extracted before the catalog existed. The daily
+    and year HDF5 files are read to obtain the rows and time range of every
+    day.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+
+    entries = []
+
+    # Daily files
+    f_dir = f'hdf5_daily_data_{year}'
+    f_path = root_path + f'/taq_data/{f_dir}/'
+    # The .h5.part files of an unfinished extraction are not used
+    files = [file for file in os.listdir(f_path) if file.endswith('.h5')] \
+        if (os.path.isdir(f_path)) else []
+
+    for file in sorted(files):
+
+        _, ticker, type, date = file[:-3].split('_')
+        time = pd.read_hdf(f_path + file, key=f'/{type}',
+                           columns=['Time'])['Time']
+        entries.append([ticker, type, date, f'{f_dir}/{file}', len(time),
+                        os.path.getsize(f_path + file), time.min(),
+                        time.max()])
+
+    # Year files
+    f_dir = f'hdf5_year_data_{year}'
+    f_path = root_path + f'/taq_data/{f_dir}/'
+    files = [file for file in os.listdir(f_path) if file.endswith('.h5')] \
+        if (os.path.isdir(f_path)) else []
+
+    for file in sorted(files):
+
+        _, ticker, type, _ = file[:-3].split('_')
+
+        with pd.HDFStore(f_path + file, mode='r') as store:
+            date_index = store.select('date_index')
+            time = store.select(type, columns=['Time'])['Time'].values
+
+        days = {}
+        for date, start, stop in zip(date_index['Date'],
+                                     date_index['Start'],
+                                     date_index['Stop']):
+            days.setdefault(date, []).append(time[start:stop])
+
+        for date, times in days.items():
+            times = np.concatenate(times)
+            entries.append([ticker, type, date, f'{f_dir}/{file}',
+                            len(times), os.path.getsize(f_path + file),
+                            times.min(), times.max()])
+
+    catalog = pd.DataFrame(entries, columns=__catalog_columns__)
+    taq_catalog_save_data(catalog, year)
+
+    return None
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_data(year):
+    """Loads the catalog of the extracted data of a year.
+
+    The catalog has an entry for every ticker, type and day extracted, with
+    the path of the HDF5 file, the number of rows, the size in bytes of the
+    file and the time range of the day.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: DataFrame -- The function returns a pandas DataFrame, or None if
+     there is no catalog for the year.
+    """
+
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+    f_file = root_path + f'/taq_data/taq_catalog_{year}.csv'
+
+    if (not os.path.isfile(f_file)):
+        return None
+
+    return pd.read_csv(f_file, dtype={'Ticker': str, 'Date': str})
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_days_data(year, tickers=None):
+    """Gets the complete days in the catalog of a year.
+
+    A day is complete for a ticker when it has quotes and trades data.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :param tickers: list of the string abbreviation of the stocks
+     (i.e. ['AAPL', 'MSFT']). The days must be complete for all the tickers.
+     Default None uses the days complete for any ticker.
+    :return: list -- The function returns a sorted list with the dates, or
+     None if there is no catalog for the year.
+    """
+
+    catalog = taq_catalog_data(year)
+
+    if (catalog is None):
+        return None
+
+    if (tickers is not None):
+        catalog = catalog[catalog['Ticker'].isin(tickers)]
+
+    types = catalog.groupby(['Ticker', 'Date'])['Type'].nunique()
+    complete = types[types == 2].reset_index()
+
+    if (tickers is None):
+        return sorted(complete['Date'].unique())
+
+    counts = complete.groupby('Date')['Ticker'].nunique()
+
+    return sorted(counts[counts == len(set(tickers))].index)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_ticker_days_data(year):
+    """Gets the complete days of every ticker in the catalog of a year.
+
+    A day is complete for a ticker when it has quotes and trades data.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: dict -- The function returns a dictionary with the tickers as
+     keys and sorted lists with the dates as values, or None if there is no
+     catalog for the year.
+    """
+
+    catalog = taq_catalog_data(year)
+
+    if (catalog is None):
+        return None
+
+    types = catalog.groupby(['Ticker', 'Date'])['Type'].nunique()
+    complete = types[types == 2].reset_index()
+
+    return {ticker: sorted(days['Date'])
+            for ticker, days in complete.groupby('Ticker')}
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_tickers_data(year, complete=False):
+    """Gets the tickers in the catalog of a year.
+
+    A ticker is complete when it has quotes and trades data for every trading
+    day of the year.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :param complete: bool to return only the complete tickers. Default False
+     returns all the tickers in the catalog.
+    :return: list -- The function returns a sorted list with the tickers, or
+     None if there is no catalog for the year.
+    """
+
+    catalog = taq_catalog_data(year)
+
+    if (catalog is None):
+        return None
+
+    if (not complete):
+        return sorted(catalog['Ticker'].unique())
+
+    days = taq_bussiness_days(year)
+    catalog = catalog[catalog['Date'].isin(days)]
+    types = catalog.groupby(['Ticker', 'Date'])['Type'].nunique()
+    counts = (types == 2).groupby(level='Ticker').sum()
+
+    return sorted(counts[counts == len(days)].index)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_manifest_data(year):
+    """Loads the manifest of the completed work of a year.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: DataFrame -- The function returns a pandas DataFrame with the
+     ticker, type, date, stage and completion time of every completed unit.
+     The DataFrame is empty if there is no manifest.
+    """
+
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+    f_file = root_path + f'/taq_data/taq_manifest_{year}.csv'
+
+    if (not os.path.isfile(f_file)):
+        return pd.DataFrame(columns=__manifest_columns__)
+
+    return pd.read_csv(f_file, dtype={'Ticker': str, 'Type': str,
+                                      'Date': str, 'Stage': str},
+                       keep_default_na=False)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_manifest_update_data(year, stage, units, prefix=None):
+    """Adds completed units of a stage to the manifest of the year.
+
+    The manifest is only written by the parent process, in a temporary file
+    that replaces the manifest, so a crash never leaves it half written. A
+    unit already in the manifest is replaced, so it is never duplicated. With
+    prefix the unit is also removed from the stages that save the same files,
+    like the physical time series with other windows.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :param stage: string with the name of the stage
+     (i.e. 'taq_data_extract').
+    :param units: list of tuples with the ticker, type and date of the
+     completed units (i.e. [('AAPL', 'quotes', '2008')]).
+    :param prefix: string with the prefix of the stages whose entries of the
+     units are replaced. Default None only replaces the entries of the stage.
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    if (not units):
+        return None
+
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+    f_file = root_path + f'/taq_data/taq_manifest_{year}.csv'
+
+    completed = pd.DataFrame([tuple(unit) + (stage, time.time())
+                              for unit in units],
+                             columns=__manifest_columns__)
+
+    manifest = taq_manifest_data(year)
+    if (not manifest.empty):
+        keys = set(tuple(unit) for unit in units)
+        keep = [(unit not in keys
+                 or (stage_m != stage if prefix is None
+                     else not stage_m.startswith(prefix)))
+                for unit, stage_m in zip(zip(manifest['Ticker'],
+                                             manifest['Type'],
+                                             manifest['Date']),
+                                         manifest['Stage'])]
+        completed = pd.concat([manifest[keep], completed],
+                              ignore_index=True)
+
+    completed.to_csv(f_file + '.tmp', index=False)
+    os.replace(f_file + '.tmp', f_file)
+
+    return None
+
+# -----------------------------------------------------------------------------
+
+
+def taq_manifest_pending_data(year, stage, units, inputs=None):
+    """Gets the units of a stage that are missing or stale in the manifest.
+
+    A completed unit is stale when one of its input files was modified after
+    the unit was completed.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :param stage: string with the name of the stage
+     (i.e. 'taq_data_extract').
+    :param units: list of tuples with the ticker, type and date of the units
+     (i.e. [('AAPL', 'quotes', '2008')]).
+    :param inputs: list with a list of the paths of the input files of every
+     unit. The files that do not exist are not used. Default None does not
+     check if the units are stale.
+    :return: list -- The function returns a list with the pending units.
+    """
+
+    manifest = taq_manifest_data(year)
+    manifest = manifest[manifest['Stage'] == stage]
+    done = dict(zip(zip(manifest['Ticker'], manifest['Type'],
+                        manifest['Date']),
+                    manifest['Mtime'].astype(float)))
+
+    pending = []
+    for u_idx, unit in enumerate(units):
+
+        if (tuple(unit) not in done):
+            pending.append(unit)
+
+        elif (inputs is not None):
+            mtimes = [os.path.getmtime(f_input) for f_input in inputs[u_idx]
+                      if os.path.isfile(f_input)]
+            if (mtimes and max(mtimes) > done[tuple(unit)]):
+                pending.append(unit)
+
+    return pending
+
+# -----------------------------------------------------------------------------
+
+
+def taq_memory_available_data():
+    """Gets the available memory of the node.
+
+    Reads the memory that can be used without swapping (MemAvailable) from
+    /proc/meminfo. When the file does not exist, the free physical memory is
+    used.
+
+    :return: int -- The function returns the available memory in bytes.
+    """
+
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if (line.startswith('MemAvailable:')):
+                    # The value is in kB
+                    return int(line.split()[1]) * 1024
+
+    except FileNotFoundError:
+        pass
+
+    return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+
+# -----------------------------------------------------------------------------
+
+
+def taq_memory_budget_data(memory=None):
+    """Gets the memory budget of a stage.
+
+    :param memory: integer with the memory budget in bytes. Default None uses
+     a fraction of the available memory of the node.
+    :return: int -- The function returns the memory budget in bytes.
+    """
+
+    if (memory is None):
+        memory = int(__memory_fraction__ * taq_memory_available_data())
+
+    return memory
+
+# -----------------------------------------------------------------------------
+
+
+def taq_workers_data(task_memory=__worker_memory__, memory=None,
+                     tasks=None):
+    """Gets the number of workers that fit in a memory budget.
+
+    The number of workers is the number of CPUs, limited by the number of
+    tasks and by the number of tasks that fit in the memory budget. There is
+    always at least one worker.
+
+    :param task_memory: integer with the peak memory of a worker running a
+     task in bytes.
+    :param memory: integer with the memory budget in bytes. Default None uses
+     a fraction of the available memory of the node.
+    :param tasks: integer with the number of tasks. Default None does not
+     limit the number of workers.
+    :return: int -- The function returns the number of workers.
+    """
+
+    workers = min(mp.cpu_count(),
+                  taq_memory_budget_data(memory) // max(task_memory, 1))
+    if (tasks is not None):
+        workers = min(workers, tasks)
+
+    return max(int(workers), 1)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_task_memory_data(function, tasks):
+    """Runs tasks and measures the peak memory of the worker.
+
+    The peak resident memory of the worker includes the processes it waited
+    for, like the decompression.
+
+    :param function: function of the tasks. It must be defined at module
+     level.
+    :param tasks: list with a tuple of the arguments of every task.
+    :return: tuple -- The function returns a tuple with the list of the
+     results of the tasks and the peak memory of the worker in bytes.
+    """
+
+    results = [function(*args) for args in tasks]
+
+    # The peak resident memory is in kB in Linux
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+    return results, peak * 1024
+
+# -----------------------------------------------------------------------------
+
+
+def taq_pool_imap_data(function, tasks, task_memory=__worker_memory__,
+                       memory=None, chunksize=1):
+    """Runs the tasks of a stage in a memory budgeted pool.
+
+    The pool has the workers that fit in the memory budget with the estimated
+    memory of a task. The estimate is replaced by the peak memory measured in
+    the workers when it is larger, and then fewer tasks run at the same time.
+    A new task only starts when the available memory of the node is larger
+    than the estimate, so under memory pressure the pool waits for the
+    running tasks instead of being killed. One task always runs.
+
+    :param function: function of the tasks. It must be defined at module
+     level.
+    :param tasks: list with a tuple of the arguments of every task.
+    :param task_memory: integer with the estimated peak memory of a worker
+     running a task in bytes.
+    :param memory: integer with the memory budget in bytes. Default None uses
+     a fraction of the available memory of the node.
+    :param chunksize: integer with the number of tasks sent to a worker at
+     once (default 1).
+    :return: generator -- The function yields the results of the tasks in
+     the order they finish.
+    """
+
+    tasks = list(tasks)
+    if (not tasks):
+        return
+    tasks = [tasks[t_idx:t_idx + chunksize]
+             for t_idx in range(0, len(tasks), chunksize)]
+
+    memory = taq_memory_budget_data(memory)
+    workers = taq_workers_data(task_memory, memory, len(tasks))
+
+    with mp.Pool(processes=workers) as pool:
+
+        t_idx = 0
+        running = []
+
+        while (t_idx < len(tasks) or running):
+
+            # Start tasks while they fit in the budget and in the available
+            # memory
+            while (t_idx < len(tasks) and len(running) < workers
+                   and (not running
+                        or ((len(running) + 1) * task_memory <= memory
+                            and taq_memory_available_data()
+                            > task_memory))):
+                running.append(pool.apply_async(taq_task_memory_data,
+                                                (function, tasks[t_idx])))
+                t_idx += 1
+
+            running[0].wait(0.05)
+            ready = [task.ready() for task in running]
+            finished = [task for task, done in zip(running, ready) if done]
+            running = [task for task, done in zip(running, ready)
+                       if not done]
+
+            for task in finished:
+                results, peak = task.get()
+                task_memory = max(task_memory, peak)
+                yield from results
+
+# -----------------------------------------------------------------------------
+
+
 def main():
     """The main function of the script.
 
@@ -10,6 +10,8 @@ the `paper
 This script requires the following modules:
     * itertools.product
     * multiprocessing
+    * multiprocessing.resource_tracker
+    * multiprocessing.shared_memory
     * numpy
     * os
     * pandas
@@ -17,14 +19,76 @@ This script requires the following modules:
     * taq_data_tools_responses_physical
 
 The module contains the following functions:
+    * taq_lag_grid_responses_physical_data - creates a log-spaced grid of time
+      lags.
+    * taq_response_loop_responses_physical_data - computes the response for
+      all the time lags with a loop.
+    * taq_response_fft_responses_physical_data - computes the response for all
+      the time lags with FFT.
+    * taq_trade_sign_events_responses_physical_data - gets the seconds with
+      non zero trade signs.
+    * taq_response_sparse_responses_physical_data - computes the response for
+      all the time lags only over the seconds with trades.
+    * taq_response_engine_responses_physical_data - chooses the dense or
+      sparse engine.
+    * taq_response_kernel_responses_physical_data - computes the response with
+      the chosen engine.
+    * taq_task_memory_responses_physical_data - estimates the peak memory of
+      a worker running a response task.
+    * taq_response_sum_responses_physical_data - sums the responses of a
+      share of days in a worker.
     * taq_self_response_day_responses_physical_data - computes the self
       response of a day.
+    * taq_self_response_check_responses_physical_data - checks the FFT self
+      response of a day against the loop version.
     * taq_self_response_year_responses_physical_data - computes the self
       response of a year.
+    * taq_response_task_responses_physical_data - runs a task of the global
+      scheduler.
+    * taq_self_response_universe_responses_physical_data - computes the self
+      response of a year for all the tickers.
+    * taq_year_cube_ticker_responses_physical_data - fills a ticker in the
+      year cube.
+    * taq_year_cube_responses_physical_data - builds the year cube of
+      midpoint prices and trade signs.
+    * taq_year_cube_load_responses_physical_data - loads the year cube.
+    * taq_self_response_cube_block_responses_physical_data - computes the
+      self response of a block of tickers from the year cube.
+    * taq_self_response_cube_responses_physical_data - computes the self
+      response of many tickers from the year cube.
     * taq_cross_response_day_responses_physical_data - computes the cross
       response of a day.
+    * taq_cross_response_check_responses_physical_data - checks the FFT cross
+      response of a day against the loop version.
     * taq_cross_response_year_responses_physical_data - computes the cross
       response of a year.
+    * taq_cross_response_block_responses_physical_data - computes the cross
+      response of a block of tickers with all the tickers in a year.
+    * taq_cross_response_year_all_responses_physical_data - computes the cross
+      response of all the pairs of tickers in a year.
+    * taq_cross_response_pair_responses_physical_data - reads the cross
+      response of a pair from the all pairs store.
+    * taq_cross_response_shared_block_responses_physical_data - computes the
+      cross response of a block of pairs from shared memory.
+    * taq_cross_response_shared_responses_physical_data - computes the cross
+      response of a list of pairs with the days in shared memory.
+    * taq_correlator_loop_responses_physical_data - computes the trade sign
+      correlator for all the time lags with a loop.
+    * taq_correlator_fft_responses_physical_data - computes the trade sign
+      correlator for all the time lags with FFT.
+    * taq_correlator_kernel_responses_physical_data - computes the trade sign
+      correlator with the chosen engine.
+    * taq_trade_sign_self_correlator_day_responses_physical_data - computes
+      the trade sign self-correlator of a day.
+    * taq_trade_sign_self_correlator_year_responses_physical_data - computes
+      the trade sign self-correlator of a year.
+    * taq_trade_sign_cross_correlator_day_responses_physical_data - computes
+      the trade sign cross-correlator of a day.
+    * taq_trade_sign_cross_correlator_year_responses_physical_data - computes
+      the trade sign cross-correlator of a year.
+    * taq_trade_sign_correlator_universe_responses_physical_data - computes
+      the trade sign self- and cross-correlators of a year for all the
+      tickers and pairs.
     * main - the main function of the script.
 
 .. moduleauthor:: Juan Camilo Henao Londono <www.github.com/juanhenao21>
@@ -35,6 +99,7 @@ The module contains the following functions:
 
 from itertools import product as iprod
 import multiprocessing as mp
+from multiprocessing import resource_tracker, shared_memory
 import numpy as np
 import os
 import pandas as pd
@@ -47,125 +112,1747 @@ __tau__ = 10000
 # ----------------------------------------------------------------------------
 
 
-def taq_self_response_day_responses_physical_data(ticker, date):
+def taq_lag_grid_responses_physical_data(num=100, tau_max=__tau__):
+    """Creates a log-spaced grid of time lags.
+
+    The responses are plotted in a logarithmic scale, so a grid of about num
+    log-spaced integer time lags (:math:`\\tau`) between 1 and tau_max is
+    enough to show them.
+
+    :param num: integer with the number of points of the grid (i.e. 100).
+    :param tau_max: integer with the largest time lag (i.e. 10000).
+    :return: numpy array -- The function returns the sorted unique time lags.
+    """
+
+    return np.unique(np.rint(np.geomspace(1, tau_max, num)).astype(int))
+
+# ----------------------------------------------------------------------------
+
+
+def taq_response_loop_responses_physical_data(midpoint, trade_sign,
+                                              taus=None):
+    """Computes the response for all the time lags with a loop.
+
+    Reference implementation of the response function. For every time lag
+    (:math:`\\tau`) computes the sum of the midpoint price returns times the
+    trade signs and the number of non zero trade signs.
+
+    :param midpoint: numpy array with the midpoint price of every second.
+    :param trade_sign: numpy array with the trade signs of every second.
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    # Array of the average of each tau. 10^3 s is used in the paper
+    response_tau = np.zeros(len(taus))
+    num = np.zeros(len(taus))
+
+    # Calculating the midpoint price return and the response function
+
+    # Depending on the tau value
+    for tau_idx, tau in enumerate(taus):
+
+        trade_sign_tau = 1 * trade_sign[:-tau]
+        trade_sign_no_0_len = len(trade_sign_tau[trade_sign_tau != 0])
+        num[tau_idx] = trade_sign_no_0_len
+        # Obtain the midpoint price return. Displace the numerator tau
+        # values to the right and compute the return
+
+        # Midpoint price returns
+        log_return_sec = (midpoint[tau:] - midpoint[:-tau]) / midpoint[:-tau]
+
+        # Obtain the response value
+        if (trade_sign_no_0_len != 0):
+            product = log_return_sec * trade_sign_tau
+            response_tau[tau_idx] = np.sum(product)
+
+    return (response_tau, num)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_response_fft_responses_physical_data(midpoint, trade_sign,
+                                             taus=None):
+    """Computes the response for all the time lags with FFT.
+
+    The sum over t of ((m(t + tau) - m(t)) / m(t)) * s(t) is split in the
+    cross-correlation of m with s / m minus a prefix sum of s, so all the time
+    lags (:math:`\\tau`) are obtained in O(N log N). To reduce the rounding
+    error the midpoint price is centered around its mean before the
+    correlation, which leaves the returns unchanged. The arrays can have
+    leading dimensions that broadcast against each other, the response is
+    computed along the last axis. The transform of every midpoint price series
+    and the counts of every trade sign series are computed only once, so a
+    block of midpoint prices with shape (i, 1, N) and a block of trade signs
+    with shape (1, j, N) give the responses of all the (i, j) pairs. Only the
+    given time lags are taken from the correlation.
+
+    :param midpoint: numpy array with the midpoint price of every second.
+    :param trade_sign: numpy array with the trade signs of every second.
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :return: tuple -- The function returns a tuple with numpy arrays. The
+     number of trade signs has the leading dimensions of trade_sign.
+    """
+
+    midpoint = np.asarray(midpoint, dtype=float)
+    trade_sign = np.asarray(trade_sign, dtype=float)
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+    taus = np.asarray(taus, dtype=int)
+
+    shape = np.broadcast_shapes(midpoint.shape, trade_sign.shape)
+    n = shape[-1]
+    # The lags longer than the series have no terms
+    valid = taus <= n - 1
+    taus_v = taus[valid]
+    # Zero padding to avoid the circular overlap of the correlation
+    size = 1 << int(np.ceil(np.log2(2 * n)))
+
+    midpoint_c = midpoint - np.mean(midpoint, axis=-1, keepdims=True)
+    sign_midpoint = trade_sign / midpoint
+
+    # Correlation between s(t) / m(t) and m(t + tau)
+    corr = np.fft.irfft(np.conj(np.fft.rfft(sign_midpoint, size))
+                        * np.fft.rfft(midpoint_c, size), size)
+
+    # Prefix sums of s(t) (m(t) - m_mean) / m(t) and of the non zero signs
+    prefix = np.concatenate(
+        (np.zeros(shape[:-1] + (1,)),
+         np.cumsum(sign_midpoint * midpoint_c, axis=-1)), axis=-1)
+    prefix_num = np.concatenate(
+        (np.zeros(trade_sign.shape[:-1] + (1,)),
+         np.cumsum(trade_sign != 0, axis=-1)), axis=-1)
+
+    response_tau = np.zeros(shape[:-1] + (len(taus),))
+    num = np.zeros(trade_sign.shape[:-1] + (len(taus),))
+
+    num[..., valid] = prefix_num[..., n - taus_v]
+    response_tau[..., valid] = corr[..., taus_v] - prefix[..., n - taus_v]
+    # Without trade signs the response is exactly zero
+    response_tau = np.where(num == 0, 0., response_tau)
+
+    return (response_tau, num)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_trade_sign_events_responses_physical_data(trade_sign):
+    """Gets the seconds with non zero trade signs.
+
+    Sparse representation of a trade sign series, used for the tickers with
+    few trades.
+
+    :param trade_sign: numpy array with the trade signs of every second.
+    :return: tuple -- The function returns a tuple with a numpy array with
+     the index of the seconds with non zero trade signs and a numpy array with
+     their trade signs.
+    """
+
+    events = np.flatnonzero(trade_sign)
+    signs = np.asarray(trade_sign, dtype=float)[events]
+
+    return (events, signs)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_response_sparse_responses_physical_data(midpoint, trade_sign,
+                                                taus=None, chunk=1 << 20):
+    """Computes the response for all the time lags only over the trades.
+
+    Only the seconds with a non zero trade sign add terms to the response, so
+    for every one of them the returns of all the time lags (:math:`\\tau`)
+    are gathered and added. The cost scales with the number of seconds with
+    trades times the number of time lags. The number of trade signs of every
+    lag is the number of trades before the last tau seconds. The seconds are
+    processed in groups of at most chunk values.
+
+    :param midpoint: numpy array with the midpoint price of every second.
+    :param trade_sign: numpy array with the trade signs of every second.
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param chunk: integer with the maximum number of values gathered at once
+     (i.e. 2 ** 20).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+    taus = np.asarray(taus, dtype=int)
+
+    midpoint = np.asarray(midpoint, dtype=float)
+    n = len(midpoint)
+
+    events, signs = taq_trade_sign_events_responses_physical_data(trade_sign)
+
+    response_tau = np.zeros(len(taus))
+    events_chunk = max(1, chunk // len(taus))
+
+    for e_start in range(0, len(events), events_chunk):
+
+        events_c = events[e_start:e_start + events_chunk]
+        midpoint_e = midpoint[events_c][:, None]
+        idx = events_c[:, None] + taus[None, :]
+
+        # Midpoint price returns of every trade. The lags out of the day
+        # have no terms
+        log_return_sec = (midpoint[np.minimum(idx, n - 1)] - midpoint_e) \
+            / midpoint_e
+        log_return_sec[idx >= n] = 0.
+
+        response_tau += np.sum(log_return_sec
+                               * signs[e_start:e_start + events_chunk, None],
+                               axis=0)
+
+    num = np.searchsorted(events, n - taus).astype(float)
+
+    return (response_tau, num)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_response_engine_responses_physical_data(trade_sign, taus=None,
+                                                ratio=5):
+    """Chooses the dense or sparse engine for a trade sign series.
+
+    The cost of the sparse engine is the number of seconds with trades times
+    the number of time lags, and the cost of the FFT engine is about
+    size * log2(size) for the padded size of the series. The sparse engine is
+    chosen when its cost is ratio times smaller, which happens for the
+    tickers with few trades.
+
+    :param trade_sign: numpy array with the trade signs of every second.
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param ratio: integer with the measured cost ratio between the engines
+     (i.e. 5).
+    :return: string -- The function returns 'sparse' or 'fft'.
+    """
+
+    num_taus = __tau__ if taus is None else len(taus)
+    n = np.shape(trade_sign)[-1]
+    size = 1 << int(np.ceil(np.log2(2 * n)))
+
+    if (np.count_nonzero(trade_sign) * num_taus * ratio
+            < size * np.log2(size)):
+        return 'sparse'
+
+    else:
+        return 'fft'
+
+# ----------------------------------------------------------------------------
+
+
+def taq_response_kernel_responses_physical_data(midpoint, trade_sign,
+                                                engine='fft', taus=None):
+    """Computes the response for all the time lags with the chosen engine.
+
+    :param midpoint: numpy array with the midpoint price of every second.
+    :param trade_sign: numpy array with the trade signs of every second.
+    :param engine: string with the implementation to be used, 'fft' (default),
+     'sparse' (only the seconds with trades), 'auto' (dense or sparse
+     depending on the number of trades) or 'loop' (reference
+     implementation).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    if (engine == 'auto'):
+        engine = taq_response_engine_responses_physical_data(trade_sign, taus)
+
+    if (engine == 'fft'):
+        return taq_response_fft_responses_physical_data(midpoint, trade_sign,
+                                                        taus)
+
+    elif (engine == 'sparse'):
+        return taq_response_sparse_responses_physical_data(midpoint,
+                                                           trade_sign, taus)
+
+    elif (engine == 'loop'):
+        return taq_response_loop_responses_physical_data(midpoint, trade_sign,
+                                                         taus)
+
+    else:
+        raise ValueError(f'Unknown engine {engine}')
+
+# ----------------------------------------------------------------------------
+
+
+def taq_task_memory_responses_physical_data(pairs=1, rows=1, series=0,
+                                            taus=None, bin_size=1):
+    """Estimates the peak memory of a worker running a response task.
+
+    A batched call of the FFT kernel holds at most about four arrays of the
+    padded size for every pair (the spectra, their product and the
+    correlation) and a few arrays with the time lags. Every row accumulated
+    by the task holds the sum of the responses, the number of trade signs
+    and their ratio. The length of the series is the whole market session,
+    which is the longest window. The estimate is used to size the pools of
+    the responses and correlators with the taq_workers_data function.
+
+    :param pairs: integer with the number of pairs computed in one batched
+     call of the kernel (i.e. 1).
+    :param rows: integer with the number of rows of time lags accumulated by
+     the task (i.e. 1).
+    :param series: integer with the number of series of a day held by the
+     task besides the kernel (i.e. 0).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param bin_size: integer with the seconds of the bins of the series
+     (i.e. 1).
+    :return: int -- The function returns the estimated memory in bytes.
+    """
+
+    num_taus = __tau__ if taus is None else len(taus)
+    # Seconds of the whole market session (34200 s = 9h30 - 57600 s = 16h00)
+    length = (57600 - 34200) // bin_size
+    size = 1 << int(np.ceil(np.log2(2 * length)))
+
+    task_memory = 8 * (pairs * (4 * size + 4 * num_taus)
+                       + 3 * rows * num_taus + series * length)
+
+    return int(taq_data_tools_responses_physical.__worker_memory__
+               + task_memory)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_response_sum_responses_physical_data(day_function, args_list):
+    """Sums the responses of a share of days in a worker.
+
+    Runs the day function for every tuple of arguments and accumulates the
+    responses and the number of trade signs, so a worker returns only one
+    partial aggregate instead of one result per day.
+
+    :param day_function: function that computes the response of a day and
+     returns a tuple with the response and the number of trade signs.
+    :param args_list: non empty list of tuples with the arguments of the day
+     function (i.e. [('AAPL', '2008-01-02'), ('AAPL', '2008-01-03')]).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    response_sum = 0.
+    num_sum = 0.
+
+    for args in args_list:
+        response, num = day_function(*args)
+        response_sum += response
+        num_sum += num
+
+    return (response_sum, num_sum)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_self_response_day_responses_physical_data(ticker, date, engine='auto',
+                                                  taus=None, window=None,
+                                                  bin_size=1):
     """Computes the self-response of a day.
 
-    Using the midpoint price and trade signs of a ticker computes the self-
-    response during different time lags (:math:`\\tau`) for a day.
+    Using the midpoint price and trade signs of a ticker computes the self-
+    response during different time lags (:math:`\\tau`) for a day.
+
+    :param ticker: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param date: string with the date of the data to be extracted
+     (i.e. '2008-01-02').
+    :param engine: string with the implementation to be used, 'auto'
+     (default, dense or sparse depending on the number of trades), 'fft',
+     'sparse' or 'loop' (reference implementation).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series, the
+     time lags are in bins (i.e. 1).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    try:
+        # Load data
+        midpoint, trade_sign = taq_data_tools_responses_physical \
+            .taq_load_physical_data(ticker, date, window, bin_size)
+
+        assert len(midpoint) == len(trade_sign)
+
+        # Calculating the midpoint price return and the self response function
+        # for all the tau values
+        self_response_tau, num = \
+            taq_response_kernel_responses_physical_data(midpoint, trade_sign,
+                                                        engine, taus)
+
+        return (self_response_tau, num)
+
+    except FileNotFoundError as e:
+        print('No data')
+        print(e)
+        print()
+        zeros = np.zeros(len(taus))
+        return (zeros, zeros)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_self_response_check_responses_physical_data(ticker, date, rtol=1e-7,
+                                                    atol=1e-10):
+    """Checks the FFT self-response of a day against the loop version.
+
+    :param ticker: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param date: string with the date of the data to be extracted
+     (i.e. '2008-01-02').
+    :param rtol: relative tolerance of the comparison (i.e. 1e-7).
+    :param atol: absolute tolerance of the comparison (i.e. 1e-10).
+    :return: bool -- True if both engines agree within the tolerance.
+    """
+
+    response_fft, num_fft = \
+        taq_self_response_day_responses_physical_data(ticker, date, 'fft')
+    response_loop, num_loop = \
+        taq_self_response_day_responses_physical_data(ticker, date, 'loop')
+
+    return (np.array_equal(num_fft, num_loop)
+            and np.allclose(response_fft, response_loop, rtol=rtol,
+                            atol=atol))
+
+# ----------------------------------------------------------------------------
+
+
+def taq_self_response_year_responses_physical_data(ticker, year,
+                                                   cube=False,
+                                                   reduction=True,
+                                                   taus=None, window=None,
+                                                   bin_size=1):
+    """Computes the self-response of a year.
+
+    Using the taq_self_response_day_responses_physical_data function computes
+    the self-response function for a year. With cube=True the self-response
+    is computed from the year cube with the
+    taq_self_response_cube_responses_physical_data function. With
+    reduction=True every worker sums the self-responses of its share of days
+    and returns one partial aggregate. The time lags are saved with the
+    self-response. The year cube has the saved series every second, so it is
+    not used with other windows or bin sizes.
+
+    :param ticker: string of the abbreviation of stock to be analyzed
+     (i.e. 'AAPL').
+    :param year: string of the year to be analyzed (i.e '2016').
+    :param cube: bool to use the year cube (default False).
+    :param reduction: bool to reduce the days in the workers (default True).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series, the
+     time lags are in bins (i.e. 1).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    if (cube and (window is not None or bin_size != 1)):
+        raise ValueError('The year cube only has the saved series every '
+                         + 'second')
+
+    if (cube):
+        self_response_val, self_response_avg = \
+            taq_self_response_cube_responses_physical_data([ticker], year,
+                                                           taus=taus)
+
+        return (self_response_val[0], self_response_avg[0])
+
+    function_name = taq_self_response_year_responses_physical_data.__name__
+    taq_data_tools_responses_physical \
+        .taq_function_header_print_data(function_name, ticker, ticker, year,
+                                        '', '')
+
+    # Days with data of the ticker in the catalog
+    dates = taq_data_tools_responses_physical \
+        .taq_bussiness_days(year, taq_data_tools_responses_physical
+                            .taq_catalog_days_data(year, [ticker]))
+
+    if (not dates):
+        print('No data')
+        print()
+        return None
+
+    self_values = []
+
+    # Peak memory of a worker computing a day
+    task_memory = \
+        taq_task_memory_responses_physical_data(taus=taus, bin_size=bin_size)
+
+    if (reduction):
+        # Every worker sums the self-responses of its share of days
+        workers = taq_data_tools_responses_physical \
+            .taq_workers_data(task_memory, tasks=len(dates))
+        args_prod = [(taq_self_response_day_responses_physical_data,
+                      list(iprod([ticker], dates[w_idx::workers], ['auto'],
+                                 [taus], [window], [bin_size])))
+                     for w_idx in range(workers)]
+
+        with mp.Pool(processes=workers) as pool:
+            self_values.append(pool.starmap(
+                taq_response_sum_responses_physical_data, args_prod))
+
+    else:
+        args_prod = iprod([ticker], dates, ['auto'], [taus], [window],
+                          [bin_size])
+
+        # Parallel computation of the self-responses. Every result is
+        # appended to a list
+        with mp.Pool(processes=taq_data_tools_responses_physical
+                     .taq_workers_data(task_memory)) as pool:
+            self_values.append(pool.starmap(
+                taq_self_response_day_responses_physical_data, args_prod))
+
+    # To obtain the total self-response, I sum over all the self-response
+    # values and all the amount of trades (averaging values)
+    self_v_final = np.sum(self_values[0], axis=0)
+
+    self_response_val = self_v_final[0] / self_v_final[1]
+    self_response_avg = self_v_final[1]
+
+    # Saving data
+    taq_data_tools_responses_physical \
+        .taq_save_data(taq_data_tools_responses_physical
+                       .taq_resolution_name_data(function_name, window,
+                                                 bin_size),
+                       (taus, self_response_val), ticker, ticker, year, '',
+                       '')
+
+    return (self_response_val, self_response_avg)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_response_task_responses_physical_data(task):
+    """Runs a task of the global scheduler.
+
+    :param task: tuple with the key of the task, the day function and the
+     list of tuples with the arguments of the day function.
+    :return: tuple -- The function returns a tuple with the key of the task
+     and the partial aggregate of the responses.
+    """
+
+    key, day_function, args_list = task
+
+    return (key, taq_response_sum_responses_physical_data(day_function,
+                                                          args_list))
+
+# ----------------------------------------------------------------------------
+
+
+def taq_self_response_universe_responses_physical_data(tickers, year,
+                                                       days_task=16,
+                                                       chunksize=4,
+                                                       taus=None,
+                                                       window=None,
+                                                       bin_size=1):
+    """Computes the self-response of a year for all the tickers.
+
+    Flattens the (ticker, day) work of all the tickers in tasks of days_task
+    days that are dispatched in chunks to one pool of workers for the whole
+    run. The partial aggregates are streamed into an accumulator per ticker
+    and every ticker is saved as soon as all its tasks are finished, as in
+    the taq_self_response_year_responses_physical_data function.
+
+    :param tickers: list of the string abbreviation of the stocks to be
+     analyzed (i.e. ['AAPL', 'MSFT']).
+    :param year: string of the year to be analyzed (i.e '2016').
+    :param days_task: integer with the number of days per task (i.e. 16).
+    :param chunksize: integer with the number of tasks sent to a worker at
+     once (i.e. 4).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series, the
+     time lags are in bins (i.e. 1).
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    function_name = 'taq_self_response_year_responses_physical_data'
+    taq_data_tools_responses_physical \
+        .taq_function_header_print_data(function_name, '', '', year, '', '')
+
+    dates = taq_data_tools_responses_physical.taq_bussiness_days(year)
+
+    # Days with data of every ticker in the catalog
+    ticker_days = taq_data_tools_responses_physical \
+        .taq_catalog_ticker_days_data(year)
+    if (ticker_days is None):
+        ticker_dates = {ticker: dates for ticker in tickers}
+    else:
+        ticker_dates = {ticker: sorted(set(dates)
+                                       & set(ticker_days.get(ticker, [])))
+                        for ticker in tickers}
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    tasks = [(ticker, taq_self_response_day_responses_physical_data,
+              list(iprod([ticker],
+                         ticker_dates[ticker][d_start:d_start + days_task],
+                         ['auto'], [taus], [window], [bin_size])))
+             for ticker in tickers
+             for d_start in range(0, len(ticker_dates[ticker]), days_task)]
+
+    # Accumulators and number of pending tasks of every ticker
+    self_values = {}
+    pending = {ticker: 0 for ticker in tickers}
+    for task in tasks:
+        pending[task[0]] += 1
+
+    # Peak memory of a worker computing a day
+    task_memory = \
+        taq_task_memory_responses_physical_data(taus=taus, bin_size=bin_size)
+
+    with mp.Pool(processes=taq_data_tools_responses_physical
+                 .taq_workers_data(task_memory)) as pool:
+        for ticker, values in pool.imap_unordered(
+                taq_response_task_responses_physical_data, tasks,
+                chunksize=chunksize):
+
+            if (ticker in self_values):
+                self_values[ticker] = (self_values[ticker][0] + values[0],
+                                       self_values[ticker][1] + values[1])
+            else:
+                self_values[ticker] = values
+            pending[ticker] -= 1
+
+            if (not pending[ticker]):
+                self_response_val = \
+                    self_values[ticker][0] / self_values[ticker][1]
+
+                # Saving data
+                taq_data_tools_responses_physical \
+                    .taq_save_data(taq_data_tools_responses_physical
+                                   .taq_resolution_name_data(function_name,
+                                                             window,
+                                                             bin_size),
+                                   (taus, self_response_val), ticker, ticker,
+                                   year, '', '')
+                del self_values[ticker]
+
+    return None
+
+# ----------------------------------------------------------------------------
+
+
+def taq_year_cube_ticker_responses_physical_data(t_idx, ticker, year):
+    """Fills the midpoint prices and trade signs of a ticker in the year cube.
+
+    :param t_idx: integer with the position of the ticker in the year cube.
+    :param ticker: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param year: string of the year to be analyzed (i.e '2016').
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    _, dates, midpoint_cube, trade_sign_cube, mask_cube, _ = \
+        taq_year_cube_load_responses_physical_data(year, mode='r+')
+
+    for d_idx, date in enumerate(dates):
+
+        try:
+            midpoint, trade_sign = taq_data_tools_responses_physical \
+                .taq_load_physical_data(ticker, date)
+
+            midpoint_cube[t_idx, d_idx, :len(midpoint)] = midpoint
+            trade_sign_cube[t_idx, d_idx, :len(trade_sign)] = trade_sign
+            mask_cube[t_idx, d_idx] = True
+
+        except FileNotFoundError:
+            pass
+
+    midpoint_cube.flush()
+    trade_sign_cube.flush()
+    mask_cube.flush()
+
+    return None
+
+# ----------------------------------------------------------------------------
+
+
+def taq_year_cube_responses_physical_data(tickers, year):
+    """Builds the year cube of midpoint prices and trade signs.
+
+    Assembles the outputs of the taq_midpoint_physical_data and
+    taq_trade_signs_physical_data functions of all the tickers and days of a
+    year in memory-mapped (ticker, day, second) .npy files. The midpoint
+    prices are float64 and the trade signs int8. A (ticker, day) mask marks
+    the days with data, the missing days are zero. The early closes are
+    shorter, only the first seconds of their rows are used.
+
+    :param tickers: list of the string abbreviation of the stocks to be
+     analyzed (i.e. ['AAPL', 'MSFT']).
+    :param year: string of the year to be analyzed (i.e '2016').
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    function_name = taq_year_cube_responses_physical_data.__name__
+    taq_data_tools_responses_physical \
+        .taq_function_header_print_data(function_name, '', '', year, '', '')
+
+    dates = taq_data_tools_responses_physical.taq_bussiness_days(year)
+
+    f_path = f'../../taq_data/responses_physical_data_{year}/{function_name}'
+    if (not os.path.isdir(f_path)):
+
+        try:
+            os.mkdir(f_path)
+            print('Folder to save data created')
+
+        except FileExistsError:
+            print('Folder exists. The folder was not created')
+
+    # Length of the physical time series from the shared time axis
+    f_time = f'../../taq_data/extract_data_{year}/taq_midpoint_physical' \
+        + f'_data/taq_midpoint_physical_data_time'
+    if (os.path.isfile(f'{f_time}.npy')):
+        full_time = np.load(f'{f_time}.npy')
+    else:
+        full_time = pickle.load(open(f'{f_time}.pickle', 'rb'))
+    shape = (len(tickers), len(dates), len(full_time))
+
+    # Length of the series of every day, the early closes are shorter
+    lengths = []
+    for date in dates:
+        _, market_close = taq_data_tools_responses_physical \
+            .taq_market_window_data(date)
+        lengths.append(len(full_time) - (57600 - market_close))
+
+    pickle.dump((tickers, dates, lengths), open(
+        f'{f_path}/{function_name}_index_{year}.pickle', 'wb'))
+    for name, dtype, c_shape in [('midpoint', np.float64, shape),
+                                 ('trade_signs', np.int8, shape),
+                                 ('mask', np.bool_, shape[:2])]:
+        cube = np.lib.format.open_memmap(
+            f'{f_path}/{function_name}_{name}_{year}.npy', mode='w+',
+            dtype=dtype, shape=c_shape)
+        del cube
+
+    # Peak memory of a worker filling the days of a ticker
+    task_memory = taq_task_memory_responses_physical_data(
+        pairs=0, rows=0, series=len(dates))
+
+    # Parallel computation. Every task fills the row of a ticker
+    with mp.Pool(processes=taq_data_tools_responses_physical
+                 .taq_workers_data(task_memory)) as pool:
+        pool.starmap(taq_year_cube_ticker_responses_physical_data,
+                     [(t_idx, ticker, year)
+                      for t_idx, ticker in enumerate(tickers)])
+
+    print('Data Saved')
+    print()
+
+    return None
+
+# ----------------------------------------------------------------------------
+
+
+def taq_year_cube_load_responses_physical_data(year, mode='r'):
+    """Loads the year cube of midpoint prices and trade signs.
+
+    :param year: string of the year to be analyzed (i.e '2016').
+    :param mode: string with the mode of the memory maps, 'r' (default) or
+     'r+'.
+    :return: tuple -- The function returns a tuple with the list of tickers,
+     the list of dates, the memory-mapped midpoint prices, trade signs and
+     mask, and the list of the lengths of the series of every day.
+    """
+
+    function_name = 'taq_year_cube_responses_physical_data'
+    f_path = f'../../taq_data/responses_physical_data_{year}/{function_name}'
+
+    tickers, dates, lengths = pickle.load(open(
+        f'{f_path}/{function_name}_index_{year}.pickle', 'rb'))
+    midpoint_cube = np.load(f'{f_path}/{function_name}_midpoint_{year}.npy',
+                            mmap_mode=mode)
+    trade_sign_cube = np.load(f'{f_path}/{function_name}_trade_signs'
+                              + f'_{year}.npy', mmap_mode=mode)
+    mask_cube = np.load(f'{f_path}/{function_name}_mask_{year}.npy',
+                        mmap_mode=mode)
+
+    return (tickers, dates, midpoint_cube, trade_sign_cube, mask_cube,
+            lengths)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_self_response_cube_block_responses_physical_data(cube_idx, year,
+                                                         taus=None):
+    """Computes the self-response of a block of tickers from the year cube.
+
+    For every day computes the self-response of all the tickers of the block
+    with data in one batched call of the FFT kernel.
+
+    :param cube_idx: list of the positions of the tickers in the year cube.
+    :param year: string of the year to be analyzed (i.e '2016').
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :return: tuple -- The function returns a tuple with numpy arrays with the
+     sum of the self-responses and the number of trade signs of the block.
+    """
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    _, dates, midpoint_cube, trade_sign_cube, mask_cube, lengths = \
+        taq_year_cube_load_responses_physical_data(year)
+
+    response_sum = np.zeros((len(cube_idx), len(taus)))
+    num_sum = np.zeros((len(cube_idx), len(taus)))
+
+    for d_idx in range(len(dates)):
+
+        present = np.flatnonzero(mask_cube[cube_idx, d_idx])
+        if (not len(present)):
+            continue
+
+        day_idx = np.array(cube_idx)[present]
+        response, num = taq_response_fft_responses_physical_data(
+            midpoint_cube[day_idx, d_idx, :lengths[d_idx]],
+            trade_sign_cube[day_idx, d_idx, :lengths[d_idx]], taus)
+
+        response_sum[present] += response
+        num_sum[present] += num
+
+    return (response_sum, num_sum)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_self_response_cube_responses_physical_data(tickers, year, block=16,
+                                                   taus=None):
+    """Computes the self-response of many tickers from the year cube.
+
+    The tickers are split in blocks that are computed in parallel with the
+    taq_self_response_cube_block_responses_physical_data function. The
+    results are saved as the results of the
+    taq_self_response_year_responses_physical_data function.
+
+    :param tickers: list of the string abbreviation of the stocks to be
+     analyzed (i.e. ['AAPL', 'MSFT']).
+    :param year: string of the year to be analyzed (i.e '2016').
+    :param block: integer with the number of tickers per task (i.e. 16).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :return: tuple -- The function returns a tuple with numpy arrays with a
+     row for every ticker.
+    """
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    function_name = 'taq_self_response_year_responses_physical_data'
+    taq_data_tools_responses_physical \
+        .taq_function_header_print_data(function_name, '', '', year, '', '')
+
+    cube_tickers = taq_year_cube_load_responses_physical_data(year)[0]
+    cube_idx = [cube_tickers.index(ticker) for ticker in tickers]
+
+    args_prod = [(cube_idx[b_start:b_start + block], year, taus)
+                 for b_start in range(0, len(cube_idx), block)]
+
+    # Peak memory of a worker computing a day of a block of tickers
+    task_memory = taq_task_memory_responses_physical_data(
+        pairs=block, rows=block, series=2 * block, taus=taus)
+
+    # Parallel computation of the blocks of tickers
+    with mp.Pool(processes=taq_data_tools_responses_physical
+                 .taq_workers_data(task_memory)) as pool:
+        self_values = pool.starmap(
+            taq_self_response_cube_block_responses_physical_data, args_prod)
+
+    response_sum = np.concatenate([values[0] for values in self_values])
+    num_sum = np.concatenate([values[1] for values in self_values])
+
+    self_response_val = response_sum / num_sum
+    self_response_avg = num_sum
+
+    # Saving data
+    for t_idx, ticker in enumerate(tickers):
+        taq_data_tools_responses_physical \
+            .taq_save_data(function_name, (taus, self_response_val[t_idx]),
+                           ticker, ticker, year, '', '')
+
+    return (self_response_val, self_response_avg)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_cross_response_day_responses_physical_data(ticker_i, ticker_j, date,
+                                                   engine='auto', taus=None,
+                                                   window=None, bin_size=1):
+    """Computes the cross-response of a day.
+
+    Using the midpoint price of ticker i and trade signs of ticker j computes
+    the cross-response during different time lags (:math:`\\tau`) for a day.
+
+    :param ticker_i: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param ticker_j: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param date: string with the date of the data to be extracted
+     (i.e. '2008-01-02').
+    :param engine: string with the implementation to be used, 'auto'
+     (default, dense or sparse depending on the number of trades), 'fft',
+     'sparse' or 'loop' (reference implementation).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series, the
+     time lags are in bins (i.e. 1).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    if (ticker_i == ticker_j):
+
+        # Self-response
+        return None
+
+    else:
+        try:
+            # Load data
+            midpoint_i, _ = taq_data_tools_responses_physical \
+                .taq_load_physical_data(ticker_i, date, window, bin_size)
+            _, trade_sign_j = taq_data_tools_responses_physical \
+                .taq_load_physical_data(ticker_j, date, window, bin_size)
+
+            assert len(midpoint_i) == len(trade_sign_j)
+
+            # Calculating the midpoint return and the cross response function
+            # for all the tau values
+            cross_response_tau, num = \
+                taq_response_kernel_responses_physical_data(midpoint_i,
+                                                            trade_sign_j,
+                                                            engine, taus)
+
+            return (cross_response_tau, num)
+
+        except FileNotFoundError as e:
+            print('No data')
+            print(e)
+            print()
+            zeros = np.zeros(len(taus))
+            return (zeros, zeros)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_cross_response_check_responses_physical_data(ticker_i, ticker_j, date,
+                                                     rtol=1e-7, atol=1e-10):
+    """Checks the FFT cross-response of a day against the loop version.
+
+    :param ticker_i: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param ticker_j: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param date: string with the date of the data to be extracted
+     (i.e. '2008-01-02').
+    :param rtol: relative tolerance of the comparison (i.e. 1e-7).
+    :param atol: absolute tolerance of the comparison (i.e. 1e-10).
+    :return: bool -- True if both engines agree within the tolerance.
+    """
+
+    response_fft, num_fft = \
+        taq_cross_response_day_responses_physical_data(ticker_i, ticker_j,
+                                                       date, 'fft')
+    response_loop, num_loop = \
+        taq_cross_response_day_responses_physical_data(ticker_i, ticker_j,
+                                                       date, 'loop')
+
+    return (np.array_equal(num_fft, num_loop)
+            and np.allclose(response_fft, response_loop, rtol=rtol,
+                            atol=atol))
+
+# ----------------------------------------------------------------------------
+
+
+def taq_cross_response_year_responses_physical_data(ticker_i, ticker_j, year,
+                                                    engine='auto',
+                                                    reduction=True,
+                                                    taus=None, window=None,
+                                                    bin_size=1):
+    """Computes the cross-response of a year.
+
+    Using the taq_cross_response_day_responses_physical_data function computes
+    the cross-response function for a year. With reduction=True every worker
+    sums the cross-responses of its share of days and returns one partial
+    aggregate. The time lags are saved with the cross-response.
+
+    :param ticker_i: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param ticker_j: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param year: string of the year to be analyzed (i.e '2016').
+    :param engine: string with the implementation to be used, 'auto'
+     (default, dense or sparse depending on the number of trades), 'fft',
+     'sparse' or 'loop' (reference implementation).
+    :param reduction: bool to reduce the days in the workers (default True).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series, the
+     time lags are in bins (i.e. 1).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
 
-    :param ticker: string of the abbreviation of the stock to be analyzed
+    if (ticker_i == ticker_j):
+
+        # Self-response
+        return None
+
+    else:
+        function_name = taq_cross_response_year_responses_physical_data \
+            .__name__
+        taq_data_tools_responses_physical \
+            .taq_function_header_print_data(function_name, ticker_i, ticker_j,
+                                            year, '', '')
+
+        # Days with data of both tickers in the catalog
+        dates = taq_data_tools_responses_physical \
+            .taq_bussiness_days(year, taq_data_tools_responses_physical
+                                .taq_catalog_days_data(year,
+                                                       [ticker_i, ticker_j]))
+
+        if (not dates):
+            print('No data')
+            print()
+            return None
+
+        cross_values = []
+
+        # Peak memory of a worker computing a day
+        task_memory = taq_task_memory_responses_physical_data(
+            taus=taus, bin_size=bin_size)
+
+        if (reduction):
+            # Every worker sums the cross-responses of its share of days
+            workers = taq_data_tools_responses_physical \
+                .taq_workers_data(task_memory, tasks=len(dates))
+            args_prod = [(taq_cross_response_day_responses_physical_data,
+                          list(iprod([ticker_i], [ticker_j],
+                                     dates[w_idx::workers], [engine],
+                                     [taus], [window], [bin_size])))
+                         for w_idx in range(workers)]
+
+            with mp.Pool(processes=workers) as pool:
+                cross_values.append(pool.starmap(
+                    taq_response_sum_responses_physical_data, args_prod))
+
+        else:
+            args_prod = iprod([ticker_i], [ticker_j], dates, [engine],
+                              [taus], [window], [bin_size])
+
+            # Parallel computation of the cross-responses. Every result is
+            # appended to a list
+            with mp.Pool(processes=taq_data_tools_responses_physical
+                         .taq_workers_data(task_memory)) as pool:
+                cross_values.append(pool.starmap(
+                    taq_cross_response_day_responses_physical_data,
+                    args_prod))
+
+        # To obtain the total cross-response, I sum over all the cross-response
+        # values and all the amount of trades (averaging values)
+        cross_v_final = np.sum(cross_values[0], axis=0)
+
+        cross_response_val = cross_v_final[0] / cross_v_final[1]
+        cross_response_avg = cross_v_final[1]
+
+        # Saving data
+        taq_data_tools_responses_physical \
+            .taq_save_data(taq_data_tools_responses_physical
+                           .taq_resolution_name_data(function_name, window,
+                                                     bin_size),
+                           (taus, cross_response_val), ticker_i, ticker_j,
+                           year, '', '')
+
+        return (cross_response_val, cross_response_avg)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_cross_response_block_responses_physical_data(tickers_i, i_start,
+                                                     tickers, year, store,
+                                                     block_j=64, taus=None):
+    """Computes the cross-response of a block of tickers i with all tickers.
+
+    For every day loads the midpoint prices of the block of tickers i once and
+    the trade signs of the tickers j in chunks, and computes the responses of
+    all the (i, j) pairs of the block and the chunk in one batched call of the
+    FFT kernel. The transform of every midpoint price and the counts of every
+    trade sign are computed once per block, not once per pair. The year
+    cross-response of the block is written in the rows i_start to
+    i_start + len(tickers_i) of the store.
+
+    :param tickers_i: list of the string abbreviation of the stocks i of the
+     block (i.e. ['AAPL', 'MSFT']).
+    :param i_start: integer with the row of the first ticker i in the store.
+    :param tickers: list of the string abbreviation of all the stocks j.
+    :param year: string of the year to be analyzed (i.e '2016').
+    :param store: string with the path of the .npy store.
+    :param block_j: integer with the number of tickers j per batch
+     (i.e. 64).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    dates = taq_data_tools_responses_physical.taq_bussiness_days(year)
+
+    response_sum = np.zeros((len(tickers_i), len(tickers), len(taus)))
+    num_sum = np.zeros((len(tickers_i), len(tickers), len(taus)))
+
+    for date in dates:
+
+        # Midpoint prices of the block of tickers i
+        midpoint_i = []
+        idx_i = []
+        for t_idx, ticker_i in enumerate(tickers_i):
+            try:
+                midpoint, _ = taq_data_tools_responses_physical \
+                    .taq_load_physical_data(ticker_i, date)
+                midpoint_i.append(midpoint)
+                idx_i.append(t_idx)
+
+            except FileNotFoundError:
+                pass
+
+        if (not idx_i):
+            continue
+
+        midpoint_i = np.array(midpoint_i)[:, None, :]
+
+        for j_start in range(0, len(tickers), block_j):
+
+            # Trade signs of the chunk of tickers j
+            trade_sign_j = []
+            idx_j = []
+            for t_idx, ticker_j in enumerate(
+                    tickers[j_start:j_start + block_j]):
+                try:
+                    _, trade_sign = taq_data_tools_responses_physical \
+                        .taq_load_physical_data(ticker_j, date)
+                    trade_sign_j.append(trade_sign)
+                    idx_j.append(j_start + t_idx)
+
+                except FileNotFoundError:
+                    pass
+
+            if (not idx_j):
+                continue
+
+            trade_sign_j = np.array(trade_sign_j)[None, :, :]
+
+            response, num = \
+                taq_response_fft_responses_physical_data(midpoint_i,
+                                                         trade_sign_j, taus)
+
+            response_sum[np.ix_(idx_i, idx_j)] += response
+            num_sum[np.ix_(idx_i, idx_j)] += num
+
+    # The pairs without data are not a number
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cross_response = response_sum / num_sum
+
+    cross_store = np.lib.format.open_memmap(store, mode='r+')
+    cross_store[i_start:i_start + len(tickers_i)] = cross_response
+    cross_store.flush()
+    del cross_store
+
+    return None
+
+# ----------------------------------------------------------------------------
+
+
+def taq_cross_response_year_all_responses_physical_data(tickers, year,
+                                                        block_i=4,
+                                                        block_j=64,
+                                                        taus=None):
+    """Computes the cross-response of all the pairs of tickers in a year.
+
+    Splits the tickers i in blocks that are computed in parallel with the
+    taq_cross_response_block_responses_physical_data function. The results
+    are saved in a single (ticker_i, ticker_j, tau) float32 .npy store, with
+    the list of tickers and the time lags in pickle files. The diagonal of the
+    store is the self-response of every ticker.
+
+    :param tickers: list of the string abbreviation of the stocks to be
+     analyzed (i.e. ['AAPL', 'MSFT']).
+    :param year: string of the year to be analyzed (i.e '2016').
+    :param block_i: integer with the number of tickers i per task (i.e. 4).
+    :param block_j: integer with the number of tickers j per batch
+     (i.e. 64).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    function_name = taq_cross_response_year_all_responses_physical_data \
+        .__name__
+    taq_data_tools_responses_physical \
+        .taq_function_header_print_data(function_name, '', '', year, '', '')
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    # Saving data
+    taq_data_tools_responses_physical \
+        .taq_save_data(function_name + '_tickers', tickers, '', '', year, '',
+                       '')
+    taq_data_tools_responses_physical \
+        .taq_save_data(function_name + '_taus', taus, '', '', year, '', '')
+
+    f_path = f'../../taq_data/responses_physical_data_{year}/{function_name}'
+    if (not os.path.isdir(f_path)):
+
+        try:
+            os.mkdir(f_path)
+            print('Folder to save data created')
+
+        except FileExistsError:
+            print('Folder exists. The folder was not created')
+
+    store = f'{f_path}/{function_name}_{year}.npy'
+    cross_store = np.lib.format.open_memmap(
+        store, mode='w+', dtype=np.float32,
+        shape=(len(tickers), len(tickers), len(taus)))
+    del cross_store
+
+    args_prod = [(tickers[i_start:i_start + block_i], i_start, tickers, year,
+                  store, block_j, taus)
+                 for i_start in range(0, len(tickers), block_i)]
+
+    # Peak memory of a worker computing a block of tickers i with a chunk of
+    # tickers j, with the accumulators of the block with all the tickers
+    task_memory = taq_task_memory_responses_physical_data(
+        pairs=block_i * block_j, rows=block_i * len(tickers),
+        series=block_i + block_j, taus=taus)
+
+    # Parallel computation of the blocks. Every task writes its rows in the
+    # store
+    with mp.Pool(processes=taq_data_tools_responses_physical
+                 .taq_workers_data(task_memory,
+                                   tasks=len(args_prod))) as pool:
+        pool.starmap(taq_cross_response_block_responses_physical_data,
+                     args_prod)
+
+    print('Data Saved')
+    print()
+
+    return None
+
+# ----------------------------------------------------------------------------
+
+
+def taq_cross_response_pair_responses_physical_data(ticker_i, ticker_j,
+                                                    year):
+    """Reads the cross-response of a pair from the all pairs store.
+
+    :param ticker_i: string of the abbreviation of the stock to be analyzed
      (i.e. 'AAPL').
-    :param date: string with the date of the data to be extracted
-     (i.e. '2008-01-02').
-    :return: tuple -- The function returns a tuple with numpy arrays.
+    :param ticker_j: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param year: string of the year to be analyzed (i.e '2016').
+    :return: tuple -- The function returns a tuple with the time lags and the
+     cross-response.
     """
 
-    date_sep = date.split('-')
+    function_name = 'taq_cross_response_year_all_responses_physical_data'
+    f_path = f'../../taq_data/responses_physical_data_{year}/{function_name}'
+
+    tickers = pickle.load(open(
+        f'{f_path}_tickers/{function_name}_tickers_{year}_.pickle', 'rb'))
+    taus = pickle.load(open(
+        f'{f_path}_taus/{function_name}_taus_{year}_.pickle', 'rb'))
+    cross_store = np.load(f'{f_path}/{function_name}_{year}.npy',
+                          mmap_mode='r')
+
+    return (taus, np.array(cross_store[tickers.index(ticker_i),
+                                       tickers.index(ticker_j)]))
+
+# ----------------------------------------------------------------------------
+
+
+def taq_cross_response_shared_block_responses_physical_data(names, shape,
+                                                            pairs_idx,
+                                                            taus=None):
+    """Computes the cross-response of a block of pairs from shared memory.
+
+    Attaches to the shared memory blocks of a day created with the
+    taq_shared_physical_data function and computes the cross-response of the
+    pairs in one batched call of the FFT kernel. The midpoint prices and trade
+    signs are views of the shared memory, they are not read from the files.
 
-    year = date_sep[0]
-    month = date_sep[1]
-    day = date_sep[2]
+    :param names: tuple with the names of the shared memory blocks of the
+     midpoint prices and the trade signs.
+    :param shape: tuple with the shape (tickers, seconds) of the blocks.
+    :param pairs_idx: numpy array with the (i, j) indices of the tickers of
+     every pair.
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    shm_midpoint = shared_memory.SharedMemory(name=names[0])
+    shm_trade_sign = shared_memory.SharedMemory(name=names[1])
+    midpoint = None
+    trade_sign = None
 
     try:
-        # Load data
-        midpoint = pickle.load(open(
-                f'../../taq_data/extract_data_{year}/taq_midpoint'
-                + f'_physical_data/taq_midpoint_physical_data_midpoint'
-                + f'_{year}{month}{day}_{ticker}.pickle', 'rb'))
-        _, _, trade_sign = pickle.load(open(
-                f'../../taq_data/extract_data_{year}/taq_trade'
-                + f'_signs_physical_data/taq_trade_signs_physical_data'
-                + f'_{year}{month}{day}_{ticker}.pickle', 'rb'))
+        midpoint = np.ndarray(shape, dtype=np.float64,
+                              buffer=shm_midpoint.buf)
+        trade_sign = np.ndarray(shape, dtype=np.int8,
+                                buffer=shm_trade_sign.buf)
 
-        assert len(midpoint) == len(trade_sign)
+        response, num = taq_response_fft_responses_physical_data(
+            midpoint[pairs_idx[:, 0]], trade_sign[pairs_idx[:, 1]], taus)
 
-        # Array of the average of each tau. 10^3 s is used in the paper
-        self_response_tau = np.zeros(__tau__)
-        num = np.zeros(__tau__)
+    finally:
+        # The views have to be released before the blocks can be closed,
+        # also when the kernel fails
+        midpoint = trade_sign = None
+        shm_midpoint.close()
+        shm_trade_sign.close()
 
-        # Calculating the midpoint price return and the self response function
+    return (response, num)
+
+# ----------------------------------------------------------------------------
 
-        # Depending on the tau value
-        for tau_idx in range(__tau__):
 
-            trade_sign_tau = trade_sign[:-tau_idx - 1]
-            trade_sign_no_0_len = len(trade_sign_tau[trade_sign_tau != 0])
-            num[tau_idx] = trade_sign_no_0_len
-            # Obtain the midpoint price return. Displace the numerator tau
-            # values to the right and compute the return
+def taq_cross_response_shared_responses_physical_data(ticker_pairs, year,
+                                                      block=8,
+                                                      days_block=None,
+                                                      taus=None, window=None,
+                                                      bin_size=1):
+    """Computes the cross-response of a list of pairs with shared memory.
+
+    The days are processed in groups of days_block. The midpoint prices and
+    trade signs of all the tickers of the pairs in a group of days are loaded
+    once in shared memory with the taq_shared_physical_data function, and the
+    blocks of pairs of every day are computed in one pool of workers for the
+    whole run with the
+    taq_cross_response_shared_block_responses_physical_data function. Every
+    series is read once per day instead of once per pair. The results are
+    saved as in the taq_cross_response_year_responses_physical_data function.
+
+    :param ticker_pairs: list of tuples with the string abbreviations of the
+     stocks i and j (i.e. [('AAPL', 'MSFT'), ('MSFT', 'AAPL')]).
+    :param year: string of the year to be analyzed (i.e '2016').
+    :param block: integer with the number of pairs per task (i.e. 8).
+    :param days_block: integer with the number of days in shared memory at
+     once (default the number of CPUs).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series, the
+     time lags are in bins (i.e. 1).
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    function_name = 'taq_cross_response_year_responses_physical_data'
+    taq_data_tools_responses_physical \
+        .taq_function_header_print_data(function_name, '', '', year, '', '')
 
-            # Midpoint price returns
-            log_return_sec = (midpoint[tau_idx + 1:]
-                              - midpoint[:-tau_idx - 1]) \
-                / midpoint[:-tau_idx - 1]
+    dates = taq_data_tools_responses_physical.taq_bussiness_days(year)
 
-            # Obtain the self response value
-            if (trade_sign_no_0_len != 0):
-                product = log_return_sec * trade_sign_tau
-                self_response_tau[tau_idx] = np.sum(product)
+    if (days_block is None):
+        days_block = taq_data_tools_responses_physical.taq_workers_data()
 
-        return (self_response_tau, num)
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    # The self-responses are not computed
+    ticker_pairs = [pair for pair in ticker_pairs if pair[0] != pair[1]]
+    tickers = list(dict.fromkeys(t for pair in ticker_pairs for t in pair))
+    pairs_idx = np.array([(tickers.index(pair[0]), tickers.index(pair[1]))
+                          for pair in ticker_pairs], dtype=int)
+
+    response_sum = np.zeros((len(ticker_pairs), len(taus)))
+    num_sum = np.zeros((len(ticker_pairs), len(taus)))
+
+    # The workers have to share the resource tracker of this process, else
+    # every worker tracks and tries to unlink the blocks it attaches to
+    resource_tracker.ensure_running()
+
+    # Peak memory of a worker computing a block of pairs, with the rows of
+    # the shared memory of its tickers
+    task_memory = taq_task_memory_responses_physical_data(
+        pairs=block, rows=block, series=2 * block, taus=taus,
+        bin_size=bin_size)
+
+    with mp.Pool(processes=taq_data_tools_responses_physical
+                 .taq_workers_data(task_memory)) as pool:
+        for d_start in range(0, len(dates), days_block):
+
+            shared_days = []
+            args_prod = []
+            pairs_prod = []
+
+            try:
+                for date in dates[d_start:d_start + days_block]:
+
+                    shared = taq_data_tools_responses_physical \
+                        .taq_shared_physical_data(tickers, date, window,
+                                                  bin_size)
+
+                    if (shared is None):
+                        continue
+
+                    shm_midpoint, shm_trade_sign, shape, mask = shared
+                    shared_days.append(shared)
+
+                    # Pairs with data of both tickers in the day
+                    pairs_day = np.flatnonzero(mask[pairs_idx[:, 0]]
+                                               & mask[pairs_idx[:, 1]])
+
+                    for p_start in range(0, len(pairs_day), block):
+                        pairs_block = pairs_day[p_start:p_start + block]
+                        args_prod.append(((shm_midpoint.name,
+                                           shm_trade_sign.name), shape,
+                                          pairs_idx[pairs_block], taus))
+                        pairs_prod.append(pairs_block)
+
+                # Parallel computation of the blocks of pairs of the days
+                cross_values = pool.starmap(
+                    taq_cross_response_shared_block_responses_physical_data,
+                    args_prod)
+
+            finally:
+                for shared in shared_days:
+                    for shm in shared[:2]:
+                        shm.close()
+                        shm.unlink()
+
+            for pairs_block, (response, num) in zip(pairs_prod, cross_values):
+                response_sum[pairs_block] += response
+                num_sum[pairs_block] += num
+
+    for p_idx, (ticker_i, ticker_j) in enumerate(ticker_pairs):
+
+        cross_response_val = response_sum[p_idx] / num_sum[p_idx]
+
+        # Saving data
+        taq_data_tools_responses_physical \
+            .taq_save_data(taq_data_tools_responses_physical
+                           .taq_resolution_name_data(function_name, window,
+                                                     bin_size),
+                           (taus, cross_response_val), ticker_i, ticker_j,
+                           year, '', '')
+
+    return None
+
+# ----------------------------------------------------------------------------
+
+
+def taq_correlator_loop_responses_physical_data(trade_sign_i, trade_sign_j,
+                                                taus=None):
+    """Computes the trade sign correlator for all the time lags with a loop.
+
+    Reference implementation of the trade sign correlator. For every time lag
+    (:math:`\\tau`) computes the sum of the trade signs of i shifted tau
+    seconds times the trade signs of j and the number of non zero trade signs
+    of j.
+
+    :param trade_sign_i: numpy array with the trade signs of every second of
+     the ticker i.
+    :param trade_sign_j: numpy array with the trade signs of every second of
+     the ticker j.
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    # Array of the average of each tau. 10^3 s is used in the paper
+    correlator_tau = np.zeros(len(taus))
+    num = np.zeros(len(taus))
+
+    # Depending on the tau value
+    for tau_idx, tau in enumerate(taus):
+
+        trade_sign_tau = 1 * trade_sign_j[:-tau]
+        trade_sign_no_0_len = len(trade_sign_tau[trade_sign_tau != 0])
+        num[tau_idx] = trade_sign_no_0_len
+
+        # Obtain the correlator value
+        if (trade_sign_no_0_len != 0):
+            product = trade_sign_i[tau:] * trade_sign_tau
+            correlator_tau[tau_idx] = np.sum(product)
+
+    return (correlator_tau, num)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_correlator_fft_responses_physical_data(trade_sign_i, trade_sign_j,
+                                               taus=None):
+    """Computes the trade sign correlator for all the time lags with FFT.
+
+    The sum over t of s_i(t + tau) * s_j(t) is the cross-correlation of the
+    trade signs, so all the time lags (:math:`\\tau`) are obtained in
+    O(N log N). The trade signs are integers, so the correlation is rounded to
+    the exact value. The arrays can have leading dimensions that broadcast
+    against each other, the correlator is computed along the last axis. Only
+    the given time lags are taken from the correlation.
+
+    :param trade_sign_i: numpy array with the trade signs of every second of
+     the ticker i.
+    :param trade_sign_j: numpy array with the trade signs of every second of
+     the ticker j.
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :return: tuple -- The function returns a tuple with numpy arrays. The
+     number of trade signs has the leading dimensions of trade_sign_j.
+    """
+
+    trade_sign_i = np.asarray(trade_sign_i, dtype=float)
+    trade_sign_j = np.asarray(trade_sign_j, dtype=float)
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+    taus = np.asarray(taus, dtype=int)
+
+    shape = np.broadcast_shapes(trade_sign_i.shape, trade_sign_j.shape)
+    n = shape[-1]
+    # The lags longer than the series have no terms
+    valid = taus <= n - 1
+    taus_v = taus[valid]
+    # Zero padding to avoid the circular overlap of the correlation
+    size = 1 << int(np.ceil(np.log2(2 * n)))
+
+    # Correlation between s_j(t) and s_i(t + tau)
+    corr = np.rint(np.fft.irfft(np.conj(np.fft.rfft(trade_sign_j, size))
+                                * np.fft.rfft(trade_sign_i, size), size))
+
+    # Prefix sums of the non zero signs
+    prefix_num = np.concatenate(
+        (np.zeros(trade_sign_j.shape[:-1] + (1,)),
+         np.cumsum(trade_sign_j != 0, axis=-1)), axis=-1)
+
+    correlator_tau = np.zeros(shape[:-1] + (len(taus),))
+    num = np.zeros(trade_sign_j.shape[:-1] + (len(taus),))
+
+    num[..., valid] = prefix_num[..., n - taus_v]
+    correlator_tau[..., valid] = corr[..., taus_v]
+
+    return (correlator_tau, num)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_correlator_kernel_responses_physical_data(trade_sign_i, trade_sign_j,
+                                                  engine='fft', taus=None):
+    """Computes the trade sign correlator with the chosen engine.
+
+    :param trade_sign_i: numpy array with the trade signs of every second of
+     the ticker i.
+    :param trade_sign_j: numpy array with the trade signs of every second of
+     the ticker j.
+    :param engine: string with the implementation to be used, 'fft' (default)
+     or 'loop' (reference implementation).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    if (engine == 'fft'):
+        return taq_correlator_fft_responses_physical_data(trade_sign_i,
+                                                          trade_sign_j, taus)
+
+    elif (engine == 'loop'):
+        return taq_correlator_loop_responses_physical_data(trade_sign_i,
+                                                           trade_sign_j, taus)
+
+    else:
+        raise ValueError(f'Unknown engine {engine}')
+
+# ----------------------------------------------------------------------------
+
+
+def taq_trade_sign_self_correlator_day_responses_physical_data(ticker, date,
+                                                               engine='fft',
+                                                               taus=None,
+                                                               window=None,
+                                                               bin_size=1):
+    """Computes the trade sign self-correlator of a day.
+
+    Using the trade signs of a ticker computes the self-correlator during
+    different time lags (:math:`\\tau`) for a day.
+
+    :param ticker: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param date: string with the date of the data to be extracted
+     (i.e. '2008-01-02').
+    :param engine: string with the implementation to be used, 'fft' (default)
+     or 'loop' (reference implementation).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series, the
+     time lags are in bins (i.e. 1).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    try:
+        # Load data
+        _, trade_sign = taq_data_tools_responses_physical \
+            .taq_load_physical_data(ticker, date, window, bin_size)
+
+        # Calculating the trade sign self-correlator for all the tau values
+        self_correlator_tau, num = \
+            taq_correlator_kernel_responses_physical_data(trade_sign,
+                                                          trade_sign, engine,
+                                                          taus)
+
+        return (self_correlator_tau, num)
 
     except FileNotFoundError as e:
         print('No data')
         print(e)
         print()
-        zeros = np.zeros(__tau__)
+        zeros = np.zeros(len(taus))
         return (zeros, zeros)
 
 # ----------------------------------------------------------------------------
 
 
-def taq_self_response_year_responses_physical_data(ticker, year):
-    """Computes the self-response of a year.
+def taq_trade_sign_self_correlator_year_responses_physical_data(ticker, year,
+                                                                engine='fft',
+                                                                taus=None,
+                                                                window=None,
+                                                                bin_size=1):
+    """Computes the trade sign self-correlator of a year.
 
-    Using the taq_self_response_day_responses_physical_data function computes
-    the self-response function for a year.
+    Using the taq_trade_sign_self_correlator_day_responses_physical_data
+    function computes the trade sign self-correlator for a year. Every worker
+    sums the self-correlators of its share of days and returns one partial
+    aggregate. The time lags are saved with the self-correlator.
 
     :param ticker: string of the abbreviation of stock to be analyzed
      (i.e. 'AAPL').
     :param year: string of the year to be analyzed (i.e '2016').
+    :param engine: string with the implementation to be used, 'fft' (default)
+     or 'loop' (reference implementation).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series, the
+     time lags are in bins (i.e. 1).
     :return: tuple -- The function returns a tuple with numpy arrays.
     """
 
-    function_name = taq_self_response_year_responses_physical_data.__name__
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    function_name = \
+        taq_trade_sign_self_correlator_year_responses_physical_data.__name__
     taq_data_tools_responses_physical \
         .taq_function_header_print_data(function_name, ticker, ticker, year,
                                         '', '')
 
-    dates = taq_data_tools_responses_physical.taq_bussiness_days(year)
-
-    self_values = []
-    args_prod = iprod([ticker], dates)
+    # Days with data of the ticker in the catalog
+    dates = taq_data_tools_responses_physical \
+        .taq_bussiness_days(year, taq_data_tools_responses_physical
+                            .taq_catalog_days_data(year, [ticker]))
 
-    # Parallel computation of the self-responses. Every result is appended to
-    # a list
-    with mp.Pool(processes=mp.cpu_count()) as pool:
-        self_values.append(pool.starmap(
-            taq_self_response_day_responses_physical_data, args_prod))
+    if (not dates):
+        print('No data')
+        print()
+        return None
 
-    # To obtain the total self-response, I sum over all the self-response
+    # Every worker sums the self-correlators of its share of days
+    task_memory = \
+        taq_task_memory_responses_physical_data(taus=taus, bin_size=bin_size)
+    workers = taq_data_tools_responses_physical \
+        .taq_workers_data(task_memory, tasks=len(dates))
+    args_prod = [(taq_trade_sign_self_correlator_day_responses_physical_data,
+                  list(iprod([ticker], dates[w_idx::workers], [engine],
+                             [taus], [window], [bin_size])))
+                 for w_idx in range(workers)]
+
+    with mp.Pool(processes=workers) as pool:
+        self_values = pool.starmap(taq_response_sum_responses_physical_data,
+                                   args_prod)
+
+    # To obtain the total self-correlator, I sum over all the self-correlator
     # values and all the amount of trades (averaging values)
-    self_v_final = np.sum(self_values[0], axis=0)
+    self_v_final = np.sum(self_values, axis=0)
 
-    self_response_val = self_v_final[0] / self_v_final[1]
-    self_response_avg = self_v_final[1]
+    self_correlator_val = self_v_final[0] / self_v_final[1]
+    self_correlator_avg = self_v_final[1]
 
     # Saving data
     taq_data_tools_responses_physical \
-        .taq_save_data(function_name, self_response_val, ticker, ticker, year,
-                       '', '')
+        .taq_save_data(taq_data_tools_responses_physical
+                       .taq_resolution_name_data(function_name, window,
+                                                 bin_size),
+                       (taus, self_correlator_val), ticker, ticker, year, '',
+                       '')
 
-    return (self_response_val, self_response_avg)
+    return (self_correlator_val, self_correlator_avg)
 
 # ----------------------------------------------------------------------------
 
 
-def taq_cross_response_day_responses_physical_data(ticker_i, ticker_j, date):
-    """Computes the cross-response of a day.
+def taq_trade_sign_cross_correlator_day_responses_physical_data(ticker_i,
+                                                                ticker_j,
+                                                                date,
+                                                                engine='fft',
+                                                                taus=None,
+                                                                window=None,
+                                                                bin_size=1):
+    """Computes the trade sign cross-correlator of a day.
 
-    Using the midpoint price of ticker i and trade signs of ticker j computes
-    the cross-response during different time lags (:math:`\\tau`) for a day.
+    Using the trade signs of ticker i and ticker j computes the
+    cross-correlator during different time lags (:math:`\\tau`) for a day.
 
     :param ticker_i: string of the abbreviation of the stock to be analyzed
      (i.e. 'AAPL').
@@ -173,121 +1860,275 @@ def taq_cross_response_day_responses_physical_data(ticker_i, ticker_j, date):
      (i.e. 'AAPL').
     :param date: string with the date of the data to be extracted
      (i.e. '2008-01-02').
+    :param engine: string with the implementation to be used, 'fft' (default)
+     or 'loop' (reference implementation).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series, the
+     time lags are in bins (i.e. 1).
     :return: tuple -- The function returns a tuple with numpy arrays.
     """
 
-    date_sep = date.split('-')
-
-    year = date_sep[0]
-    month = date_sep[1]
-    day = date_sep[2]
-
     if (ticker_i == ticker_j):
 
-        # Self-response
+        # Self-correlator
         return None
 
     else:
+        if (taus is None):
+            taus = np.arange(1, __tau__ + 1)
+
         try:
             # Load data
-            midpoint_i = pickle.load(open(
-                    f'../../taq_data/extract_data_{year}/taq'
-                    + f'_midpoint_physical_data/taq_midpoint_physical_data'
-                    + f'_midpoint_{year}{month}{day}_{ticker_i}.pickle', 'rb'))
-            _, _, trade_sign_j = pickle.load(open(
-                    f'../../taq_data/extract_data_{year}/taq_trade_'
-                    + f'signs_physical_data/taq_trade_signs_physical_data'
-                    + f'_{year}{month}{day}_{ticker_j}.pickle', 'rb'))
-
-            assert len(midpoint_i) == len(trade_sign_j)
-
-            # Array of the average of each tau. 10^3 s is used in the paper
-            cross_response_tau = np.zeros(__tau__)
-            num = np.zeros(__tau__)
-
-            # Calculating the midpoint return and the cross response function
-
-            # Depending on the tau value
-            for tau_idx in range(__tau__):
+            _, trade_sign_i = taq_data_tools_responses_physical \
+                .taq_load_physical_data(ticker_i, date, window, bin_size)
+            _, trade_sign_j = taq_data_tools_responses_physical \
+                .taq_load_physical_data(ticker_j, date, window, bin_size)
 
-                trade_sign_tau = 1 * trade_sign_j[:-tau_idx - 1]
-                trade_sign_no_0_len = len(trade_sign_tau[trade_sign_tau != 0])
-                num[tau_idx] = trade_sign_no_0_len
-                # Obtain the midpoint price return. Displace the numerator tau
-                # values to the right and compute the return
+            assert len(trade_sign_i) == len(trade_sign_j)
 
-                # Midpoint price returns
-                log_return_i_sec = (midpoint_i[tau_idx + 1:]
-                                    - midpoint_i[:-tau_idx - 1]) \
-                    / midpoint_i[:-tau_idx - 1]
+            # Calculating the trade sign cross-correlator for all the tau
+            # values
+            cross_correlator_tau, num = \
+                taq_correlator_kernel_responses_physical_data(trade_sign_i,
+                                                              trade_sign_j,
+                                                              engine, taus)
 
-                # Obtain the cross response value
-                if (trade_sign_no_0_len != 0):
-                    product = log_return_i_sec * trade_sign_tau
-                    cross_response_tau[tau_idx] = np.sum(product)
-
-            return (cross_response_tau, num)
+            return (cross_correlator_tau, num)
 
         except FileNotFoundError as e:
             print('No data')
             print(e)
             print()
-            zeros = np.zeros(__tau__)
+            zeros = np.zeros(len(taus))
             return (zeros, zeros)
 
 # ----------------------------------------------------------------------------
 
 
-def taq_cross_response_year_responses_physical_data(ticker_i, ticker_j, year):
-    """Computes the cross-response of a year.
+def taq_trade_sign_cross_correlator_year_responses_physical_data(ticker_i,
+                                                                 ticker_j,
+                                                                 year,
+                                                                 engine='fft',
+                                                                 taus=None,
+                                                                 window=None,
+                                                                 bin_size=1):
+    """Computes the trade sign cross-correlator of a year.
 
-    Using the taq_cross_response_day_responses_physical_data function computes
-    the cross-response function for a year.
+    Using the taq_trade_sign_cross_correlator_day_responses_physical_data
+    function computes the trade sign cross-correlator for a year. Every
+    worker sums the cross-correlators of its share of days and returns one
+    partial aggregate. The time lags are saved with the cross-correlator.
 
     :param ticker_i: string of the abbreviation of the stock to be analyzed
      (i.e. 'AAPL').
     :param ticker_j: string of the abbreviation of the stock to be analyzed
      (i.e. 'AAPL').
     :param year: string of the year to be analyzed (i.e '2016').
+    :param engine: string with the implementation to be used, 'fft' (default)
+     or 'loop' (reference implementation).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series, the
+     time lags are in bins (i.e. 1).
     :return: tuple -- The function returns a tuple with numpy arrays.
     """
 
     if (ticker_i == ticker_j):
 
-        # Self-response
+        # Self-correlator
         return None
 
     else:
-        function_name = taq_cross_response_year_responses_physical_data \
+        if (taus is None):
+            taus = np.arange(1, __tau__ + 1)
+
+        function_name = \
+            taq_trade_sign_cross_correlator_year_responses_physical_data \
             .__name__
         taq_data_tools_responses_physical \
             .taq_function_header_print_data(function_name, ticker_i, ticker_j,
                                             year, '', '')
 
-        dates = taq_data_tools_responses_physical.taq_bussiness_days(year)
+        # Days with data of both tickers in the catalog
+        dates = taq_data_tools_responses_physical \
+            .taq_bussiness_days(year, taq_data_tools_responses_physical
+                                .taq_catalog_days_data(year,
+                                                       [ticker_i, ticker_j]))
 
-        cross_values = []
-        args_prod = iprod([ticker_i], [ticker_j], dates)
+        if (not dates):
+            print('No data')
+            print()
+            return None
+
+        # Every worker sums the cross-correlators of its share of days
+        task_memory = taq_task_memory_responses_physical_data(
+            taus=taus, bin_size=bin_size)
+        workers = taq_data_tools_responses_physical \
+            .taq_workers_data(task_memory, tasks=len(dates))
+        args_prod = [
+            (taq_trade_sign_cross_correlator_day_responses_physical_data,
+             list(iprod([ticker_i], [ticker_j], dates[w_idx::workers],
+                        [engine], [taus], [window], [bin_size])))
+            for w_idx in range(workers)]
+
+        with mp.Pool(processes=workers) as pool:
+            cross_values = pool.starmap(
+                taq_response_sum_responses_physical_data, args_prod)
+
+        # To obtain the total cross-correlator, I sum over all the
+        # cross-correlator values and all the amount of trades (averaging
+        # values)
+        cross_v_final = np.sum(cross_values, axis=0)
+
+        cross_correlator_val = cross_v_final[0] / cross_v_final[1]
+        cross_correlator_avg = cross_v_final[1]
 
-        # Parallel computation of the cross-responses. Every result is appended
-        # to a list
-        with mp.Pool(processes=mp.cpu_count()) as pool:
-            cross_values.append(pool.starmap(
-                taq_cross_response_day_responses_physical_data, args_prod))
+        # Saving data
+        taq_data_tools_responses_physical \
+            .taq_save_data(taq_data_tools_responses_physical
+                           .taq_resolution_name_data(function_name, window,
+                                                     bin_size),
+                           (taus, cross_correlator_val), ticker_i, ticker_j,
+                           year, '', '')
 
-        # To obtain the total cross-response, I sum over all the cross-response
-        # values and all the amount of trades (averaging values)
-        cross_v_final = np.sum(cross_values[0], axis=0)
+        return (cross_correlator_val, cross_correlator_avg)
 
-        cross_response_val = cross_v_final[0] / cross_v_final[1]
-        cross_response_avg = cross_v_final[1]
+# ----------------------------------------------------------------------------
 
-        # Saving data
-        taq_data_tools_responses_physical \
-            .taq_save_data(function_name, cross_response_val, ticker_i,
-                           ticker_j, year, '', '')
 
-        return (cross_response_val, cross_response_avg)
+def taq_trade_sign_correlator_universe_responses_physical_data(tickers,
+                                                               ticker_pairs,
+                                                               year,
+                                                               days_task=16,
+                                                               chunksize=4,
+                                                               engine='fft',
+                                                               taus=None,
+                                                               window=None,
+                                                               bin_size=1):
+    """Computes the trade sign self- and cross-correlators of a year.
+
+    Flattens the (ticker, day) work of the self-correlators of all the
+    tickers and the (pair, day) work of the cross-correlators of all the
+    pairs in tasks of days_task days that are dispatched in chunks to one
+    pool of workers for the whole run, as in the
+    taq_self_response_universe_responses_physical_data function. Every
+    ticker and pair is saved as soon as all its tasks are finished, as in the
+    year functions of the correlators.
+
+    :param tickers: list of the string abbreviation of the stocks to be
+     analyzed (i.e. ['AAPL', 'MSFT']).
+    :param ticker_pairs: list of tuples with the string abbreviations of the
+     stocks i and j (i.e. [('AAPL', 'MSFT'), ('MSFT', 'AAPL')]).
+    :param year: string of the year to be analyzed (i.e '2016').
+    :param days_task: integer with the number of days per task (i.e. 16).
+    :param chunksize: integer with the number of tasks sent to a worker at
+     once (i.e. 4).
+    :param engine: string with the implementation to be used, 'fft' (default)
+     or 'loop' (reference implementation).
+    :param taus: numpy array with the time lags to be computed (default all
+     the lags from 1 to __tau__).
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series, the
+     time lags are in bins (i.e. 1).
+    :return: None -- The function saves the data in a file and does not return
+     a value.
+    """
+
+    self_name = 'taq_trade_sign_self_correlator_year_responses_physical_data'
+    cross_name = \
+        'taq_trade_sign_cross_correlator_year_responses_physical_data'
+    taq_data_tools_responses_physical \
+        .taq_function_header_print_data(self_name, '', '', year, '', '')
+
+    dates = taq_data_tools_responses_physical.taq_bussiness_days(year)
+
+    # The self-correlators are computed from the tickers
+    ticker_pairs = [pair for pair in ticker_pairs if pair[0] != pair[1]]
+
+    # Days with data of every ticker and pair in the catalog. A ticker is
+    # the key (ticker, ticker) of its self-correlator
+    ticker_days = taq_data_tools_responses_physical \
+        .taq_catalog_ticker_days_data(year)
+    keys = [(ticker, ticker) for ticker in tickers] + ticker_pairs
+    if (ticker_days is None):
+        key_dates = {key: dates for key in keys}
+    else:
+        key_dates = {key: sorted(set(dates)
+                                 & set(ticker_days.get(key[0], []))
+                                 & set(ticker_days.get(key[1], [])))
+                     for key in keys}
+
+    if (taus is None):
+        taus = np.arange(1, __tau__ + 1)
+
+    tasks = []
+    for key in keys:
+        if (key[0] == key[1]):
+            day_function = \
+                taq_trade_sign_self_correlator_day_responses_physical_data
+            key_args = [[key[0]]]
+        else:
+            day_function = \
+                taq_trade_sign_cross_correlator_day_responses_physical_data
+            key_args = [[key[0]], [key[1]]]
+
+        for d_start in range(0, len(key_dates[key]), days_task):
+            tasks.append(
+                (key, day_function,
+                 list(iprod(*key_args,
+                            key_dates[key][d_start:d_start + days_task],
+                            [engine], [taus], [window], [bin_size]))))
+
+    # Accumulators and number of pending tasks of every ticker and pair
+    correlator_values = {}
+    pending = {key: 0 for key in keys}
+    for task in tasks:
+        pending[task[0]] += 1
+
+    # Peak memory of a worker computing a day
+    task_memory = \
+        taq_task_memory_responses_physical_data(taus=taus, bin_size=bin_size)
+
+    with mp.Pool(processes=taq_data_tools_responses_physical
+                 .taq_workers_data(task_memory)) as pool:
+        for key, values in pool.imap_unordered(
+                taq_response_task_responses_physical_data, tasks,
+                chunksize=chunksize):
+
+            if (key in correlator_values):
+                correlator_values[key] = \
+                    (correlator_values[key][0] + values[0],
+                     correlator_values[key][1] + values[1])
+            else:
+                correlator_values[key] = values
+            pending[key] -= 1
+
+            if (not pending[key]):
+                correlator_val = \
+                    correlator_values[key][0] / correlator_values[key][1]
+                function_name = \
+                    self_name if (key[0] == key[1]) else cross_name
+
+                # Saving data
+                taq_data_tools_responses_physical \
+                    .taq_save_data(taq_data_tools_responses_physical
+                                   .taq_resolution_name_data(function_name,
+                                                             window,
+                                                             bin_size),
+                                   (taus, correlator_val), key[0], key[1],
+                                   year, '', '')
+                del correlator_values[key]
+
+    return None
 
 # ----------------------------------------------------------------------------
 
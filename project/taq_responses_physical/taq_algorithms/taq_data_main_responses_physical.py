@@ -49,40 +49,53 @@ def taq_data_plot_generator(tickers, year):
 
     date_list = taq_data_tools_responses_physical.taq_bussiness_days(year)
 
-    # Specific functions
-    # Self-response
-    for ticker in tickers:
-
-        taq_data_analysis_responses_physical \
-            .taq_self_response_year_responses_physical_data(ticker, year)
-
-    # ticker_prod = iprod(tickers, tickers)
-    # ticker_prod = [('AAPL', 'MSFT'), ('MSFT', 'AAPL'),
-    #                ('GS', 'JPM'), ('JPM', 'GS'),
-    #                ('CVX', 'XOM'), ('XOM', 'CVX'),
-    #                ('GOOG', 'MA'), ('MA', 'GOOG'),
-    #                ('CME', 'GS'), ('GS', 'CME'),
-    #                ('RIG', 'APA'), ('APA', 'RIG')]
+    # Log-spaced time lags for the responses
+    taus = taq_data_analysis_responses_physical \
+        .taq_lag_grid_responses_physical_data()
 
-    # Cross-response
-    # for ticks in ticker_prod:
-
-    #     taq_data_analysis_responses_physical \
-    #         .taq_cross_response_year_responses_physical_data(ticks[0],
-    #                                                          ticks[1], year)
+    # Specific functions
+    # Self-response of all the tickers in one pool
+    taq_data_analysis_responses_physical \
+        .taq_self_response_universe_responses_physical_data(tickers, year,
+                                                            taus=taus)
+
+    # Cross-response of all the pairs of tickers
+    taq_data_analysis_responses_physical \
+        .taq_cross_response_year_all_responses_physical_data(tickers, year,
+                                                             taus=taus)
+
+    ticker_prod = [('AAPL', 'MSFT'), ('MSFT', 'AAPL'),
+                   ('GS', 'JPM'), ('JPM', 'GS'),
+                   ('CVX', 'XOM'), ('XOM', 'CVX'),
+                   ('GOOG', 'MA'), ('MA', 'GOOG'),
+                   ('CME', 'GS'), ('GS', 'CME'),
+                   ('RIG', 'APA'), ('APA', 'RIG')]
+
+    # Cross-response of the pairs with the days in shared memory
+    taq_data_analysis_responses_physical \
+        .taq_cross_response_shared_responses_physical_data(ticker_prod, year,
+                                                           taus=taus)
+
+    # Trade sign self- and cross-correlators of all the tickers and pairs in
+    # one pool
+    taq_data_analysis_responses_physical \
+        .taq_trade_sign_correlator_universe_responses_physical_data(
+            tickers, ticker_prod, year, taus=taus)
 
     # Parallel computing
-    with mp.Pool(processes=mp.cpu_count()) as pool:
+    with mp.Pool(processes=taq_data_tools_responses_physical
+                 .taq_workers_data()) as pool:
         # Plot
         pool.starmap(taq_data_plot_responses_physical
                      .taq_self_response_year_avg_responses_physical_plot,
                      iprod(tickers, [year]))
     # Parallel computing
-    # with mp.Pool(processes=mp.cpu_count()) as pool:
+    with mp.Pool(processes=taq_data_tools_responses_physical
+                 .taq_workers_data()) as pool:
         # Plot
-        # pool.starmap(taq_data_plot_responses_physical
-        #              .taq_cross_response_year_avg_responses_physical_plot,
-        #              iprod(tickers, tickers, [year]))
+        pool.starmap(taq_data_plot_responses_physical
+                     .taq_cross_response_year_avg_responses_physical_plot,
+                     [ticks + (year,) for ticks in ticker_prod])
 
     return None
 
@@ -51,21 +51,22 @@ def taq_self_response_year_avg_responses_physical_plot(ticker, year):
                                             year, '', '')
 
         # Load data
-        self_ = pickle.load(open(
+        taus, self_ = taq_data_tools_responses_physical \
+            .taq_response_lags_data(pickle.load(open(
                         f'../../taq_data/responses_physical_data_{year}/taq'
                         + f'_self_response_year_responses_physical_data/taq'
                         + f'_self_response_year_responses_physical_data_{year}'
-                        + f'_{ticker}.pickle', 'rb'))
+                        + f'_{ticker}.pickle', 'rb')))
 
         figure = plt.figure(figsize=(16, 9))
-        plt.semilogx(self_, linewidth=5, label=f'{ticker}')
+        plt.semilogx(taus, self_, linewidth=5, label=f'{ticker}')
         plt.legend(loc='best', fontsize=25)
         plt.title('Self-response', fontsize=40)
         plt.xlabel(r'$\tau \, [s]$', fontsize=35)
         plt.ylabel(r'$R_{ii}(\tau)$', fontsize=35)
         plt.xticks(fontsize=25)
         plt.yticks(fontsize=25)
-        plt.xlim(1, 10000)
+        plt.xlim(taus[0], taus[-1])
         # plt.ylim(13 * 10 ** -5, 16 * 10 ** -5)
         plt.ticklabel_format(style='sci', axis='y', scilimits=(0, 0))
         plt.grid(True)
@@ -117,22 +118,24 @@ def taq_cross_response_year_avg_responses_physical_plot(ticker_i, ticker_j,
                 .taq_function_header_print_plot(function_name, ticker_i,
                                                 ticker_j, year, '', '')
 
-            cross = pickle.load(open(
+            taus, cross = taq_data_tools_responses_physical \
+                .taq_response_lags_data(pickle.load(open(
                             f'../../taq_data/responses_physical_data_{year}/'
                             + f'taq_cross_response_year_responses_physical'
                             + f'_data/taq_cross_response_year_responses'
                             + f'_physical_data_{year}_{ticker_i}i_{ticker_j}j'
-                            + f'.pickle', 'rb'))
+                            + f'.pickle', 'rb')))
 
             figure = plt.figure(figsize=(16, 9))
-            plt.semilogx(cross, linewidth=5, label=f'{ticker_i} - {ticker_j}')
+            plt.semilogx(taus, cross, linewidth=5,
+                         label=f'{ticker_i} - {ticker_j}')
             plt.legend(loc='best', fontsize=25)
             plt.title('Cross-response', fontsize=40)
             plt.xlabel(r'$\tau \, [s]$', fontsize=35)
             plt.ylabel(r'$R_{ij}(\tau)$', fontsize=35)
             plt.xticks(fontsize=25)
             plt.yticks(fontsize=25)
-            plt.xlim(1, 10000)
+            plt.xlim(taus[0], taus[-1])
             # plt.ylim(4 * 10 ** -5, 9 * 10 ** -5)
             plt.ticklabel_format(style='sci', axis='y', scilimits=(0, 0))
             plt.grid(True)
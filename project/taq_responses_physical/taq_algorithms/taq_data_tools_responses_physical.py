@@ -6,9 +6,12 @@ in the modules that use them.
 
 This script requires the following modules:
     * matplotlib
+    * multiprocessing
+    * multiprocessing.shared_memory
     * numpy
     * os
     * pandas
+    * pandas.tseries.holiday
     * pickle
 
 The module contains the following functions:
@@ -18,8 +21,30 @@ The module contains the following functions:
     * taq_function_header_print_plot - prints info about the plot.
     * taq_start_folders - creates folders to save data and plots.
     * taq_initial_data - takes the initial values for the analysis.
-    * taq_business_days - creates a list of week days for a year.
+    * taq_holidays_data - creates a list of the NYSE holidays for a year.
+    * taq_early_closes_data - creates a list of the NYSE early closes for a
+      year.
+    * taq_market_window_data - gets the market time of a trading day.
+    * taq_business_days - creates a list of the trading days for a year.
     * taq_get_tickers_data - gets the available ticker names.
+    * taq_catalog_data - loads the catalog of the extracted data.
+    * taq_catalog_days_data - gets the complete days in the catalog.
+    * taq_catalog_ticker_days_data - gets the complete days of every
+      ticker in the catalog.
+    * taq_catalog_tickers_data - gets the tickers in the catalog.
+    * taq_load_physical_data - loads the midpoint price and trade signs.
+    * taq_physical_bins_data - computes the midpoint price and trade signs of
+      bins of seconds.
+    * taq_shared_physical_data - loads the midpoint prices and trade signs of
+      many tickers in shared memory.
+    * taq_response_lags_data - gets the time lags and the values of a saved
+      response.
+    * taq_resolution_name_data - gets the name of the saved results of a
+      window and bin size.
+    * taq_memory_available_data - gets the available memory of the node.
+    * taq_memory_budget_data - gets the memory budget of a stage.
+    * taq_workers_data - gets the number of workers that fit in a memory
+      budget.
     * main - the main function of the script.
 
 .. moduleauthor:: Juan Camilo Henao Londono <www.github.com/juanhenao21>
@@ -29,11 +54,22 @@ The module contains the following functions:
 # Modules
 
 from matplotlib import pyplot as plt
+import multiprocessing as mp
+from multiprocessing import shared_memory
 import numpy as np
 import os
 import pandas as pd
+from pandas.tseries.holiday import (GoodFriday, Holiday, USLaborDay,
+                                    USMartinLutherKingJr, USMemorialDay,
+                                    USPresidentsDay, USThanksgivingDay,
+                                    nearest_workday, sunday_to_monday)
 import pickle
 
+# Fraction of the available memory used by default by a stage
+__memory_fraction__ = 0.8
+# Bytes of memory of a worker before it runs a task
+__worker_memory__ = 2 ** 28
+
 # -----------------------------------------------------------------------------
 
 
@@ -264,10 +300,108 @@ def taq_initial_data():
 # -----------------------------------------------------------------------------
 
 
-def taq_bussiness_days(year):
+def taq_holidays_data(year):
+    """Generates a list with the dates of the NYSE holidays in a year.
+
+    The holidays that fall on a weekend are observed on the nearest week day,
+    except the New Year's Day on a Saturday, which is not observed. The
+    special closures of the exchange are included.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: list.
+    """
+
+    init_date = f'01/01/{year}'
+    last_date = f'12/31/{year}'
+
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01',
+                observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4,
+                observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas Day', month=12, day=25, observance=nearest_workday)
+    ]
+
+    # Closures of the exchange out of the regular holidays
+    special_closures = ['2001-09-11', '2001-09-12', '2001-09-13',
+                        '2001-09-14', '2004-06-11', '2007-01-02',
+                        '2012-10-29', '2012-10-30', '2018-12-05',
+                        '2025-01-09']
+
+    holidays = [pd.DatetimeIndex(rule.dates(init_date, last_date))
+                for rule in rules]
+    date_list = pd.DatetimeIndex([]).append(holidays) \
+        .strftime('%Y-%m-%d').tolist()
+    date_list += [date for date in special_closures
+                  if date.startswith(f'{year}-')]
+
+    return sorted(date_list)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_early_closes_data(year):
+    """Generates a list with the dates of the NYSE early closes in a year.
+
+    The exchange closes at 13h00 on the 3rd of July, the day after
+    Thanksgiving and the Christmas Eve, when they are trading days.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: list.
+    """
+
+    holidays = taq_holidays_data(year)
+
+    thanksgiving = USThanksgivingDay.dates(f'01/01/{year}', f'12/31/{year}')
+    date_list = [f'{year}-07-03', f'{year}-12-24'] \
+        + [(day + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+           for day in thanksgiving]
+
+    return sorted([date for date in date_list
+                   if pd.Timestamp(date).weekday() < 5
+                   and date not in holidays])
+
+# ----------------------------------------------------------------------------
+
+
+def taq_market_window_data(date):
+    """Gets the market time of a trading day.
+
+    The market time is from 9h30 (34200 s) to 16h00 (57600 s), or to 13h00
+    (46800 s) in the early closes.
+
+    :param date: string with the date of the data to be extracted
+     (i.e. '2008-01-02').
+    :return: tuple -- The function returns a tuple with the open and close
+     times in seconds.
+    """
+
+    if (date in taq_early_closes_data(date.split('-')[0])):
+        return (34200, 46800)
+
+    else:
+        return (34200, 57600)
+
+# ----------------------------------------------------------------------------
+
+
+def taq_bussiness_days(year, data_dates=None):
     """Generates a list with the dates of the bussiness days in a year
 
+    The week days that are NYSE holidays are not used. With data_dates only
+    the days with data are used.
+
     :param year: string of the year to be analyzed (i.e '2008').
+    :param data_dates: list of strings with the dates with data
+     (i.e. ['2008-01-02', '2008-01-03']). Default None uses all the trading
+     days.
     :return: list.
     """
 
@@ -279,6 +413,14 @@ def taq_bussiness_days(year):
     dt_df = dt.to_frame(index=False)
     date_list = dt_df[0].astype(str).tolist()
 
+    # Remove the holidays
+    holidays = taq_holidays_data(year)
+    date_list = [date for date in date_list if date not in holidays]
+
+    if (data_dates is not None):
+        data_dates = set(data_dates)
+        date_list = [date for date in date_list if date in data_dates]
+
     return date_list
 
 # ----------------------------------------------------------------------------
@@ -304,8 +446,15 @@ def taq_get_tickers_data(year):
         f_path = root_path + f'/taq_data/csv_year_data_{year}'
         files = os.listdir(f_path)
     else:
+        # Using the catalog of the extracted data
+        tickers = taq_catalog_tickers_data(year)
+        if (tickers is not None):
+            return tickers
         # Using HDF5 files
         f_path = root_path + f'/taq_data/hdf5_daily_data_{year}'
+        if (not os.path.exists(f_path)):
+            # Using HDF5 year files
+            f_path = root_path + f'/taq_data/hdf5_year_data_{year}'
         files = os.listdir(f_path)
 
     tickers = []
@@ -331,6 +480,435 @@ def taq_get_tickers_data(year):
 # -----------------------------------------------------------------------------
 
 
+def taq_catalog_data(year):
+    """Loads the catalog of the extracted data of a year.
+
+    The catalog has an entry for every ticker, type and day extracted, with
+    the path of the HDF5 file, the number of rows, the size in bytes of the
+    file and the time range of the day.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: DataFrame -- The function returns a pandas DataFrame, or None if
+     there is no catalog for the year.
+    """
+
+    # Obtain the absolute path of the current file and split it
+    abs_path = os.path.abspath(__file__).split('/')
+    # Take the path from the start to the project folder
+    root_path = '/'.join(abs_path[:abs_path.index('project') + 1])
+    f_file = root_path + f'/taq_data/taq_catalog_{year}.csv'
+
+    if (not os.path.isfile(f_file)):
+        return None
+
+    return pd.read_csv(f_file, dtype={'Ticker': str, 'Date': str})
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_days_data(year, tickers=None):
+    """Gets the complete days in the catalog of a year.
+
+    A day is complete for a ticker when it has quotes and trades data.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :param tickers: list of the string abbreviation of the stocks
+     (i.e. ['AAPL', 'MSFT']). The days must be complete for all the tickers.
+     Default None uses the days complete for any ticker.
+    :return: list -- The function returns a sorted list with the dates, or
+     None if there is no catalog for the year.
+    """
+
+    catalog = taq_catalog_data(year)
+
+    if (catalog is None):
+        return None
+
+    if (tickers is not None):
+        catalog = catalog[catalog['Ticker'].isin(tickers)]
+
+    types = catalog.groupby(['Ticker', 'Date'])['Type'].nunique()
+    complete = types[types == 2].reset_index()
+
+    if (tickers is None):
+        return sorted(complete['Date'].unique())
+
+    counts = complete.groupby('Date')['Ticker'].nunique()
+
+    return sorted(counts[counts == len(set(tickers))].index)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_ticker_days_data(year):
+    """Gets the complete days of every ticker in the catalog of a year.
+
+    A day is complete for a ticker when it has quotes and trades data.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :return: dict -- The function returns a dictionary with the tickers as
+     keys and sorted lists with the dates as values, or None if there is no
+     catalog for the year.
+    """
+
+    catalog = taq_catalog_data(year)
+
+    if (catalog is None):
+        return None
+
+    types = catalog.groupby(['Ticker', 'Date'])['Type'].nunique()
+    complete = types[types == 2].reset_index()
+
+    return {ticker: sorted(days['Date'])
+            for ticker, days in complete.groupby('Ticker')}
+
+# -----------------------------------------------------------------------------
+
+
+def taq_catalog_tickers_data(year, complete=False):
+    """Gets the tickers in the catalog of a year.
+
+    A ticker is complete when it has quotes and trades data for every trading
+    day of the year.
+
+    :param year: string of the year to be analyzed (i.e '2008').
+    :param complete: bool to return only the complete tickers. Default False
+     returns all the tickers in the catalog.
+    :return: list -- The function returns a sorted list with the tickers, or
+     None if there is no catalog for the year.
+    """
+
+    catalog = taq_catalog_data(year)
+
+    if (catalog is None):
+        return None
+
+    if (not complete):
+        return sorted(catalog['Ticker'].unique())
+
+    days = taq_bussiness_days(year)
+    catalog = catalog[catalog['Date'].isin(days)]
+    types = catalog.groupby(['Ticker', 'Date'])['Type'].nunique()
+    counts = (types == 2).groupby(level='Ticker').sum()
+
+    return sorted(counts[counts == len(days)].index)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_load_physical_data(ticker, date, window=None, bin_size=1):
+    """Loads the midpoint price and trade signs of a ticker in a day.
+
+    The .npy files are loaded as read-only memory maps, so the arrays are
+    views of the files and are not deserialized. If there are no .npy files
+    the pickle files are loaded.
+
+    The series are saved every second. A window larger than the window of the
+    saved series removes more seconds after the open and before the close of
+    the market, and the bins longer than 1 s are computed from the series of
+    every second with the taq_physical_bins_data function.
+
+    :param ticker: string of the abbreviation of the stock to be analyzed
+     (i.e. 'AAPL').
+    :param date: string with the date of the data to be extracted
+     (i.e. '2008-01-02').
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series
+     (i.e. 1).
+    :return: tuple -- The function returns a tuple with numpy arrays. Raises
+     FileNotFoundError if there is no data for the day.
+    """
+
+    date_sep = date.split('-')
+
+    year = date_sep[0]
+    month = date_sep[1]
+    day = date_sep[2]
+
+    f_midpoint = f'../../taq_data/extract_data_{year}/taq_midpoint' \
+        + f'_physical_data/taq_midpoint_physical_data_midpoint' \
+        + f'_{year}{month}{day}_{ticker}'
+    f_trade_sign = f'../../taq_data/extract_data_{year}/taq_trade' \
+        + f'_signs_physical_data/taq_trade_signs_physical_data'
+
+    if (os.path.isfile(f'{f_midpoint}.npy')):
+        midpoint = np.load(f'{f_midpoint}.npy', mmap_mode='r')
+    else:
+        midpoint = pickle.load(open(f'{f_midpoint}.pickle', 'rb'))
+
+    # The sums of the trade signs are not in the data saved before
+    sign_sums = None
+
+    if (os.path.isfile(f'{f_trade_sign}_trade_signs_{year}{month}{day}'
+                       + f'_{ticker}.npy')):
+        trade_sign = np.load(f'{f_trade_sign}_trade_signs_{year}{month}{day}'
+                             + f'_{ticker}.npy', mmap_mode='r')
+        if (bin_size > 1
+                and os.path.isfile(f'{f_trade_sign}_sign_sums_{year}{month}'
+                                   + f'{day}_{ticker}.npy')):
+            sign_sums = np.load(f'{f_trade_sign}_sign_sums_{year}{month}'
+                                + f'{day}_{ticker}.npy', mmap_mode='r')
+    else:
+        trade_data = pickle.load(open(
+            f'{f_trade_sign}_{year}{month}{day}_{ticker}.pickle', 'rb'))
+        trade_sign = trade_data[2]
+        if (len(trade_data) > 3):
+            sign_sums = trade_data[3]
+
+    if (window is not None):
+        market_open, market_close = taq_market_window_data(date)
+        # Seconds removed after the open and before the close in the saved
+        # series
+        saved = (market_close - market_open - len(midpoint)) // 2
+        if (window < saved):
+            raise ValueError(f'The series are saved with a window of {saved}'
+                             + ' s')
+
+        cut = window - saved
+        midpoint = midpoint[cut:len(midpoint) - cut]
+        trade_sign = trade_sign[cut:len(trade_sign) - cut]
+        if (sign_sums is not None):
+            sign_sums = sign_sums[cut:len(sign_sums) - cut]
+
+    if (bin_size > 1):
+        if (sign_sums is None):
+            raise ValueError('The bins need the sums of the trade signs, the '
+                             + 'physical data has to be computed again')
+
+        midpoint, trade_sign = taq_physical_bins_data(midpoint, sign_sums,
+                                                      bin_size)
+
+    return (midpoint, trade_sign)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_physical_bins_data(midpoint, sign_sums, bin_size):
+    """Computes the midpoint price and trade signs of bins of seconds.
+
+    The midpoint price of a bin is the midpoint price of its first second,
+    that is the price before the trades of the bin as in the series of every
+    second. The trade sign of a bin is the sign of the sum of the Eq. 1 signs
+    of its trades (Eq. 2). The last seconds that do not fill a bin are not
+    used.
+
+    :param midpoint: numpy array with the midpoint price of every second.
+    :param sign_sums: numpy array with the sum of the Eq. 1 trade signs of
+     every second.
+    :param bin_size: integer with the seconds of the bins (i.e. 60).
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    num_bins = len(midpoint) // bin_size
+
+    midpoint_bins = np.array(midpoint[:num_bins * bin_size:bin_size])
+    sums = np.reshape(sign_sums[:num_bins * bin_size], (num_bins, bin_size))
+    trade_sign_bins = np.sign(np.sum(sums, axis=1)).astype(np.int8)
+
+    return (midpoint_bins, trade_sign_bins)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_shared_physical_data(tickers, date, window=None, bin_size=1):
+    """Loads the midpoint prices and trade signs of many tickers in a day.
+
+    The midpoint prices (float64) and trade signs (int8) of all the tickers
+    are copied once in two shared memory blocks with shape (tickers, seconds),
+    so the workers of a pool can attach to them by name and use views of the
+    data instead of reading the files. The caller has to close and unlink the
+    blocks.
+
+    :param tickers: list of the string abbreviation of the stocks to be
+     analyzed (i.e. ['AAPL', 'MSFT']).
+    :param date: string with the date of the data to be extracted
+     (i.e. '2008-01-02').
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series
+     (i.e. 1).
+    :return: tuple -- The function returns a tuple with the shared memory
+     block of the midpoint prices, the shared memory block of the trade signs,
+     the shape of the blocks and a numpy array with True for the tickers with
+     data. Returns None if there is no data for the day.
+    """
+
+    shm_midpoint = None
+    shm_trade_sign = None
+    midpoint_sh = None
+    trade_sign_sh = None
+    mask = np.zeros(len(tickers), dtype=bool)
+
+    try:
+        for t_idx, ticker in enumerate(tickers):
+            try:
+                midpoint, trade_sign = taq_load_physical_data(ticker, date,
+                                                              window,
+                                                              bin_size)
+
+            except FileNotFoundError:
+                continue
+
+            if (shm_midpoint is None):
+                shape = (len(tickers), len(midpoint))
+                shm_midpoint = shared_memory.SharedMemory(
+                    create=True, size=shape[0] * shape[1] * 8)
+                shm_trade_sign = shared_memory.SharedMemory(
+                    create=True, size=shape[0] * shape[1])
+                midpoint_sh = np.ndarray(shape, dtype=np.float64,
+                                         buffer=shm_midpoint.buf)
+                trade_sign_sh = np.ndarray(shape, dtype=np.int8,
+                                           buffer=shm_trade_sign.buf)
+
+            if (len(midpoint) != shape[1] or len(trade_sign) != shape[1]):
+                raise ValueError(f'The series of {ticker} the {date} do '
+                                 + f'not have the {shape[1]} seconds of the '
+                                 + 'day')
+
+            midpoint_sh[t_idx] = midpoint
+            trade_sign_sh[t_idx] = trade_sign
+            mask[t_idx] = True
+
+    except BaseException:
+        # The blocks are not returned, so they are released here. The views
+        # have to be released before the blocks can be closed
+        midpoint_sh = trade_sign_sh = None
+        for shm in (shm_midpoint, shm_trade_sign):
+            if (shm is not None):
+                shm.close()
+                shm.unlink()
+        raise
+
+    if (shm_midpoint is None):
+        return None
+
+    # The views have to be released before the blocks can be closed
+    del midpoint_sh, trade_sign_sh
+
+    return (shm_midpoint, shm_trade_sign, shape, mask)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_response_lags_data(data):
+    """Gets the time lags and the values of a saved response.
+
+    The responses are saved with their time lags as a tuple. The responses
+    saved before have only the values of all the time lags from 1.
+
+    :param data: tuple with the time lags and the values of a response or
+     numpy array with the values of a response.
+    :return: tuple -- The function returns a tuple with numpy arrays.
+    """
+
+    if (isinstance(data, tuple) and len(data) == 2):
+        return data
+
+    else:
+        return (np.arange(1, np.shape(data)[-1] + 1), data)
+
+# -----------------------------------------------------------------------------
+
+
+def taq_resolution_name_data(function_name, window=None, bin_size=1):
+    """Gets the name of the saved results of a window and bin size.
+
+    The results of the saved series every second keep the name of the
+    function, so they are still found by the plots. The other windows and
+    bin sizes are added to the name
+    (i.e. 'taq_self_response_year_responses_physical_data_window_0_bin_60').
+
+    :param function_name: name of the function that generates the data.
+    :param window: integer with the seconds removed after the open and before
+     the close of the market (i.e. 600). Default None uses the window of the
+     saved series.
+    :param bin_size: integer with the seconds of the bins of the series
+     (i.e. 1).
+    :return: string -- The function returns the name of the saved results.
+    """
+
+    if (window is not None):
+        function_name += f'_window_{window}'
+
+    if (bin_size != 1):
+        function_name += f'_bin_{bin_size}'
+
+    return function_name
+
+# -----------------------------------------------------------------------------
+
+
+def taq_memory_available_data():
+    """Gets the available memory of the node.
+
+    Reads the memory that can be used without swapping (MemAvailable) from
+    /proc/meminfo. When the file does not exist, the free physical memory is
+    used.
+
+    :return: int -- The function returns the available memory in bytes.
+    """
+
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if (line.startswith('MemAvailable:')):
+                    # The value is in kB
+                    return int(line.split()[1]) * 1024
+
+    except FileNotFoundError:
+        pass
+
+    return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+
+# -----------------------------------------------------------------------------
+
+
+def taq_memory_budget_data(memory=None):
+    """Gets the memory budget of a stage.
+
+    :param memory: integer with the memory budget in bytes. Default None uses
+     a fraction of the available memory of the node.
+    :return: int -- The function returns the memory budget in bytes.
+    """
+
+    if (memory is None):
+        memory = int(__memory_fraction__ * taq_memory_available_data())
+
+    return memory
+
+# -----------------------------------------------------------------------------
+
+
+def taq_workers_data(task_memory=__worker_memory__, memory=None,
+                     tasks=None):
+    """Gets the number of workers that fit in a memory budget.
+
+    The number of workers is the number of CPUs, limited by the number of
+    tasks and by the number of tasks that fit in the memory budget. There is
+    always at least one worker.
+
+    :param task_memory: integer with the peak memory of a worker running a
+     task in bytes.
+    :param memory: integer with the memory budget in bytes. Default None uses
+     a fraction of the available memory of the node.
+    :param tasks: integer with the number of tasks. Default None does not
+     limit the number of workers.
+    :return: int -- The function returns the number of workers.
+    """
+
+    workers = min(mp.cpu_count(),
+                  taq_memory_budget_data(memory) // max(task_memory, 1))
+    if (tasks is not None):
+        workers = min(workers, tasks)
+
+    return max(int(workers), 1)
+
+# -----------------------------------------------------------------------------
+
+
 def main():
     """The main function of the script.
 